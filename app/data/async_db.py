@@ -0,0 +1,99 @@
+"""
+Async access to the data layer, for running independent queries at the same time.
+
+The data functions stay synchronous; here they are run on a small, bounded
+thread pool. Every pool thread gets its own connection from the connection pool,
+SQLite in WAL mode lets those readers run side by side, and the sqlite3 module
+releases the GIL while a query executes.
+
+    results = gather_sync(get_slowest_status, get_slowest_staff, get_avg_resolution_time)
+
+Streamlit scripts are synchronous, so pages use gather_sync(); async code can
+await the *_async functions or gather() directly.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from app.data import datasets, incidents, metrics, tickets
+
+# upper bound on queries running at once (and on extra connections opened)
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="db-query")
+        return _executor
+
+
+async def run_query(func, *args, **kwargs):
+    """Run a blocking data function on the query pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+def to_async(func):
+    """Make an async counterpart of a data function."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_query(func, *args, **kwargs)
+    return wrapper
+
+
+def _as_call(call):
+    # a call is a function, or a tuple of (function, *args)
+    if callable(call):
+        return call, ()
+    return call[0], tuple(call[1:])
+
+
+async def gather(*calls):
+    """Run the calls concurrently, results come back in the same order."""
+    return await asyncio.gather(*(run_query(func, *args) for func, args in map(_as_call, calls)))
+
+
+def gather_sync(*calls):
+    """
+    Blocking version of gather() for Streamlit pages.
+
+    Args:
+        calls: Functions, or (function, *args) tuples
+
+    Returns:
+        list: One result per call, in order
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(gather(*calls))
+    # already inside an event loop (can't nest asyncio.run), wait on the pool directly
+    futures = [get_executor().submit(func, *args) for func, args in map(_as_call, calls)]
+    return [future.result() for future in futures]
+
+
+# async counterparts of the read functions the dashboards use together
+get_incident_stats_async = to_async(incidents.get_incident_stats)
+get_incidents_by_status_async = to_async(incidents.get_incidents_by_status)
+query_incidents_async = to_async(incidents.query_incidents)
+get_incident_rollup_async = to_async(incidents.get_incident_rollup)
+
+get_all_tickets_async = to_async(tickets.get_all_tickets)
+get_slowest_status_async = to_async(tickets.get_slowest_status)
+get_slowest_staff_async = to_async(tickets.get_slowest_staff)
+get_avg_resolution_time_async = to_async(tickets.get_avg_resolution_time)
+get_oldest_pending_tickets_async = to_async(tickets.get_oldest_pending_tickets)
+
+get_all_datasets_async = to_async(datasets.get_all_datasets)
+get_dataset_stats_async = to_async(datasets.get_dataset_stats)
+get_recent_uploads_async = to_async(datasets.get_recent_uploads)
+
+get_dashboard_metrics_async = to_async(metrics.get_dashboard_metrics)
+get_group_counts_async = to_async(metrics.get_group_counts)
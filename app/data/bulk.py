@@ -0,0 +1,166 @@
+"""
+Batch insert/update/delete shared by incidents, tickets and datasets.
+
+Every operation runs inside the caller's transaction (one get_connection()
+block) with executemany, and reports the rows it could not apply instead of
+failing the whole batch. The transaction is begun here when the caller hasn't
+one open yet, but never committed here: the pool commits it (and counts the
+commit) when the outermost get_connection() block exits. Results look like:
+
+    {"inserted": 98, "conflicts": [("INC-7", "already exists"), ...]}
+"""
+import csv
+import io
+import re
+import sqlite3
+
+# keys per "IN (...)" lookup, well under SQLite's bound parameter limit
+KEY_BATCH = 500
+
+
+def _begin(conn):
+    # IMMEDIATE takes the write lock up front, so the existing-key lookup and the
+    # writes see the same rows and the read can't fail to upgrade to a write later
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def existing_keys(conn, table, key_column, keys):
+    """Return the subset of keys (as strings) that are already in the table."""
+    keys = list(keys)
+    found = set()
+    for i in range(0, len(keys), KEY_BATCH):
+        batch = keys[i:i + KEY_BATCH]
+        placeholders = ", ".join("?" for _ in batch)
+        rows = conn.execute(
+            f'SELECT "{key_column}" FROM "{table}" WHERE "{key_column}" IN ({placeholders})', batch
+        ).fetchall()
+        found.update(str(row[0]) for row in rows)
+    return found
+
+
+def bulk_insert(conn, table, key_column, columns, rows):
+    """
+    Insert many rows, skipping keys that already exist or repeat within the batch.
+
+    Args:
+        conn: Database connection, the caller commits
+        table: Table name (never user input)
+        key_column: Primary key column, must be one of columns
+        columns: Column names in the order of the values in each row
+        rows: Iterable of value tuples
+
+    Returns:
+        dict: inserted count and a list of (key, reason) conflicts
+    """
+    rows = [tuple(row) for row in rows]
+    key_index = list(columns).index(key_column)
+    conflicts = []
+
+    _begin(conn)
+    present = existing_keys(conn, table, key_column, (row[key_index] for row in rows))
+    seen = set()
+    new_rows = []
+    for row in rows:
+        key = str(row[key_index])
+        if key in present:
+            conflicts.append((row[key_index], "already exists"))
+        elif key in seen:
+            conflicts.append((row[key_index], "duplicate in batch"))
+        else:
+            seen.add(key)
+            new_rows.append(row)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    insert_sql = f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders})'
+
+    # nested in the open transaction, so RELEASE below doesn't commit anything; it is
+    # only there to undo the rows executemany applied before a row failed
+    conn.execute("SAVEPOINT bulk_insert")
+    try:
+        conn.executemany(insert_sql, new_rows)
+        inserted = len(new_rows)
+    except sqlite3.IntegrityError:
+        # some row breaks a constraint (e.g. NOT NULL): undo the batch and go row by row,
+        # each failing statement is rolled back on its own and reported
+        conn.execute("ROLLBACK TO bulk_insert")
+        inserted = 0
+        for row in new_rows:
+            try:
+                conn.execute(insert_sql, row)
+                inserted += 1
+            except sqlite3.IntegrityError as e:
+                conflicts.append((row[key_index], str(e)))
+    conn.execute("RELEASE bulk_insert")
+
+    return {"inserted": inserted, "conflicts": conflicts}
+
+
+def bulk_update(conn, table, key_column, values, keys):
+    """
+    Set the same column values on many rows.
+
+    Args:
+        values: {column: new value}
+        keys: Primary keys of the rows to change
+
+    Returns:
+        dict: updated count and (key, "not found") conflicts
+    """
+    keys = list(dict.fromkeys(keys))
+    _begin(conn)
+    present = existing_keys(conn, table, key_column, keys)
+    found = [key for key in keys if str(key) in present]
+    conflicts = [(key, "not found") for key in keys if str(key) not in present]
+
+    assignments = ", ".join(f'"{column}" = ?' for column in values)
+    conn.executemany(
+        f'UPDATE "{table}" SET {assignments} WHERE "{key_column}" = ?',
+        ((*values.values(), key) for key in found)
+    )
+    return {"updated": len(found), "conflicts": conflicts}
+
+
+def bulk_delete(conn, table, key_column, keys):
+    """
+    Delete many rows by primary key.
+
+    Returns:
+        dict: deleted count and (key, "not found") conflicts
+    """
+    keys = list(dict.fromkeys(keys))
+    _begin(conn)
+    present = existing_keys(conn, table, key_column, keys)
+    found = [key for key in keys if str(key) in present]
+    conflicts = [(key, "not found") for key in keys if str(key) not in present]
+
+    conn.executemany(f'DELETE FROM "{table}" WHERE "{key_column}" = ?', ((key,) for key in found))
+    return {"deleted": len(found), "conflicts": conflicts}
+
+
+def rows_from_csv_text(text, columns, required=()):
+    """
+    Parse pasted CSV text (with a header line) into value tuples.
+
+    Only the header's columns that are in `columns` are kept, so columns left
+    out get their table default. Empty cells become None.
+
+    Returns:
+        tuple: (column names in `columns` order, list of value tuples)
+    """
+    reader = csv.DictReader(io.StringIO(text.strip()))
+    header = [name.strip() for name in (reader.fieldnames or [])]
+    names = [column for column in columns if column in header]
+    missing = [column for column in required if column not in header]
+    if not names or missing:
+        raise ValueError(f"The CSV header must contain {', '.join(required or columns[:1])} "
+                         f"and may contain: {', '.join(columns)}")
+    reader.fieldnames = header
+    rows = [tuple(((row.get(name) or "").strip() or None) for name in names) for row in reader]
+    return names, rows
+
+
+def parse_keys(text):
+    """Split pasted IDs on commas, whitespace or new lines."""
+    return [key for key in re.split(r"[\s,]+", text.strip()) if key]
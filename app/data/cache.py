@@ -0,0 +1,142 @@
+"""
+In-process cache for the read functions of the data layer.
+
+Every cached result remembers the generation of the tables it was read from.
+The write functions bump the generation of the tables they change, which makes
+all older results for those tables stale, so a cached read is reused exactly
+until something relevant is written. The least recently used entries are
+dropped once the cache is full.
+
+Only writes made through this process invalidate the cache; if another process
+(e.g. `python main.py csv`) changes the database, call clear_cache().
+"""
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from app.data.rows import ColumnarResult, SlotRow
+
+# maximum number of cached results across all functions
+MAX_ENTRIES = 256
+
+_lock = threading.RLock()
+_entries = OrderedDict()  # key -> (generations the result was read at, result)
+_generations = {}
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+_listeners = []  # called with the table names on every invalidate()
+
+
+def _copy(value):
+    # callers are free to modify what they get back (e.g. pd.to_datetime on a column),
+    # so hand out copies and keep the cached original untouched
+    if type(value) is tuple:
+        # e.g. the (page, next cursor) pairs of the *_page functions
+        return tuple(_copy(item) for item in value)
+    if isinstance(value, (ColumnarResult, SlotRow)) or (hasattr(value, "copy") and hasattr(value, "columns")):
+        return value.copy()
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    return value
+
+
+def _current(tables):
+    return tuple(_generations.get(table, 0) for table in tables)
+
+
+def invalidate(*tables):
+    """Mark every cached result read from any of these tables as stale."""
+    with _lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+        _stats["invalidations"] += 1
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(tables)
+
+
+def on_invalidate(listener):
+    """Register listener(tables) to be called after every write, e.g. to refresh derived files."""
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+    return listener
+
+
+def cached_query(*tables):
+    """
+    Cache a read function by its name and arguments until one of `tables` is written.
+
+    Calls with unhashable arguments are simply not cached.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+
+            with _lock:
+                generations = _current(tables)
+                entry = _entries.get(key)
+                if entry is not None and entry[0] == generations:
+                    _entries.move_to_end(key)
+                    _stats["hits"] += 1
+                    return _copy(entry[1])
+                _stats["misses"] += 1
+
+            # run the query outside the lock; the generations were taken before it,
+            # so a write that commits meanwhile makes this result stale straight away
+            result = func(*args, **kwargs)
+
+            with _lock:
+                _entries[key] = (generations, result)
+                _entries.move_to_end(key)
+                while len(_entries) > MAX_ENTRIES:
+                    _entries.popitem(last=False)
+                    _stats["evictions"] += 1
+            return _copy(result)
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Bump the generation of `tables` after the decorated write function has run."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate(*tables)
+        return wrapper
+    return decorator
+
+
+def clear_cache():
+    """Drop every cached result."""
+    with _lock:
+        _entries.clear()
+
+
+def cache_stats():
+    """
+    Return hit/miss counters for the cache.
+
+    Returns:
+        dict: hits, misses, evictions, invalidations, hit_rate, size, max_size
+    """
+    with _lock:
+        stats = dict(_stats)
+        stats["size"] = len(_entries)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    stats["max_size"] = MAX_ENTRIES
+    return stats
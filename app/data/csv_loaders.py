@@ -1,37 +1,288 @@
-import pandas as pd
+import csv
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from app.data.db import connect_database
+from queue import Empty
+from app.data.cache import invalidate
+from app.data.db import DATA_DIR, apply_pragmas, connect_database
+
+# seconds the writer waits for a chunk before checking that the parse workers are still alive
+QUEUE_POLL_SECONDS = 1.0
+
+# rows held in memory at once while loading; peak memory depends on this, not the file size
+CHUNK_SIZE = 5000
+
+# pragmas swapped in for the duration of a bulk load and restored afterwards
+BULK_LOAD_PRAGMAS = {
+    "synchronous": "OFF",       # the whole load is one transaction, a crash just rolls it back
+    "cache_size": -64000,       # ~64MB so index pages stay in memory while inserting
+    "temp_store": "MEMORY",
+}
+
+
+def get_table_columns(conn, table_name):
+    """Return the column names of a table in their declared order."""
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+
+
+def read_csv_chunks(csv_path, columns, chunk_size=CHUNK_SIZE):
+    """
+    Stream a CSV file as lists of tuples, chunk_size rows at a time.
+
+    Only the CSV columns that exist in `columns` are kept. Empty cells become None
+    so they're stored as NULL, the same as pandas did with NaN.
+
+    Yields:
+        (list of column names, list of row tuples)
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        wanted = [(i, name.strip()) for i, name in enumerate(header) if name.strip() in columns]
+        skipped = [name for name in header if name.strip() not in columns]
+        if skipped:
+            print(f" !! Ignoring CSV columns not in the table: {', '.join(skipped)}")
+        names = [name for _, name in wanted]
+
+        chunk = []
+        for record in reader:
+            if not record:
+                continue
+            chunk.append(tuple(
+                (record[i] if i < len(record) and record[i] != "" else None) for i, _ in wanted
+            ))
+            if len(chunk) >= chunk_size:
+                yield names, chunk
+                chunk = []
+        if chunk:
+            yield names, chunk
+
+
+@contextmanager
+def bulk_load_pragmas(conn, pragmas=None):
+    """Apply the bulk load pragmas, then put the previous values back."""
+    pragmas = pragmas or BULK_LOAD_PRAGMAS
+    previous = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in pragmas}
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+
+def stream_csv_to_table(conn, csv_path, table_name, chunk_size=CHUNK_SIZE, replace=True):
+    """
+    Load a CSV file into a table in bounded chunks using executemany.
+
+    The DELETE (when replace is True) and every insert run in one transaction,
+    so readers keep seeing the old rows until the new ones are committed.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to the CSV file
+        table_name: Table to load into
+        chunk_size: Rows inserted per executemany call
+        replace: Clear the table first
+
+    Returns:
+        dict: rows, seconds and rows_per_second
+    """
+    columns = get_table_columns(conn, table_name)
+    if not columns:
+        raise ValueError(f"Table {table_name} does not exist")
+
+    # hand over whatever the caller left open so the load gets its own transaction
+    if conn.in_transaction:
+        conn.commit()
+
+    start = time.perf_counter()
+    row_count = 0
+    with bulk_load_pragmas(conn):
+        try:
+            conn.execute("BEGIN")
+            if replace:
+                conn.execute(f'DELETE FROM "{table_name}"')
+
+            insert_sql = None
+            for names, chunk in read_csv_chunks(csv_path, columns, chunk_size):
+                if insert_sql is None:
+                    column_list = ", ".join(f'"{name}"' for name in names)
+                    placeholders = ", ".join("?" for _ in names)
+                    insert_sql = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+                conn.executemany(insert_sql, chunk)
+                row_count += len(chunk)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            invalidate(table_name)
+
+    seconds = time.perf_counter() - start
+    return {
+        "rows": row_count,
+        "seconds": seconds,
+        "rows_per_second": row_count / seconds if seconds > 0 else 0.0,
+    }
+
+
+def get_primary_key(conn, table_name):
+    """Return (column name, declared type) of a table's single column primary key."""
+    for cid, name, col_type, notnull, default, pk in conn.execute(f'PRAGMA table_info("{table_name}")'):
+        if pk == 1:
+            return name, col_type
+    raise ValueError(f"Table {table_name} has no primary key to sync on")
+
+
+def row_hash(values):
+    """
+    Hash a row's values so a CSV row and a database row can be compared.
+
+    CSV rows go through coerce_value first, so '24.0' or '2.4e1' from the CSV
+    hash the same as 24 stored in an INTEGER column.
+    """
+    parts = []
+    for value in values:
+        if value is None:
+            parts.append("\x00")
+        elif isinstance(value, float) and value.is_integer():
+            parts.append(str(int(value)))
+        else:
+            parts.append(str(value))
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def sync_csv_to_table(conn, csv_path, table_name, delete_missing=False, chunk_size=CHUNK_SIZE):
+    """
+    Incrementally sync a table with a CSV file instead of deleting and reloading it.
+
+    Each CSV chunk is matched against the existing rows by primary key. Rows whose
+    hash differs (or that don't exist yet) are written with INSERT ... ON CONFLICT,
+    unchanged rows aren't touched at all.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to the CSV file
+        table_name: Table to sync
+        delete_missing: Also delete table rows whose key isn't in the CSV
+        chunk_size: Rows compared and written per batch
+
+    Returns:
+        dict: inserted, updated, unchanged, deleted, seconds
+    """
+    columns = get_table_columns(conn, table_name)
+    if not columns:
+        raise ValueError(f"Table {table_name} does not exist")
+    pk, pk_type = get_primary_key(conn, table_name)
+    column_types = get_column_types(conn, table_name)
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+    if conn.in_transaction:
+        conn.commit()
+
+    start = time.perf_counter()
+    with bulk_load_pragmas(conn):
+        # created after the pragmas, changing temp_store drops every temp table.
+        # The key tables use the primary key's type so the joins below can use its index
+        conn.execute("DROP TABLE IF EXISTS temp.sync_batch")
+        conn.execute("DROP TABLE IF EXISTS temp.sync_seen")
+        conn.execute(f"CREATE TEMP TABLE sync_batch (row_key {pk_type} PRIMARY KEY)")
+        conn.execute(f"CREATE TEMP TABLE sync_seen (row_key {pk_type} PRIMARY KEY)")
+        try:
+            conn.execute("BEGIN")
+            upsert_sql = None
+            for names, chunk in read_csv_chunks(csv_path, columns, chunk_size):
+                if pk not in names:
+                    raise ValueError(f"{Path(csv_path).name} has no {pk} column to sync on")
+                key_index = names.index(pk)
+                types = [column_types[name] for name in names]
+                # stored the way the column's affinity would store them, and one row per key,
+                # the last one wins like it would with the upserts run one after another
+                rows = {}
+                for row in chunk:
+                    row = tuple(coerce_value(v, t) for v, t in zip(row, types))
+                    rows[row[key_index]] = row
+                chunk = list(rows.values())
+
+                if upsert_sql is None:
+                    column_list = ", ".join(f'"{name}"' for name in names)
+                    placeholders = ", ".join("?" for _ in names)
+                    updates = ", ".join(f'"{name}" = excluded."{name}"' for name in names if name != pk)
+                    upsert_sql = (f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders}) '
+                                  f'ON CONFLICT("{pk}") DO UPDATE SET {updates}')
+                    select_list = ", ".join(f't."{name}"' for name in names)
+                    existing_sql = (f'SELECT {select_list} FROM temp.sync_batch b '
+                                    f'JOIN "{table_name}" t ON t."{pk}" = b.row_key')
+
+                # hashes of the rows currently stored for this chunk's keys
+                conn.execute("DELETE FROM temp.sync_batch")
+                conn.executemany("INSERT OR IGNORE INTO temp.sync_batch (row_key) VALUES (?)",
+                                 ((row[key_index],) for row in chunk))
+                existing = {str(row[key_index]): row_hash(row) for row in conn.execute(existing_sql)}
+                if delete_missing:
+                    conn.execute("INSERT OR IGNORE INTO temp.sync_seen SELECT row_key FROM temp.sync_batch")
+
+                changed = []
+                for row in chunk:
+                    stored = existing.get(str(row[key_index]))
+                    if stored is None:
+                        counts["inserted"] += 1
+                        changed.append(row)
+                    elif stored != row_hash(row):
+                        counts["updated"] += 1
+                        changed.append(row)
+                    else:
+                        counts["unchanged"] += 1
+
+                if changed:
+                    conn.executemany(upsert_sql, changed)
+
+            if delete_missing:
+                cursor = conn.execute(f'DELETE FROM "{table_name}" WHERE NOT EXISTS '
+                                      f'(SELECT 1 FROM temp.sync_seen s WHERE s.row_key = "{table_name}"."{pk}")')
+                counts["deleted"] = cursor.rowcount
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DROP TABLE IF EXISTS temp.sync_batch")
+            conn.execute("DROP TABLE IF EXISTS temp.sync_seen")
+            invalidate(table_name)
+
+    counts["seconds"] = time.perf_counter() - start
+    return counts
 
 
 def load_csv_to_table(conn, csv_path, table_name):
     """
-    Loading a CSV file into a database table using pandas.
+    Loading a CSV file into a database table, streamed in chunks.
     """
     # path().exists checks if the file path exsits
-    if not Path(csv_path).exists():
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
         print(f"the CSV file is not found: {csv_path}")
         return 0
 
     try:
-        # converting our csv file to pandas
-        df = pd.read_csv(csv_path)
-        row_count = len(df)
-
-        # Clear existing data
-        cursor = conn.cursor()
-        cursor.execute(f"DELETE FROM {table_name}")
+        stats = stream_csv_to_table(conn, csv_path, table_name)
         print(f" XX Cleared existing data from {table_name}")
-
-        # Load fresh data
-        df.to_sql(
-            name=table_name,
-            con=conn,
-            if_exists='append',
-            index=False
-        )
-
-        print(f"(-_-) Loaded {row_count} rows into {table_name} table from {csv_path.name}")
-        return row_count
+        print(f"(-_-) Loaded {stats['rows']} rows into {table_name} table from {csv_path.name} "
+              f"in {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/s)")
+        return stats["rows"]
 
     except Exception as e:
         print(f"XX Error loading {csv_path}: {e}")
@@ -39,33 +290,280 @@ def load_csv_to_table(conn, csv_path, table_name):
 
 
 
-def load_all_csv_data(conn):
+def sync_csv_file(conn, csv_path, table_name, delete_missing=False):
+    """
+    Incrementally sync one CSV file into its table, printing a summary.
+
+    Returns:
+        dict: inserted, updated, unchanged, deleted counts (empty if the file failed)
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        print(f"the CSV file is not found: {csv_path}")
+        return {}
+
+    try:
+        counts = sync_csv_to_table(conn, csv_path, table_name, delete_missing=delete_missing)
+        print(f"(-_-) Synced {table_name} from {csv_path.name}: {counts['inserted']} inserted, "
+              f"{counts['updated']} updated, {counts['unchanged']} unchanged, {counts['deleted']} deleted")
+        return counts
+
+    except Exception as e:
+        print(f"XX Error syncing {csv_path}: {e}")
+        return {}
+
+
+# Map CSV files to their tables using a dictionary
+CSV_MAPPINGS = {
+    'cyber_incidents.csv': 'cyber_incidents',
+    'datasets_metadata.csv': 'datasets_metadata',
+    'it_tickets.csv': 'it_tickets'
+}
+
+
+def load_all_csv_data(conn, mode="replace", delete_missing=False, data_dir=None):
     """
     Loading all CSV files into their respective tables.
 
     Args:
         conn: Database connection
+        mode: "replace" clears and reloads every table, "sync" only writes new or changed rows
+        delete_missing: In sync mode, also delete rows that are no longer in the CSV
+        data_dir: Folder with the CSV files (default: DATA/)
 
     Returns:
-        int: Total number of rows loaded
+        int: Total number of rows loaded (replace) or written (sync)
     """
-    # DB_PATH = Path(r"C:\Users\senda\Desktop\CW2_M01045908_CST1510\DATA")
-    data_dir = Path(r"C:\Users\senda\Desktop\CW2_M01045908_CST1510\DATA")
+    data_dir = Path(data_dir or DATA_DIR)
     total_rows = 0
 
-    # Map CSV files to their tables using a dictionary
-    csv_mappings = {
-        'cyber_incidents.csv': 'cyber_incidents',
-        'datasets_metadata.csv': 'datasets_metadata',
-        'it_tickets.csv': 'it_tickets'
-    }
-
-    for csv_file, table_name in csv_mappings.items():
+    for csv_file, table_name in CSV_MAPPINGS.items():
         csv_path = data_dir / csv_file
         if csv_path.exists():
-            rows_loaded = load_csv_to_table(conn, csv_path, table_name)
-            total_rows += rows_loaded
+            if mode == "sync":
+                counts = sync_csv_file(conn, csv_path, table_name, delete_missing)
+                total_rows += counts.get("inserted", 0) + counts.get("updated", 0)
+            else:
+                rows_loaded = load_csv_to_table(conn, csv_path, table_name)
+                total_rows += rows_loaded
         else:
             print(f"CSV file not found: {csv_file}")
 
-    return total_rows
\ No newline at end of file
+    return total_rows
+
+
+def get_column_types(conn, table_name):
+    """Return {column name: declared type} for a table."""
+    return {row[1]: (row[2] or "").upper() for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+
+
+def coerce_value(value, col_type):
+    """
+    Convert a CSV cell to the Python type matching the column's declared type.
+
+    Follows SQLite's affinity rules: '24.0' and '1e3' in an INTEGER column are
+    whole numbers and become 24 and 1000, '24.5' stays a float.
+    """
+    if value is None:
+        return None
+    try:
+        if "INT" in col_type:
+            try:
+                return int(value)
+            except ValueError:
+                number = float(value)
+                return int(number) if number.is_integer() else number
+        if "REAL" in col_type or "FLOA" in col_type or "DOUB" in col_type:
+            return float(value)
+    except (ValueError, OverflowError):
+        pass  # leave it as text, SQLite stores it as is
+    return value
+
+
+# set in each pool process by _init_parse_worker; a multiprocessing.Queue can only be
+# handed to a process when it starts, not passed with every task
+_chunk_queue = None
+
+
+def _init_parse_worker(queue):
+    global _chunk_queue
+    _chunk_queue = queue
+
+
+def parse_csv_worker(csv_path, table_name, column_types, chunk_size, queue=None):
+    """
+    Process pool worker: parse and type-coerce one CSV file.
+
+    Coerced chunks are put on the shared queue for the writer thread, followed by
+    a (table_name, None, error) marker once the file is finished.
+
+    Returns:
+        int: Number of rows parsed
+    """
+    queue = queue or _chunk_queue
+    row_count = 0
+    error = None
+    try:
+        for names, chunk in read_csv_chunks(csv_path, column_types, chunk_size):
+            types = [column_types[name] for name in names]
+            rows = [tuple(coerce_value(v, t) for v, t in zip(row, types)) for row in chunk]
+            queue.put((table_name, names, rows))
+            row_count += len(rows)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        queue.put((table_name, None, error))
+    return row_count
+
+
+def _next_chunk(queue, pending, futures, errors):
+    """
+    Next item the parse workers put on the queue, or None once no pending file can send more.
+
+    A worker process that dies never sends its end marker, so while the queue is
+    empty the workers' futures are checked and a file whose worker failed stops
+    being waited for.
+    """
+    while pending:
+        try:
+            return queue.get(timeout=QUEUE_POLL_SECONDS)
+        except Empty:
+            for table_name in list(pending):
+                future = futures[table_name]
+                # a worker that returned normally sent its marker, it's still on its way
+                if not future.done():
+                    continue
+                if future.cancelled():
+                    error = "worker cancelled"
+                elif future.exception() is not None:
+                    error = f"worker failed: {type(future.exception()).__name__}: {future.exception()}"
+                else:
+                    continue
+                pending.discard(table_name)
+                errors.setdefault(table_name, error)
+    return None
+
+
+def _write_parsed_chunks(db_path, tables, queue, futures, result):
+    """
+    Writer thread: the only code that touches the database during a parallel load.
+
+    All target tables are cleared and refilled inside one transaction, which is
+    committed once every worker has finished, or rolled back if any of them failed.
+    """
+    pending = set(tables)
+    inserted = {table: 0 for table in tables}
+    errors = {}
+    statements = {}
+    # filled in place, so the caller gets the counts and errors however the writer ends
+    result["inserted"] = inserted
+    result["errors"] = errors
+    conn = None
+    try:
+        conn = connect_database(db_path)
+        apply_pragmas(conn)
+        with bulk_load_pragmas(conn):
+            conn.execute("BEGIN")
+            for table_name in tables:
+                conn.execute(f'DELETE FROM "{table_name}"')
+
+            while pending:
+                item = _next_chunk(queue, pending, futures, errors)
+                if item is None:
+                    break
+                table_name, names, rows = item
+                if names is None:
+                    # end-of-file marker, the third item is the worker's error (if any)
+                    pending.discard(table_name)
+                    if rows:
+                        errors[table_name] = rows
+                    continue
+                if table_name in errors:
+                    continue
+                if table_name not in statements:
+                    column_list = ", ".join(f'"{name}"' for name in names)
+                    placeholders = ", ".join("?" for _ in names)
+                    statements[table_name] = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+                conn.executemany(statements[table_name], rows)
+                inserted[table_name] += len(rows)
+
+            if errors:
+                conn.rollback()
+            else:
+                conn.commit()
+    except Exception as e:
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+        errors["writer"] = f"{type(e).__name__}: {e}"
+        # keep draining so workers blocked on a full queue can finish
+        while pending:
+            item = _next_chunk(queue, pending, futures, errors)
+            if item is None:
+                break
+            if item[1] is None:
+                pending.discard(item[0])
+    finally:
+        if conn is not None:
+            conn.close()
+        invalidate(*tables)
+
+
+def load_all_csv_data_parallel(workers=None, data_dir=None, db_path=None, chunk_size=CHUNK_SIZE):
+    """
+    Load every CSV mapping at once: parsing runs in a process pool, one thread writes.
+
+    The workers parse and coerce their files in parallel and stream chunks to a
+    bounded queue, so total time is close to the slowest single file instead of
+    the sum of all of them, and memory stays bounded by the queue size.
+
+    Args:
+        workers: Parser processes (default: one per file, capped at the CPU count)
+        data_dir: Folder with the CSV files (default: DATA/)
+        db_path: Database to load into (default: the app database)
+        chunk_size: Rows per chunk sent from a worker to the writer
+
+    Returns:
+        dict: rows loaded per table, errors per table and elapsed seconds
+    """
+    data_dir = Path(data_dir or DATA_DIR)
+    jobs = {table_name: data_dir / csv_file
+            for csv_file, table_name in CSV_MAPPINGS.items()
+            if (data_dir / csv_file).exists()}
+    for csv_file, table_name in CSV_MAPPINGS.items():
+        if table_name not in jobs:
+            print(f"CSV file not found: {csv_file}")
+    if not jobs:
+        return {"rows": {}, "errors": {}, "seconds": 0.0}
+
+    conn = connect_database(db_path)
+    column_types = {table_name: get_column_types(conn, table_name) for table_name in jobs}
+    conn.close()
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    start = time.perf_counter()
+
+    # bounded so fast parsers can't run far ahead of the writer
+    queue = multiprocessing.Queue(maxsize=max(4, workers * 4))
+    result = {}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker,
+                             initargs=(queue,)) as pool:
+        futures = {table_name: pool.submit(parse_csv_worker, str(csv_path), table_name,
+                                           column_types[table_name], chunk_size)
+                   for table_name, csv_path in jobs.items()}
+        # the writer returns once every file has been written or has failed, failed
+        # workers (even ones whose process died) are reported in result["errors"]
+        writer = threading.Thread(target=_write_parsed_chunks,
+                                  args=(db_path, list(jobs), queue, futures, result))
+        writer.start()
+        writer.join()
+
+    seconds = time.perf_counter() - start
+    for table_name, error in result["errors"].items():
+        print(f"XX Error loading {table_name}: {error}")
+    if not result["errors"]:
+        total = sum(result["inserted"].values())
+        print(f"(-_-) Loaded {total} rows into {len(jobs)} tables with {workers} workers "
+              f"in {seconds:.2f}s ({total / seconds if seconds else 0:,.0f} rows/s)")
+
+    return {"rows": result["inserted"], "errors": result["errors"], "seconds": seconds}
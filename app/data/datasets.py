@@ -1,103 +1,171 @@
-import sqlite3
-import pandas as pd
-import bcrypt
-from pathlib import Path
-from app.data.db import connect_database
+from app.data.bulk import bulk_delete, bulk_insert
+from app.data.cache import cached_query, invalidates
+from app.data.db import get_connection
+from app.data.pagination import check_sort_column, keyset_page
+from app.data.rows import ColumnarResult, DatasetRow
 
 
+@invalidates("datasets_metadata")
 def insert_into_datasets(dataset_id,name,rows,columns,uploaded_by,upload_date):
-    conn = connect_database()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    INSERT INTO datasets_metadata
-    (dataset_id,name,rows,columns,uploaded_by,upload_date)
-    VALUES(?, ?, ?, ?, ?, ?)
-    """, (dataset_id,name,rows,columns,uploaded_by,upload_date))
-
-    conn.commit()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO datasets_metadata
+        (dataset_id,name,rows,columns,uploaded_by,upload_date)
+        VALUES(?, ?, ?, ?, ?, ?)
+        """, (dataset_id,name,rows,columns,uploaded_by,upload_date))
+        cursor.close()
 
+@invalidates("datasets_metadata")
 def delete_from_datasets(dataset_id):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-    DELETE FROM datasets_metadata WHERE dataset_id = ?
-    """, (dataset_id,)
-                   )
-    conn.commit()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        DELETE FROM datasets_metadata WHERE dataset_id = ?
+        """, (dataset_id,)
+                       )
+        cursor.close()
 
 def get_all_datasets():
-    """Get all datasets"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM datasets_metadata ORDER BY upload_date DESC")
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get all datasets, as row tuples"""
+    return list(get_all_datasets_columnar())
 
+@cached_query("datasets_metadata")
 def get_dataset_by_id(dataset_id):
     """Get specific dataset by ID"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM datasets_metadata WHERE dataset_id = ?", (dataset_id,))
-    result = cursor.fetchone()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM datasets_metadata WHERE dataset_id = ?", (dataset_id,))
+        result = DatasetRow.from_row(cursor.fetchone())
+        cursor.close()
     return result
 
 def get_large_datasets():
-    """Get datasets with more than 10,000 rows"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM datasets_metadata WHERE rows > 10000 ORDER BY rows DESC")
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get datasets with more than 10,000 rows, as row tuples"""
+    return list(get_large_datasets_columnar())
 
 def get_old_datasets():
-    """Get datasets older than 6 months"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT * FROM datasets_metadata 
-        WHERE JULIANDAY('now') - JULIANDAY(upload_date) > 180
-        ORDER BY upload_date ASC
-    """)
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get datasets older than 6 months, as row tuples"""
+    return list(get_old_datasets_columnar())
 
 def get_user_datasets(username):
-    """Get all datasets uploaded by a user"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM datasets_metadata WHERE uploaded_by = ?", (username,))
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get all datasets uploaded by a user, as row tuples"""
+    return list(get_user_datasets_columnar(username))
 
+@cached_query("datasets_metadata")
 def get_dataset_stats():
     """Get basic dataset statistics"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT 
-            COUNT(*) as total_datasets,
-            SUM(rows) as total_rows,
-            AVG(rows) as avg_rows
-        FROM datasets_metadata
-    """)
-    result = cursor.fetchone()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                COUNT(*) as total_datasets,
+                SUM(rows) as total_rows,
+                AVG(rows) as avg_rows
+            FROM datasets_metadata
+        """)
+        result = cursor.fetchone()
+        cursor.close()
     return result
 
 def get_recent_uploads(limit=10):
-    """Get most recent dataset uploads"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM datasets_metadata ORDER BY upload_date DESC LIMIT ?", (limit,))
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get most recent dataset uploads, as row tuples"""
+    return list(get_recent_uploads_columnar(limit))
+
+
+def _dataset_filters(min_rows=None, max_rows=None, uploaded_by=None):
+    # WHERE clause for the dataset page filters, the same ones as the sidebar
+    clauses = []
+    params = []
+    if min_rows is not None:
+        clauses.append("rows >= ?")
+        params.append(int(min_rows))
+    if max_rows is not None:
+        clauses.append("rows <= ?")
+        params.append(int(max_rows))
+    if uploaded_by and uploaded_by != "All":
+        clauses.append("uploaded_by = ?")
+        params.append(uploaded_by)
+    return " AND ".join(clauses), params
+
+
+# columns the dataset pages can be sorted by
+DATASET_SORT_COLUMNS = ["upload_date", "dataset_id", "name", "rows", "uploaded_by"]
+
+
+@cached_query("datasets_metadata")
+def get_datasets_page(last_key=None, page_size=50, sort_column="upload_date", descending=True,
+                      min_rows=None, max_rows=None, uploaded_by=None):
+    """
+    One page of datasets using keyset pagination, optionally filtered by row count and uploader.
+
+    Returns:
+        tuple: (ColumnarResult of up to page_size datasets, cursor for the next page or None)
+    """
+    check_sort_column(sort_column, DATASET_SORT_COLUMNS)
+    condition, params = _dataset_filters(min_rows, max_rows, uploaded_by)
+    with get_connection() as conn:
+        columns, rows, next_key = keyset_page(
+            conn, "datasets_metadata", "dataset_id", sort_column, last_key, page_size,
+            descending, condition, params
+        )
+    return ColumnarResult.from_rows(columns, rows), next_key
+
+
+# The list queries. Each result is kept column by column (see rows.py), which builds
+# DataFrames without row tuples; the row list functions above wrap these
+def _select_columnar(sql, params=()):
+    with get_connection() as conn:
+        return ColumnarResult.from_cursor(conn.execute(sql, params))
+
+
+@cached_query("datasets_metadata")
+def get_all_datasets_columnar():
+    """Get all datasets as a ColumnarResult"""
+    return _select_columnar("SELECT * FROM datasets_metadata ORDER BY upload_date DESC")
+
+
+@cached_query("datasets_metadata")
+def get_large_datasets_columnar():
+    """Get datasets with more than 10,000 rows as a ColumnarResult"""
+    return _select_columnar("SELECT * FROM datasets_metadata WHERE rows > 10000 ORDER BY rows DESC")
+
+
+def get_old_datasets_columnar():
+    """Get datasets older than 6 months as a ColumnarResult (not cached, depends on today's date)"""
+    return _select_columnar("""
+        SELECT * FROM datasets_metadata
+        WHERE JULIANDAY('now') - JULIANDAY(upload_date) > 180
+        ORDER BY upload_date ASC
+    """)
+
+
+@cached_query("datasets_metadata")
+def get_user_datasets_columnar(username):
+    """Get all datasets uploaded by a user as a ColumnarResult"""
+    return _select_columnar("SELECT * FROM datasets_metadata WHERE uploaded_by = ?", (username,))
+
+
+@cached_query("datasets_metadata")
+def get_recent_uploads_columnar(limit=10):
+    """Get most recent dataset uploads as a ColumnarResult"""
+    return _select_columnar("SELECT * FROM datasets_metadata ORDER BY upload_date DESC LIMIT ?", (limit,))
+
+
+# Batch writes: one transaction and one executemany per call, rows that can't be
+# applied are reported back as (dataset_id, reason) instead of failing the batch
+DATASET_COLUMNS = list(DatasetRow._fields)
+
+
+@invalidates("datasets_metadata")
+def insert_datasets(rows, columns=None):
+    """Insert many datasets, rows are tuples in columns (default DATASET_COLUMNS) order. Returns inserted and conflicts."""
+    with get_connection() as conn:
+        return bulk_insert(conn, "datasets_metadata", "dataset_id", columns or DATASET_COLUMNS, rows)
+
 
+@invalidates("datasets_metadata")
+def delete_datasets(dataset_ids):
+    """Delete many datasets. Returns deleted and conflicts (ids not found)."""
+    with get_connection() as conn:
+        return bulk_delete(conn, "datasets_metadata", "dataset_id", dataset_ids)
@@ -1,18 +1,227 @@
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
-DB_PATH = Path(r"C:\Users\senda\Desktop\CW2_M01045908_CST1510\DATA") / "intelligence_platform.db"
+from app.data.profiler import ProfiledConnection
+
+# DATA/ sits at the project root, two levels above app/data/
+DATA_DIR = Path(__file__).resolve().parents[2] / "DATA"
+DB_PATH = DATA_DIR / "intelligence_platform.db"
+
+# pragmas applied once to every pooled connection when it is first opened
+PRAGMAS = {
+    # first, so switching to WAL below waits for a lock instead of failing with "database is locked"
+    "busy_timeout": 5000,       # wait up to 5s for a lock instead of failing straight away
+    "journal_mode": "WAL",      # readers don't block the writer and vice versa
+    "synchronous": "NORMAL",    # safe with WAL and much cheaper than FULL
+    "cache_size": -16000,       # negative means KiB, so roughly 16MB of page cache
+}
 
-def connect_database(db_path=DB_PATH):
-    """Connect to SQLite database."""
 
+def connect_database(db_path=None):
+    """Connect to SQLite database."""
+    db_path = Path(db_path or DB_PATH)
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(str(DB_PATH))
+    return sqlite3.connect(str(db_path), factory=ProfiledConnection)
+
+
+def apply_pragmas(conn, pragmas=None):
+    """Apply the connection pragmas to an open connection."""
+    for name, value in (pragmas or PRAGMAS).items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def fts_query(search_term):
+    """
+    Turn free text typed by a user into a safe FTS5 MATCH expression.
+
+    Every word is quoted (so FTS operators and punctuation can't break the query)
+    and prefix-matched, and all words must appear: "phish email" -> "phish"* "email"*
+
+    Returns:
+        str: MATCH expression, or "" if the term has no searchable words
+    """
+    words = re.findall(r"\w+", search_term or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class ConnectionPool:
+    """
+    Keeps one open SQLite connection per thread and hands it out again on every call.
+
+    A connection per thread means no locking around the connection itself and no
+    reconnect cost per query. Streamlit runs each rerun of a page on a new script
+    thread, so in the app that is one connection per rerun (shared by every query
+    of that rerun), not one per session. Connections belonging to threads that
+    have finished are closed the next time a new connection is opened.
+    """
+
+    def __init__(self, db_path=None, pragmas=None):
+        self.db_path = Path(db_path or DB_PATH)
+        self.pragmas = dict(PRAGMAS if pragmas is None else pragmas)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread ident -> (thread, connection)
+        self._stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "acquisitions": 0,
+            "reuses": 0,
+            "commits": 0,
+            "rollbacks": 0,
+        }
+
+    def _open(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # the pool makes sure a connection is only used by its own thread, but
+        # check_same_thread is off so dead threads' connections can be closed here
+        # ProfiledConnection only adds timing while app.data.profiler is enabled
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, factory=ProfiledConnection)
+        apply_pragmas(conn, self.pragmas)
+        return conn
+
+    def _prune_dead_threads(self):
+        # called with self._lock held
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._connections[ident]
+                self._stats["connections_closed"] += 1
+
+    def acquire(self):
+        """Return the connection owned by the current thread, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        with self._lock:
+            self._stats["acquisitions"] += 1
+            if conn is not None:
+                self._stats["reuses"] += 1
+                return conn
+
+            self._prune_dead_threads()
+            conn = self._open()
+            thread = threading.current_thread()
+            self._connections[thread.ident] = (thread, conn)
+            self._stats["connections_opened"] += 1
+
+        self._local.conn = conn
+        self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager around the thread's connection.
+
+        Commits when the outermost block exits cleanly and rolls back if it raises,
+        so nested blocks (e.g. a bulk function calling a single-row one) share one transaction.
+        """
+        conn = self.acquire()
+        self._local.depth += 1
+        try:
+            yield conn
+        except Exception:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.rollback()
+                with self._lock:
+                    self._stats["rollbacks"] += 1
+            raise
+        else:
+            self._local.depth -= 1
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.commit()
+                with self._lock:
+                    self._stats["commits"] += 1
+
+    def close_all(self):
+        """Close every pooled connection (e.g. at shutdown or before swapping databases)."""
+        with self._lock:
+            for ident, (thread, conn) in list(self._connections.items()):
+                conn.close()
+                self._stats["connections_closed"] += 1
+            self._connections.clear()
+        self._local = threading.local()
+
+    def stats(self):
+        """Return a snapshot of the pool statistics."""
+        with self._lock:
+            self._prune_dead_threads()
+            stats = dict(self._stats)
+            stats["open_connections"] = len(self._connections)
+        stats["db_path"] = str(self.db_path)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def init_database(db_path=None):
+    """
+    Create the tables and run pending migrations, once per process.
+
+    Nothing touches the database at import time any more; this runs on the first
+    get_connection() call (or can be called explicitly, e.g. from main.py).
+    Calling it again is a no-op unless a different db_path is given.
+
+    Returns:
+        bool: True if initialization ran, False if it had already been done
+    """
+    global _pool, _initialized, DB_PATH
+    with _init_lock:
+        if db_path is not None and Path(db_path) != DB_PATH:
+            # switching databases: drop the old pool so new connections use the new path
+            DB_PATH = Path(db_path)
+            with _pool_lock:
+                if _pool is not None:
+                    _pool.close_all()
+                _pool = None
+            _initialized = False
+
+        if _initialized:
+            return False
+
+        # imported here so importing db.py stays cheap
+        from app.data.schema import create_all_tables
 
+        conn = get_pool().acquire()
+        create_all_tables(conn)
+        if conn.in_transaction:
+            conn.commit()
+        _initialized = True
+        return True
 
-connect_database(DB_PATH)
 
+def get_connection():
+    """
+    Borrow the current thread's pooled connection.
 
+    Usage:
+        with get_connection() as conn:
+            conn.execute(...)
+    """
+    if not _initialized:
+        init_database()
+    return get_pool().connection()
 
 
+def pool_stats():
+    """Return statistics for the process wide connection pool."""
+    return get_pool().stats()
 
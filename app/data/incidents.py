@@ -1,132 +1,324 @@
-import sqlite3
 import pandas as pd
-import bcrypt
-from pathlib import Path
-from app.data.db import connect_database
+from app.data.bulk import bulk_delete, bulk_insert, bulk_update
+from app.data.cache import cached_query, invalidates
+from app.data.db import fts_query, get_connection
+from app.data.pagination import check_sort_column, keyset_page
 
 
+@invalidates("cyber_incidents")
 def insert_incident(incident_id, timestamp, severity, category, status, description, reported_by):
     # inserting into the incidents table
-    conn = connect_database()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    INSERT INTO cyber_incidents 
-    (incident_id, timestamp, severity, category, status, description, reported_by)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (incident_id, timestamp, severity, category, status, description, reported_by))
-    conn.commit()
-    incident_id = cursor.lastrowid
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO cyber_incidents
+        (incident_id, timestamp, severity, category, status, description, reported_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (incident_id, timestamp, severity, category, status, description, reported_by))
+        incident_id = cursor.lastrowid
+        cursor.close()
     return incident_id
 
 
+@cached_query("cyber_incidents")
 def get_all_incidents():
     # function to get all incidents as a data frame
-    conn = connect_database()
-    df = pd.read_sql_query("SELECT * FROM cyber_incidents ORDER BY incident_id DESC ", conn)
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM cyber_incidents ORDER BY incident_id DESC ", conn)
     return df
 
+@cached_query("cyber_incidents")
+def get_latest_incidents(limit=10):
+    # function to get the newest incidents without loading the whole table.
+    # incident_id is TEXT ('999' sorts above '1000'), so newest goes by timestamp,
+    # which walks idx_incidents_timestamp backwards and stops after `limit` rows
+    with get_connection() as conn:
+        df = pd.read_sql_query("SELECT * FROM cyber_incidents ORDER BY timestamp DESC LIMIT ?", conn,
+                               params=(limit,))
+    return df
+
+@cached_query("cyber_incidents")
 def get_incident_by_id(incident_id):
     # function to get incidents by id
-    conn = connect_database()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "SELECT * FROM cyber_incidents WHERE id = ?",
-        (incident_id,),
-    )
-
-    incident = cursor.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM cyber_incidents WHERE id = ?",
+            (incident_id,),
+        )
+        incident = cursor.fetchone()
+        cursor.close()
     return incident
 
 
+@cached_query("cyber_incidents")
 def get_incident_by_type(incident_type):
     # function to get incidents by type
-    conn = connect_database()
-    cursor = conn.cursor()
-
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents WHERE incident_type = ? ORDER BY DESC",
-        conn,
-        params=(incident_type,)
-    )
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query(
+            "SELECT * FROM cyber_incidents WHERE incident_type = ? ORDER BY DESC",
+            conn,
+            params=(incident_type,)
+        )
     return df
 
+@cached_query("cyber_incidents")
 def get_incident_by_severity(severity):
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents WHERE severity = ? ORDER BY DESC",
-        conn,
-        params=(severity,)
-    )
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query(
+            "SELECT * FROM cyber_incidents WHERE severity = ? ORDER BY DESC",
+            conn,
+            params=(severity,)
+        )
     return df
 
 
+@invalidates("cyber_incidents")
 def update_incident_status(incident_id, new_status):
     # function to update incident status
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE cyber_incidents SET status = ? WHERE id = ?",
-        (new_status, incident_id)
-    )
-    conn.commit()
-    row_count = cursor.rowcount
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE cyber_incidents SET status = ? WHERE id = ?",
+            (new_status, incident_id)
+        )
+        row_count = cursor.rowcount
+        cursor.close()
     return row_count
 
+@invalidates("cyber_incidents")
 def delete_incident(incident_id):
     # function to delete incident
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "DELETE FROM cyber_incidents WHERE id = ?",
-        (incident_id,)
-    )
-    conn.commit()
-    row_count = cursor.rowcount
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM cyber_incidents WHERE id = ?",
+            (incident_id,)
+        )
+        row_count = cursor.rowcount
+        cursor.close()
     return row_count
 
+@cached_query("cyber_incidents")
 def get_incidents_by_status(status):
     # function to get incidents by status
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents WHERE status = ? ORDER BY timestamp DESC",
-        conn,
-        params=(status,)
-    )
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query(
+            "SELECT * FROM cyber_incidents WHERE status = ? ORDER BY timestamp DESC",
+            conn,
+            params=(status,)
+        )
     return df
 
+@cached_query("cyber_incidents")
 def get_incident_stats():
-    # function to get incident statistics
-    conn = connect_database()
-    df = pd.read_sql_query("""
-        SELECT 
-            severity,
-            status,
-            COUNT(*) as count
-        FROM cyber_incidents 
-        GROUP BY severity, status
-        ORDER BY severity, status
-    """, conn)
-    conn.close()
+    # function to get incident statistics, read from the daily rollup
+    with get_connection() as conn:
+        df = pd.read_sql_query("""
+            SELECT
+                NULLIF(severity, '') AS severity,
+                NULLIF(status, '') AS status,
+                SUM(count) as count
+            FROM incident_daily_rollup
+            GROUP BY severity, status
+            ORDER BY severity, status
+        """, conn)
     return df
 
+@cached_query("cyber_incidents")
 def search_incidents(search_term):
     # function to search incidents by description
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents WHERE description LIKE ? ORDER BY timestamp DESC",
-        conn,
-        params=(f'%{search_term}%',)
-    )
-    conn.close()
+    with get_connection() as conn:
+        df = pd.read_sql_query(
+            "SELECT * FROM cyber_incidents WHERE description LIKE ? ORDER BY timestamp DESC",
+            conn,
+            params=(f'%{search_term}%',)
+        )
     return df
+
+@cached_query("cyber_incidents")
+def search_incidents_ranked(search_term, limit=50):
+    # full-text search over descriptions, best matches (bm25) first, with a highlighted snippet
+    match = fts_query(search_term)
+    with get_connection() as conn:
+        if not match:
+            return pd.read_sql_query("SELECT *, '' AS snippet, 0.0 AS rank FROM cyber_incidents LIMIT 0", conn)
+        df = pd.read_sql_query("""
+            SELECT
+                i.*,
+                snippet(cyber_incidents_fts, 0, '**', '**', '...', 12) AS snippet,
+                bm25(cyber_incidents_fts) AS rank
+            FROM cyber_incidents_fts
+            JOIN cyber_incidents i ON i.rowid = cyber_incidents_fts.rowid
+            WHERE cyber_incidents_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, conn, params=(match, limit))
+    return df
+
+
+def _incident_filters(start_date=None, end_date=None, category=None, severity=None, status=None,
+                      rollup=False):
+    # builds the shared WHERE clause for query_incidents; dates are compared as text
+    # against the 'YYYY-MM-DD HH:MM:SS' timestamps so the timestamp index can be used.
+    # With rollup=True the clause is for incident_daily_rollup, which has a day column
+    clauses = []
+    params = []
+    if start_date:
+        clauses.append("day >= ?" if rollup else "timestamp >= ?")
+        params.append(str(start_date))
+    if end_date:
+        # everything up to the end of end_date
+        clauses.append("day <= ?" if rollup else "timestamp < date(?, '+1 day')")
+        params.append(str(end_date))
+    for column, value in (("category", category), ("severity", severity), ("status", status)):
+        if value and value != "All":
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    return " AND ".join(clauses), params
+
+
+@cached_query("cyber_incidents")
+def get_incident_filter_options():
+    # function to get the values the dashboard filters can offer, without loading the table
+    with get_connection() as conn:
+        options = {}
+        for column in ("category", "severity", "status"):
+            rows = conn.execute(
+                f"SELECT DISTINCT {column} FROM cyber_incidents WHERE {column} IS NOT NULL ORDER BY {column}"
+            ).fetchall()
+            options[column] = [row[0] for row in rows]
+        min_ts, max_ts = conn.execute("SELECT MIN(timestamp), MAX(timestamp) FROM cyber_incidents").fetchone()
+    options["min_date"] = pd.to_datetime(min_ts).date() if min_ts else None
+    options["max_date"] = pd.to_datetime(max_ts).date() if max_ts else None
+    return options
+
+
+# dimensions of incident_daily_rollup
+ROLLUP_DIMENSIONS = ["day", "severity", "category", "status"]
+
+
+@cached_query("cyber_incidents")
+def get_incident_rollup(group_by=("day",), start_date=None, end_date=None, category=None, severity=None,
+                        status=None):
+    """
+    Incident counts from the daily rollup table, grouped by any of day, severity, category, status.
+
+    The rollup is kept up to date by triggers on cyber_incidents, so this reads
+    at most one row per (day, severity, category, status) instead of every incident.
+
+    Returns:
+        DataFrame: the group_by columns plus count, biggest count first (by day: in date order)
+    """
+    group_by = list(group_by)
+    for column in group_by:
+        check_sort_column(column, ROLLUP_DIMENSIONS)
+    condition, params = _incident_filters(start_date, end_date, category, severity, status, rollup=True)
+    where = f"WHERE {condition}" if condition else ""
+    # '' in the rollup stands for NULL in cyber_incidents
+    select = ", ".join(f"NULLIF({column}, '') AS {column}" for column in group_by)
+    order = "day" if group_by == ["day"] else "count DESC"
+
+    with get_connection() as conn:
+        if not group_by:
+            return pd.read_sql_query(f"SELECT COALESCE(SUM(count), 0) AS count FROM incident_daily_rollup {where}",
+                                     conn, params=params)
+        return pd.read_sql_query(
+            f"""SELECT {select}, SUM(count) AS count FROM incident_daily_rollup {where}
+                GROUP BY {", ".join(group_by)} ORDER BY {order}""",
+            conn, params=params
+        )
+
+
+@cached_query("cyber_incidents")
+def query_incidents(start_date=None, end_date=None, category=None, severity=None, status=None,
+                    limit=500, offset=0):
+    """
+    Filter incidents and compute the dashboard aggregates inside SQLite.
+
+    Every filter is optional ("All" or None means no filter). Only one page of rows
+    is returned (none with limit=0, for callers that page the rows themselves);
+    the counts cover every matching incident and come from the daily rollup table.
+
+    Returns:
+        dict with
+            rows: DataFrame with at most `limit` matching incidents, newest first
+            total: number of matching incidents
+            phishing: matching incidents whose category contains 'phishing'
+            by_category, by_status, by_severity: DataFrames of (value, count)
+            by_day: DataFrame of (day, count) in date order
+    """
+    filters = (start_date, end_date, category, severity, status)
+    condition, params = _incident_filters(*filters)
+    where = f"WHERE {condition}" if condition else ""
+
+    if limit:
+        with get_connection() as conn:
+            rows = pd.read_sql_query(
+                f"SELECT * FROM cyber_incidents {where} ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+                conn, params=(*params, limit, offset)
+            )
+    else:
+        # aggregates only, the filtered SELECT isn't run at all
+        rows = pd.DataFrame(columns=INCIDENT_COLUMNS)
+    result = {"rows": rows}
+
+    by_category = get_incident_rollup(("category",), *filters)
+    result["total"] = int(by_category["count"].sum())
+    result["phishing"] = int(
+        by_category.loc[by_category["category"].str.contains("phishing", case=False, na=False), "count"].sum()
+    )
+    result["by_category"] = by_category
+    result["by_status"] = get_incident_rollup(("status",), *filters)
+    result["by_severity"] = get_incident_rollup(("severity",), *filters)
+    result["by_day"] = get_incident_rollup(("day",), *filters)
+    return result
+
+
+# columns the incident pages can be sorted by (all indexed or the primary key)
+INCIDENT_SORT_COLUMNS = ["timestamp", "incident_id", "severity", "status", "category"]
+
+
+@cached_query("cyber_incidents")
+def get_incidents_page(last_key=None, page_size=50, sort_column="timestamp", descending=True,
+                       start_date=None, end_date=None, category=None, severity=None, status=None):
+    """
+    One page of incidents using keyset pagination, optionally filtered like query_incidents.
+
+    Returns:
+        tuple: (DataFrame of up to page_size incidents, cursor for the next page or None)
+    """
+    check_sort_column(sort_column, INCIDENT_SORT_COLUMNS)
+    condition, params = _incident_filters(start_date, end_date, category, severity, status)
+    with get_connection() as conn:
+        columns, rows, next_key = keyset_page(
+            conn, "cyber_incidents", "incident_id", sort_column, last_key, page_size,
+            descending, condition, params
+        )
+    return pd.DataFrame(rows, columns=columns), next_key
+
+
+# Batch writes: one transaction and one executemany per call, rows that can't be
+# applied are reported back as (incident_id, reason) instead of failing the batch
+INCIDENT_COLUMNS = ["incident_id", "timestamp", "severity", "category", "status", "description", "reported_by"]
+
+
+@invalidates("cyber_incidents")
+def insert_incidents(rows, columns=None):
+    """Insert many incidents, rows are tuples in columns (default INCIDENT_COLUMNS) order. Returns inserted and conflicts."""
+    with get_connection() as conn:
+        return bulk_insert(conn, "cyber_incidents", "incident_id", columns or INCIDENT_COLUMNS, rows)
+
+
+@invalidates("cyber_incidents")
+def update_incidents_status(incident_ids, new_status):
+    """Set the status of many incidents. Returns updated and conflicts (ids not found)."""
+    with get_connection() as conn:
+        return bulk_update(conn, "cyber_incidents", "incident_id", {"status": new_status}, incident_ids)
+
+
+@invalidates("cyber_incidents")
+def delete_incidents(incident_ids):
+    """Delete many incidents. Returns deleted and conflicts (ids not found)."""
+    with get_connection() as conn:
+        return bulk_delete(conn, "cyber_incidents", "incident_id", incident_ids)
@@ -0,0 +1,73 @@
+"""
+Dashboard metrics read from the table_counters table.
+
+The counters are kept up to date by triggers (see migration 6), so every
+function here is a primary key lookup no matter how big the tables get.
+"""
+from app.data.db import get_connection
+from app.data.migrations import COUNTED_TABLES
+
+
+def get_total(table_name):
+    # function to get the number of rows in a counted table
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT count FROM table_counters WHERE table_name = ? AND group_col = '' AND group_value = ''",
+            (table_name,)
+        ).fetchone()
+    return row[0] if row else 0
+
+
+def get_group_counts(table_name, group_col):
+    # function to get {value: count} for one of the grouped columns, biggest first
+    with get_connection() as conn:
+        rows = conn.execute(
+            """SELECT group_value, count FROM table_counters
+               WHERE table_name = ? AND group_col = ? AND count > 0
+               ORDER BY count DESC""",
+            (table_name, group_col)
+        ).fetchall()
+    return {value if value != "" else "Unknown": count for value, count in rows}
+
+
+def get_dashboard_metrics():
+    """
+    Totals for the admin dashboard in a single query.
+
+    Returns:
+        dict: {"users": int, "incidents": int, "tickets": int, "datasets": int}
+    """
+    names = {"users": "users", "cyber_incidents": "incidents",
+             "it_tickets": "tickets", "datasets_metadata": "datasets"}
+    metrics = dict.fromkeys(names.values(), 0)
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT table_name, count FROM table_counters WHERE group_col = '' AND group_value = ''"
+        ).fetchall()
+    for table_name, count in rows:
+        if table_name in names:
+            metrics[names[table_name]] = count
+    return metrics
+
+
+def rebuild_counters(conn):
+    """
+    Recount every counter from the tables themselves.
+
+    Only needed if rows were changed with the triggers dropped or disabled.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM table_counters")
+    for table, columns in COUNTED_TABLES.items():
+        cursor.execute(
+            f"INSERT INTO table_counters (table_name, group_col, group_value, count) "
+            f"SELECT '{table}', '', '', COUNT(*) FROM {table}"
+        )
+        for column in columns:
+            cursor.execute(
+                f"INSERT INTO table_counters (table_name, group_col, group_value, count) "
+                f"SELECT '{table}', '{column}', COALESCE({column}, ''), COUNT(*) FROM {table} "
+                f"GROUP BY COALESCE({column}, '')"
+            )
+    cursor.close()
+    conn.commit()
@@ -0,0 +1,286 @@
+"""
+Versioned schema migrations.
+
+The database version is stored in PRAGMA user_version. Every migration has a
+number, a short description and the statements that bring the schema from the
+previous version to that number. apply_migrations() runs only the migrations
+newer than the stored version, each one in its own transaction, so it is safe
+to call on every start-up.
+"""
+
+
+def _counter_statements(table, group_columns):
+    """
+    Triggers that keep table_counters in step with `table`, plus the backfill.
+
+    The total is stored with group_col = '' and every grouped counter under
+    (group column, value); NULL values are counted under ''.
+    """
+    def bump(prefix, sign):
+        # one upsert for the total and one per grouped column
+        rows = [("''", "''")] + [(f"'{column}'", f"COALESCE({prefix}.{column}, '')") for column in group_columns]
+        return "\n".join(
+            f"""INSERT INTO table_counters (table_name, group_col, group_value, count)
+            VALUES ('{table}', {column}, {value}, {sign})
+            ON CONFLICT (table_name, group_col, group_value) DO UPDATE SET count = count + ({sign});"""
+            for column, value in rows
+        )
+
+    statements = [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_count_ai AFTER INSERT ON {table} BEGIN
+            {bump("new", 1)}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_count_ad AFTER DELETE ON {table} BEGIN
+            {bump("old", -1)}
+        END""",
+        f"DELETE FROM table_counters WHERE table_name = '{table}'",
+        f"""INSERT INTO table_counters (table_name, group_col, group_value, count)
+            SELECT '{table}', '', '', COUNT(*) FROM {table}""",
+    ]
+    for column in group_columns:
+        # moving a row to another group is an update, not an insert/delete
+        statements.append(
+            f"""CREATE TRIGGER IF NOT EXISTS {table}_count_au_{column} AFTER UPDATE OF {column} ON {table}
+            WHEN old.{column} IS NOT new.{column} BEGIN
+                INSERT INTO table_counters (table_name, group_col, group_value, count)
+                VALUES ('{table}', '{column}', COALESCE(old.{column}, ''), -1)
+                ON CONFLICT (table_name, group_col, group_value) DO UPDATE SET count = count - 1;
+                INSERT INTO table_counters (table_name, group_col, group_value, count)
+                VALUES ('{table}', '{column}', COALESCE(new.{column}, ''), 1)
+                ON CONFLICT (table_name, group_col, group_value) DO UPDATE SET count = count + 1;
+            END"""
+        )
+        statements.append(
+            f"""INSERT INTO table_counters (table_name, group_col, group_value, count)
+            SELECT '{table}', '{column}', COALESCE({column}, ''), COUNT(*) FROM {table}
+            GROUP BY COALESCE({column}, '')"""
+        )
+    return statements
+
+
+# tables with maintained row counts and the columns they are also counted by
+COUNTED_TABLES = {
+    "users": [],
+    "cyber_incidents": ["status", "severity"],
+    "it_tickets": ["status", "priority"],
+    "datasets_metadata": [],
+}
+
+# key of an incident in incident_daily_rollup, NULLs are stored as ''
+_ROLLUP_KEY = ("substr(COALESCE({row}.timestamp, ''), 1, 10), COALESCE({row}.severity, ''), "
+               "COALESCE({row}.category, ''), COALESCE({row}.status, '')")
+_ROLLUP_ADD = """INSERT INTO incident_daily_rollup (day, severity, category, status, count)
+            VALUES ({key}, 1)
+            ON CONFLICT (day, severity, category, status) DO UPDATE SET count = count + 1;"""
+_ROLLUP_REMOVE = """UPDATE incident_daily_rollup SET count = count - 1
+            WHERE (day, severity, category, status) = ({key});
+            DELETE FROM incident_daily_rollup WHERE (day, severity, category, status) = ({key}) AND count <= 0;"""
+
+# (version, description, statements) - append new migrations at the end, never edit old ones
+MIGRATIONS = [
+    (1, "cyber_incidents indexes", [
+        # get_incidents_by_status filters on status and orders by timestamp
+        "CREATE INDEX IF NOT EXISTS idx_incidents_status_timestamp ON cyber_incidents (status, timestamp)",
+        # get_incident_stats groups by severity, status - covering, so the table is never touched
+        "CREATE INDEX IF NOT EXISTS idx_incidents_severity_status ON cyber_incidents (severity, status)",
+        "CREATE INDEX IF NOT EXISTS idx_incidents_category ON cyber_incidents (category)",
+        # ORDER BY timestamp DESC on searches and date range filters
+        "CREATE INDEX IF NOT EXISTS idx_incidents_timestamp ON cyber_incidents (timestamp)",
+    ]),
+    (2, "it_tickets indexes", [
+        # get_tickets_by_assignee and get_slowest_staff (covering for the GROUP BY assigned_to)
+        "CREATE INDEX IF NOT EXISTS idx_tickets_assigned_status ON it_tickets (assigned_to, status)",
+        # get_tickets_by_status and get_slowest_status
+        "CREATE INDEX IF NOT EXISTS idx_tickets_status ON it_tickets (status)",
+        # get_all_tickets / get_oldest_pending_tickets order by created_at
+        "CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON it_tickets (created_at)",
+        # get_avg_resolution_time reads only these two columns
+        "CREATE INDEX IF NOT EXISTS idx_tickets_priority_resolution ON it_tickets (priority, resolution_time_hours)",
+    ]),
+    (3, "datasets_metadata indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_datasets_uploaded_by ON datasets_metadata (uploaded_by)",
+        # get_all_datasets / get_recent_uploads / get_old_datasets order by upload_date
+        "CREATE INDEX IF NOT EXISTS idx_datasets_upload_date ON datasets_metadata (upload_date)",
+    ]),
+    # full-text indexes over the descriptions. They are external content tables, so the
+    # text is only stored once; the triggers keep them in step with every insert/update/delete.
+    # incident_id is TEXT, so this index follows the implicit rowid: VACUUM only through
+    # vacuum_database(), which rebuilds it
+    (4, "cyber_incidents full-text search", [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS cyber_incidents_fts USING fts5(
+            description, content='cyber_incidents', content_rowid='rowid', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS cyber_incidents_fts_ai AFTER INSERT ON cyber_incidents BEGIN
+            INSERT INTO cyber_incidents_fts (rowid, description) VALUES (new.rowid, new.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS cyber_incidents_fts_ad AFTER DELETE ON cyber_incidents BEGIN
+            INSERT INTO cyber_incidents_fts (cyber_incidents_fts, rowid, description)
+            VALUES ('delete', old.rowid, old.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS cyber_incidents_fts_au AFTER UPDATE OF description ON cyber_incidents BEGIN
+            INSERT INTO cyber_incidents_fts (cyber_incidents_fts, rowid, description)
+            VALUES ('delete', old.rowid, old.description);
+            INSERT INTO cyber_incidents_fts (rowid, description) VALUES (new.rowid, new.description);
+        END""",
+        # index the rows that are already there
+        "INSERT INTO cyber_incidents_fts (cyber_incidents_fts) VALUES ('rebuild')",
+    ]),
+    (5, "it_tickets full-text search", [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS it_tickets_fts USING fts5(
+            description, content='it_tickets', content_rowid='ticket_id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS it_tickets_fts_ai AFTER INSERT ON it_tickets BEGIN
+            INSERT INTO it_tickets_fts (rowid, description) VALUES (new.ticket_id, new.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS it_tickets_fts_ad AFTER DELETE ON it_tickets BEGIN
+            INSERT INTO it_tickets_fts (it_tickets_fts, rowid, description)
+            VALUES ('delete', old.ticket_id, old.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS it_tickets_fts_au AFTER UPDATE OF description ON it_tickets BEGIN
+            INSERT INTO it_tickets_fts (it_tickets_fts, rowid, description)
+            VALUES ('delete', old.ticket_id, old.description);
+            INSERT INTO it_tickets_fts (rowid, description) VALUES (new.ticket_id, new.description);
+        END""",
+        "INSERT INTO it_tickets_fts (it_tickets_fts) VALUES ('rebuild')",
+    ]),
+    # row counters for the dashboards, so counting a table doesn't mean reading it
+    (6, "trigger maintained row counters", [
+        """CREATE TABLE IF NOT EXISTS table_counters (
+            table_name TEXT NOT NULL,
+            group_col TEXT NOT NULL,
+            group_value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name, group_col, group_value)
+        ) WITHOUT ROWID""",
+        *[statement for table, columns in COUNTED_TABLES.items()
+          for statement in _counter_statements(table, columns)],
+    ]),
+    # incidents per (day, severity, category, status) for the time series and breakdown
+    # charts, so they read a few hundred rows instead of grouping the whole table
+    (7, "incident daily rollup", [
+        """CREATE TABLE IF NOT EXISTS incident_daily_rollup (
+            day TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            category TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, severity, category, status)
+        ) WITHOUT ROWID""",
+        f"""CREATE TRIGGER IF NOT EXISTS cyber_incidents_rollup_ai AFTER INSERT ON cyber_incidents BEGIN
+            {_ROLLUP_ADD.format(key=_ROLLUP_KEY.format(row="new"))}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS cyber_incidents_rollup_ad AFTER DELETE ON cyber_incidents BEGIN
+            {_ROLLUP_REMOVE.format(key=_ROLLUP_KEY.format(row="old"))}
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS cyber_incidents_rollup_au
+            AFTER UPDATE OF timestamp, severity, category, status ON cyber_incidents BEGIN
+            {_ROLLUP_REMOVE.format(key=_ROLLUP_KEY.format(row="old"))}
+            {_ROLLUP_ADD.format(key=_ROLLUP_KEY.format(row="new"))}
+        END""",
+        """INSERT INTO incident_daily_rollup (day, severity, category, status, count)
+            SELECT substr(COALESCE(timestamp, ''), 1, 10), COALESCE(severity, ''),
+                   COALESCE(category, ''), COALESCE(status, ''), COUNT(*)
+            FROM cyber_incidents
+            GROUP BY 1, 2, 3, 4""",
+    ]),
+    # content hash of each imported source file, so an unchanged file isn't imported again
+    (8, "file import state", [
+        """CREATE TABLE IF NOT EXISTS file_imports (
+            source TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0,
+            imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ]),
+    # uploads are stored under the sha256 of their content; one row per user and file,
+    # rows from before this migration have no hash
+    (9, "content addressed uploads", [
+        "ALTER TABLE uploads ADD COLUMN content_hash TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_uploads_user_hash ON uploads (username, content_hash)",
+        # the Home page lists a user's uploads newest first
+        "CREATE INDEX IF NOT EXISTS idx_uploads_user_uploaded_at ON uploads (username, uploaded_at)",
+    ]),
+]
+
+# full-text tables, used by rebuild_search_indexes()
+FTS_TABLES = ["cyber_incidents_fts", "it_tickets_fts"]
+
+
+def get_schema_version(conn):
+    """Return the schema version stored in the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version():
+    """Return the version the database ends up at once every migration has run."""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def apply_migrations(conn, target=None):
+    """
+    Apply every pending migration up to target (default: the latest).
+
+    Args:
+        conn: Database connection
+        target: Version to stop at
+
+    Returns:
+        int: Number of migrations applied
+    """
+    target = latest_version() if target is None else target
+    current = get_schema_version(conn)
+    applied = 0
+
+    for version, description, statements in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+
+        # commit whatever the caller had open so the migration gets its own transaction
+        if conn.in_transaction:
+            conn.commit()
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            # PRAGMA doesn't take parameters, version is an int from the list above
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"XX Migration {version} ({description}) failed: {e}")
+            raise
+
+        print(f"(-_-) Applied migration {version}: {description}")
+        applied += 1
+
+    if applied:
+        # refresh the planner statistics so the new indexes actually get picked
+        conn.execute("PRAGMA optimize")
+    return applied
+
+
+def rebuild_search_indexes(conn):
+    """
+    Rebuild the full-text indexes from their content tables.
+
+    Only needed if the rowids of cyber_incidents changed underneath the index
+    (e.g. after a VACUUM), the triggers handle normal writes.
+    """
+    for table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def vacuum_database(conn):
+    """
+    VACUUM the database and rebuild the full-text indexes straight after.
+
+    cyber_incidents has a TEXT primary key, so its full-text index is keyed on the
+    implicit rowid, which VACUUM is free to renumber. Always VACUUM through here
+    (or `python main.py maintain`) so the index never points at the wrong rows.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("VACUUM")
+    rebuild_search_indexes(conn)
+    conn.execute("PRAGMA optimize")
@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination helper shared by incidents, tickets and datasets.
+
+Instead of OFFSET, which makes SQLite walk past every skipped row, each page
+continues from the (sort value, primary key) of the last row of the previous
+page, so page 1000 costs the same as page 1 when the sort column is indexed.
+"""
+
+
+def keyset_page(conn, table, key_column, sort_column, last_key=None, page_size=50,
+                descending=True, where="", params=()):
+    """
+    Fetch one page of a table ordered by (sort_column, key_column).
+
+    Args:
+        conn: Database connection
+        table: Table name (never user input)
+        key_column: Unique column used to break ties, normally the primary key
+        sort_column: Column to order by (callers check it against a whitelist)
+        last_key: Cursor returned with the previous page, None for the first page
+        page_size: Rows per page
+        descending: Newest/largest first
+        where: Optional extra filter, e.g. "status = ?" (without the WHERE keyword)
+        params: Parameters for `where`
+
+    Returns:
+        tuple: (column names, list of row tuples, next cursor or None on the last page)
+    """
+    clauses = [f"({where})"] if where else []
+    params = list(params)
+
+    if last_key is not None:
+        last_sort, last_id = last_key
+        # SQLite puts NULLs first when ascending and last when descending,
+        # so the NULL block has to be handled on its own to not lose rows
+        if descending:
+            if last_sort is None:
+                clauses.append(f"({sort_column} IS NULL AND {key_column} < ?)")
+                params.append(last_id)
+            else:
+                clauses.append(f"({sort_column} < ? OR ({sort_column} = ? AND {key_column} < ?) "
+                               f"OR {sort_column} IS NULL)")
+                params.extend([last_sort, last_sort, last_id])
+        else:
+            if last_sort is None:
+                clauses.append(f"(({sort_column} IS NULL AND {key_column} > ?) OR {sort_column} IS NOT NULL)")
+                params.append(last_id)
+            else:
+                clauses.append(f"({sort_column} > ? OR ({sort_column} = ? AND {key_column} > ?))")
+                params.extend([last_sort, last_sort, last_id])
+
+    direction = "DESC" if descending else "ASC"
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    cursor = conn.cursor()
+    # one extra row tells us whether there is a next page without a COUNT(*)
+    cursor.execute(
+        f"SELECT * FROM {table} {where_sql} "
+        f"ORDER BY {sort_column} {direction}, {key_column} {direction} LIMIT ?",
+        (*params, page_size + 1),
+    )
+    rows = cursor.fetchall()
+    columns = [description[0] for description in cursor.description]
+    cursor.close()
+
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_key = (last[columns.index(sort_column)], last[columns.index(key_column)])
+    return columns, rows, next_key
+
+
+def check_sort_column(sort_column, allowed):
+    """Make sure a sort column is one of the whitelisted ones before it goes into SQL."""
+    if sort_column not in allowed:
+        raise ValueError(f"Can't sort by {sort_column!r}, choose one of: {', '.join(allowed)}")
+    return sort_column
@@ -0,0 +1,281 @@
+"""
+SQL profiler: statement timings, a slow-query log and captured query plans.
+
+Every connection from db.py is a ProfiledConnection. While profiling is on,
+each execute/executemany (and the fetches that follow it) is timed and added
+to the statistics of its normalized statement, i.e. the SQL with literals and
+IN lists replaced by "?", so the same query with different values is counted
+once:
+
+    SELECT * FROM it_tickets WHERE ticket_id = ?
+
+The first time a statement is seen its EXPLAIN QUERY PLAN is stored, so table
+scans show up even when the query is still fast. Statements that take longer
+than SLOW_QUERY_MS (execute plus fetching) go into the slow-query log with the
+plan and their parameters.
+
+Profiling is off by default; turn it on with SQL_PROFILE=1 or enable_profiling().
+While it is off the only cost is one Python call per execute.
+"""
+import itertools
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_MS", 100))
+
+# entries kept in the slow-query log, and duration samples kept per statement for p95
+MAX_SLOW_QUERIES = 200
+MAX_SAMPLES = 200
+
+# statements that have a query plan worth capturing
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+_enabled = os.environ.get("SQL_PROFILE", "0") == "1"
+_lock = threading.Lock()
+_statements = {}  # normalized sql -> stats dict
+_slow_log = deque(maxlen=MAX_SLOW_QUERIES)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """Collapse whitespace and replace literals and IN lists with ? so equal statements group together."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def enable_profiling(slow_query_ms=None):
+    global _enabled, SLOW_QUERY_MS
+    if slow_query_ms is not None:
+        SLOW_QUERY_MS = float(slow_query_ms)
+    _enabled = True
+
+
+def disable_profiling():
+    global _enabled
+    _enabled = False
+
+
+def profiling_enabled():
+    return _enabled
+
+
+def _explain(conn, sql, params):
+    # plain sqlite3 execute, so the plan query itself isn't profiled
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        rows = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except (sqlite3.Error, ValueError):
+        return None
+    return [row[3] for row in rows]
+
+
+def _scans(plan):
+    # "SCAN it_tickets" reads the whole table; "SCAN ... USING INDEX" / "COVERING INDEX" walks an index
+    return [step for step in plan or ()
+            if step.startswith("SCAN") and "INDEX" not in step and "CONSTANT ROW" not in step]
+
+
+def _record(conn, key, sql, params, elapsed_ms, rows):
+    new = False
+    with _lock:
+        stat = _statements.get(key)
+        if stat is None:
+            stat = _statements[key] = {
+                "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                "samples": deque(maxlen=MAX_SAMPLES), "plan": None,
+            }
+            new = True
+        stat["calls"] += 1
+        stat["total_ms"] += elapsed_ms
+        stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+        stat["rows"] += max(rows, 0)
+        stat["samples"].append(elapsed_ms)
+    if new:
+        plan = _explain(conn, sql, params)
+        with _lock:
+            stat["plan"] = plan
+
+
+def _add_fetch_time(key, elapsed_ms, call_ms, rows):
+    # call_ms is the cursor's time so far for this call (execute + fetches)
+    with _lock:
+        stat = _statements.get(key)
+        if stat is not None:
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], call_ms)
+            # approximate when threads interleave calls of the same statement
+            stat["samples"][-1] += elapsed_ms
+            stat["rows"] += rows
+
+
+def _log_slow(conn, sql, params, elapsed_ms):
+    entry = {
+        "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ms": round(elapsed_ms, 2),
+        "sql": normalize_sql(sql),
+        "params": repr(params)[:200],
+        "plan": _explain(conn, sql, params),
+    }
+    entry["full_scans"] = _scans(entry["plan"])
+    with _lock:
+        _slow_log.append(entry)
+    print(f"XX Slow query ({elapsed_ms:.0f} ms): {entry['sql'][:120]}")
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that times its statements and the fetches that read their rows."""
+
+    _key = None
+
+    def _start(self, sql, params, elapsed_ms, rows):
+        self._key = normalize_sql(sql)
+        self._sql = sql
+        self._params = params
+        self._elapsed = elapsed_ms
+        self._logged = False
+        _record(self.connection, self._key, sql, params, elapsed_ms, rows)
+        self._check_slow()
+
+    def _check_slow(self):
+        if not self._logged and self._elapsed >= SLOW_QUERY_MS:
+            self._logged = True
+            _log_slow(self.connection, self._sql, self._params, self._elapsed)
+
+    def execute(self, sql, parameters=()):
+        if not _enabled:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        # rowcount is -1 for SELECT, the fetches count those rows
+        self._start(sql, parameters, (time.perf_counter() - start) * 1000, self.rowcount)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        if not _enabled:
+            return super().executemany(sql, seq_of_parameters)
+        # peek at the first parameter set for the query plan, without reading a
+        # streamed iterator into memory
+        rows = iter(seq_of_parameters)
+        first = next(rows, None)
+        start = time.perf_counter()
+        super().executemany(sql, [] if first is None else itertools.chain([first], rows))
+        self._start(sql, first or (), (time.perf_counter() - start) * 1000, self.rowcount)
+        return self
+
+    def _timed_fetch(self, fetch, *args):
+        if not _enabled or self._key is None:
+            return fetch(*args)
+        start = time.perf_counter()
+        result = fetch(*args)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rows = len(result) if isinstance(result, list) else int(result is not None)
+        self._elapsed += elapsed_ms
+        _add_fetch_time(self._key, elapsed_ms, self._elapsed, rows)
+        self._check_slow()
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors are ProfiledCursors, pass it as factory= to sqlite3.connect."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _percentile(samples, percent):
+    # nearest-rank percentile
+    values = sorted(samples)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)] if values else 0.0
+
+
+def statement_stats():
+    """
+    Statistics per normalized statement, most total time first.
+
+    Returns:
+        list: dicts with sql, calls, total_ms, mean_ms, p95_ms, max_ms, rows, full_scans, plan
+    """
+    with _lock:
+        items = [(sql, dict(stat, samples=list(stat["samples"]))) for sql, stat in _statements.items()]
+    stats = []
+    for sql, stat in items:
+        stats.append({
+            "sql": sql,
+            "calls": stat["calls"],
+            "total_ms": round(stat["total_ms"], 2),
+            "mean_ms": round(stat["total_ms"] / stat["calls"], 3),
+            "p95_ms": round(_percentile(stat["samples"], 95), 3),
+            "max_ms": round(stat["max_ms"], 2),
+            "rows": stat["rows"],
+            "full_scans": ", ".join(step[5:] for step in _scans(stat["plan"])),
+            "plan": " | ".join(stat["plan"] or []),
+        })
+    stats.sort(key=lambda row: row["total_ms"], reverse=True)
+    return stats
+
+
+def slow_queries():
+    """Return the slow-query log, newest first."""
+    with _lock:
+        entries = list(_slow_log)
+    entries.reverse()
+    return entries
+
+
+def reset_profile():
+    """Forget all statistics and the slow-query log."""
+    with _lock:
+        _statements.clear()
+        _slow_log.clear()
+
+
+def export_profile(path=None):
+    """
+    Dump the statistics and the slow-query log as JSON.
+
+    Args:
+        path: Optional file to write the JSON to
+
+    Returns:
+        str: The JSON document
+    """
+    document = json.dumps({
+        "exported_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "slow_query_ms": SLOW_QUERY_MS,
+        "statements": statement_stats(),
+        "slow_queries": slow_queries(),
+    }, indent=2)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(document)
+    return document
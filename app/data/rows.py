@@ -0,0 +1,152 @@
+"""
+Compact result types for tickets and datasets.
+
+TicketRow / DatasetRow are used for single record lookups. They use __slots__,
+so a row costs about as much memory as a tuple, but fields can be read by name
+(ticket.status) while ticket[3] keeps working for older code.
+
+ColumnarResult holds a whole result set as one list per column, built straight
+from the cursor in chunks. It turns into a DataFrame column by column, without
+first building a list of row tuples.
+"""
+
+# column name -> label shown in the admin tables
+TICKET_LABELS = {
+    "ticket_id": "Ticket ID",
+    "priority": "Priority",
+    "description": "Description",
+    "status": "Status",
+    "assigned_to": "Assigned To",
+    "created_at": "Created At",
+    "resolution_time_hours": "Resolution Time (hrs)",
+    "snippet": "Snippet",
+    "rank": "Rank",
+}
+
+DATASET_LABELS = {
+    "dataset_id": "Dataset ID",
+    "name": "Name",
+    "rows": "Rows",
+    "columns": "Columns",
+    "uploaded_by": "Uploaded By",
+    "upload_date": "Upload Date",
+}
+
+
+class SlotRow:
+    """Base class for the row types, subclasses set _fields and the same __slots__."""
+    __slots__ = ()
+    _fields = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_row(cls, row):
+        # None stays None so "if not ticket" still works after a failed lookup
+        return cls(*row) if row is not None else None
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return getattr(self, index)
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        return getattr(self, self._fields[index])
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, (SlotRow, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({values})"
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self._fields}
+
+    def copy(self):
+        return type(self)(*self)
+
+
+class TicketRow(SlotRow):
+    _fields = ("ticket_id", "priority", "description", "status", "assigned_to", "created_at",
+               "resolution_time_hours")
+    __slots__ = _fields
+
+
+class DatasetRow(SlotRow):
+    _fields = ("dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date")
+    __slots__ = _fields
+
+
+class ColumnarResult:
+    """A query result stored column by column."""
+    __slots__ = ("columns", "data")
+
+    def __init__(self, columns, data):
+        self.columns = list(columns)
+        self.data = data  # one list per column, in the same order as columns
+
+    @classmethod
+    def from_cursor(cls, cursor, chunk_size=10000):
+        """Read every row of an executed cursor into column lists, chunk_size rows at a time."""
+        columns = [description[0] for description in cursor.description]
+        data = [[] for _ in columns]
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            # zip(*chunk) turns the chunk's rows into columns
+            for values, column_values in zip(data, zip(*chunk)):
+                values.extend(column_values)
+        cursor.close()
+        return cls(columns, data)
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """Build from rows that were already fetched (e.g. a keyset page)."""
+        data = [list(values) for values in zip(*rows)] if rows else [[] for _ in columns]
+        return cls(columns, data)
+
+    def copy(self):
+        """A copy whose column lists can be changed without touching this one."""
+        return ColumnarResult(self.columns, [list(values) for values in self.data])
+
+    def __len__(self):
+        return len(self.data[0]) if self.data else 0
+
+    def __iter__(self):
+        # row tuples, for code that still loops over rows
+        return zip(*self.data)
+
+    def __getitem__(self, column):
+        return self.data[self.columns.index(column)]
+
+    def to_dataframe(self, labels=None):
+        """
+        Convert to a pandas DataFrame.
+
+        Args:
+            labels: Optional {column name: display label}, unknown columns keep their name
+        """
+        import pandas as pd
+
+        labels = labels or {}
+        names = [labels.get(column, column) for column in self.columns]
+        if len(set(names)) == len(names):
+            return pd.DataFrame(dict(zip(names, self.data)), columns=names)
+        # duplicate names can't go through a dict
+        df = pd.DataFrame({i: values for i, values in enumerate(self.data)}, columns=range(len(names)))
+        df.columns = names
+        return df
@@ -1,7 +1,4 @@
-import sqlite3
-import pandas as pd
-import bcrypt
-from pathlib import Path
+from app.data.migrations import apply_migrations
 
 
 def create_users_table(conn):
@@ -87,10 +84,6 @@ def create_all_tables(conn):
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
     create_uploads_table(conn)
+    # indexes and later schema changes live in numbered migrations
+    apply_migrations(conn)
 
-
-
-DB_PATH = Path(r"C:\Users\senda\Desktop\CW2_M01045908_CST1510\DATA") / "intelligence_platform.db"
-
-conn = sqlite3.connect(DB_PATH)
-create_all_tables(conn)
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Arrow IPC snapshots of the domain tables for the read-heavy dashboards.
+
+export_snapshot() streams a table out of SQLite into DATA/snapshots/<table>.<version>.arrow.
+load_snapshot() memory-maps that file, so numeric columns are used straight from
+the OS page cache without being copied, and every process that opens the same
+snapshot shares those pages.
+
+Snapshots follow the writes: every write that invalidates the query cache also
+marks the table's snapshot stale, and the next load exports it again. Every
+export is a new file, renamed into place once complete, and loads open the
+newest one, so a reader never sees a half written snapshot. A file is never
+overwritten (Windows can't replace or delete a file that is memory-mapped);
+older versions are deleted once no reader has them mapped. Like the
+query cache this only sees writes made in this process; `python main.py csv`
+exports fresh snapshots itself after loading.
+
+pyarrow is optional. Without it get_table_dataframe() falls back to
+pd.read_sql_query and the export functions do nothing.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from app.data.cache import on_invalidate
+from app.data.db import DATA_DIR, get_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+    ipc = None
+
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+SNAPSHOT_TABLES = ["cyber_incidents", "it_tickets", "datasets_metadata"]
+
+# rows per record batch written to the file
+BATCH_SIZE = 50000
+
+_lock = threading.Lock()
+# (snapshot dir, table) pairs exported by this process since the table's last write;
+# anything not in here (including every snapshot at startup) is re-exported on load
+_fresh = set()
+
+
+def arrow_available():
+    return pa is not None
+
+
+def _versions(table, snapshot_dir=None):
+    # exported files of a table as (version, path), oldest first
+    found = []
+    for path in Path(snapshot_dir or SNAPSHOT_DIR).glob(f"{table}.*.arrow"):
+        version = path.name[len(table) + 1:-len(".arrow")]
+        if version.isdigit():
+            found.append((int(version), path))
+    return sorted(found)
+
+
+def snapshot_path(table, snapshot_dir=None):
+    """Newest exported snapshot of a table, None if it was never exported."""
+    versions = _versions(table, snapshot_dir)
+    return versions[-1][1] if versions else None
+
+
+def _fresh_key(table, snapshot_dir=None):
+    return Path(snapshot_dir or SNAPSHOT_DIR).resolve(), table
+
+
+@on_invalidate
+def _mark_stale(tables):
+    # a write makes the table's snapshots stale in every directory
+    with _lock:
+        _fresh.difference_update([key for key in _fresh if key[1] in tables])
+
+
+def _arrow_schema(conn, table):
+    # Arrow types from the declared SQLite types. SQLite doesn't enforce them, so a
+    # numeric column holding any text is exported as strings instead of failing
+    fields = []
+    for cid, name, declared, notnull, default, pk in conn.execute(f'PRAGMA table_info("{table}")'):
+        declared = (declared or "").upper()
+        if "INT" in declared:
+            arrow_type, storage = pa.int64(), "integer"
+        elif any(word in declared for word in ("REAL", "FLOA", "DOUB")):
+            arrow_type, storage = pa.float64(), "real"
+        else:
+            fields.append(pa.field(name, pa.string()))
+            continue
+        mixed = conn.execute(
+            f'SELECT 1 FROM "{table}" WHERE typeof("{name}") NOT IN (?, ?, \'null\') LIMIT 1',
+            (storage, "integer")
+        ).fetchone()
+        fields.append(pa.field(name, pa.string() if mixed else arrow_type))
+    return pa.schema(fields)
+
+
+def export_snapshot(table, snapshot_dir=None):
+    """
+    Write one table to an Arrow IPC file, BATCH_SIZE rows at a time.
+
+    Returns:
+        int: rows written (0 without pyarrow)
+    """
+    if pa is None:
+        return 0
+    # a new name for every export, nanoseconds so two processes don't pick the same one
+    version = time.time_ns()
+    path = Path(snapshot_dir or SNAPSHOT_DIR) / f"{table}.{version}.arrow"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".arrow.tmp")
+
+    rows_written = 0
+    with get_connection() as conn:
+        schema = _arrow_schema(conn, table)
+        select = ", ".join(
+            f'CAST("{field.name}" AS TEXT)' if field.type == pa.string() else f'"{field.name}"'
+            for field in schema
+        )
+        cursor = conn.execute(f'SELECT {select} FROM "{table}"')
+        with pa.OSFile(str(tmp_path), "wb") as sink, ipc.new_file(sink, schema) as writer:
+            while True:
+                rows = cursor.fetchmany(BATCH_SIZE)
+                if not rows:
+                    break
+                columns = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+                writer.write_batch(pa.record_batch(columns, schema=schema))
+                rows_written += len(rows)
+        cursor.close()
+
+    # the new name doesn't exist yet, so this works even while readers map older versions
+    os.replace(tmp_path, path)
+    for old_version, old_path in _versions(table, snapshot_dir):
+        if old_version < version:
+            try:
+                old_path.unlink()
+            except OSError:
+                pass  # still mapped by a reader (Windows), a later export removes it
+    return rows_written
+
+
+def export_all_snapshots(snapshot_dir=None):
+    """Export every snapshot table, returns {table: rows}."""
+    # marked fresh before exporting, so a write during the export still marks it stale
+    with _lock:
+        _fresh.update(_fresh_key(table, snapshot_dir) for table in SNAPSHOT_TABLES)
+    try:
+        return {table: export_snapshot(table, snapshot_dir) for table in SNAPSHOT_TABLES}
+    except Exception:
+        with _lock:
+            _fresh.difference_update(_fresh_key(table, snapshot_dir) for table in SNAPSHOT_TABLES)
+        raise
+
+
+def load_snapshot(table, columns=None, snapshot_dir=None):
+    """
+    Memory-map a table's snapshot, exporting it first if it is missing or stale.
+
+    Args:
+        table: One of SNAPSHOT_TABLES
+        columns: Optional list of columns to keep
+        snapshot_dir: Folder with the snapshots (default: DATA/snapshots)
+
+    Returns:
+        pyarrow.Table backed by the mapped file
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed, use get_table_dataframe() instead")
+    if table not in SNAPSHOT_TABLES:
+        raise ValueError(f"No snapshot for {table!r}, choose one of: {', '.join(SNAPSHOT_TABLES)}")
+
+    key = _fresh_key(table, snapshot_dir)
+    with _lock:
+        refresh = key not in _fresh or snapshot_path(table, snapshot_dir) is None
+        _fresh.add(key)
+    if refresh:
+        try:
+            export_snapshot(table, snapshot_dir)
+        except Exception:
+            with _lock:
+                _fresh.discard(key)
+            raise
+
+    # the table's buffers keep the mapping alive after this function returns
+    source = pa.memory_map(str(snapshot_path(table, snapshot_dir)), "r")
+    arrow_table = ipc.open_file(source).read_all()
+    return arrow_table.select(columns) if columns else arrow_table
+
+
+def get_table_dataframe(table, columns=None):
+    """
+    A whole table as a DataFrame, from the Arrow snapshot when pyarrow is installed.
+
+    Without pyarrow the table is read with pd.read_sql_query like before.
+    """
+    if pa is not None:
+        return load_snapshot(table, columns).to_pandas()
+    select = ", ".join(f'"{column}"' for column in columns) if columns else "*"
+    with get_connection() as conn:
+        return pd.read_sql_query(f'SELECT {select} FROM "{table}"', conn)
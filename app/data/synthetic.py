@@ -0,0 +1,269 @@
+"""
+Synthetic cyber_incidents, it_tickets and datasets_metadata data for load testing.
+
+The rows follow the shape of the sample CSVs in DATA/ but at any size, with
+skewed distributions like real data: most incidents are phishing and low or
+medium severity, a few staff members get most of the tickets (Zipf-like), and
+recent records are more often still open.
+
+Rows come from generators and are written to the CSV file as they are made,
+so memory use stays the same for a thousand rows or a hundred million:
+
+    python main.py generate --incidents 1000000 --tickets 1000000 --datasets 50000
+    python main.py csv --data-dir DATA/generated
+
+The same row generators seed the benchmark databases (seed_table, used by benchmarks/).
+"""
+import csv
+import itertools
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.data.csv_loaders import CSV_MAPPINGS
+from app.data.db import DATA_DIR
+
+GENERATED_DIR = DATA_DIR / "generated"
+
+# value -> relative weight
+INCIDENT_CATEGORIES = {"Phishing": 50, "Malware": 20, "DDoS": 10, "Unauthorized Access": 10, "Misconfiguration": 10}
+INCIDENT_SEVERITIES = {"Low": 35, "Medium": 40, "High": 18, "Critical": 7}
+TICKET_PRIORITIES = {"Low": 30, "Medium": 45, "High": 20, "Critical": 5}
+DATASET_NAMES = ["Customer_Churn", "Financial_Fraud", "Server_Logs", "Image_Classification", "HR_Salary",
+                 "Network_Traffic", "Sales_Forecast", "Threat_Intel", "Support_Chats", "Sensor_Readings"]
+
+# status mix for records younger than STILL_OPEN_DAYS, and for older ones
+INCIDENT_STATUSES_RECENT = {"Open": 35, "In Progress": 35, "Resolved": 20, "Closed": 10}
+INCIDENT_STATUSES_OLD = {"Open": 3, "In Progress": 5, "Resolved": 52, "Closed": 40}
+TICKET_STATUSES_RECENT = {"Open": 35, "In Progress": 30, "Waiting for User": 15, "Resolved": 20}
+TICKET_STATUSES_OLD = {"Open": 3, "In Progress": 4, "Waiting for User": 3, "Resolved": 90}
+STILL_OPEN_DAYS = 30
+
+# typical hours to resolve a ticket per priority (log-normal around these)
+RESOLUTION_HOURS = {"Critical": 6, "High": 18, "Medium": 36, "Low": 60}
+
+DESCRIPTION_WORDS = {
+    "Phishing": ["suspicious email", "credential harvesting link", "spoofed sender", "fake invoice"],
+    "Malware": ["trojan detected", "ransomware note", "infected attachment", "cryptominer process"],
+    "DDoS": ["traffic spike", "SYN flood", "web server unreachable", "load balancer saturated"],
+    "Unauthorized Access": ["failed logins", "privilege escalation", "unknown VPN session", "stolen token"],
+    "Misconfiguration": ["open storage bucket", "default password", "firewall rule too broad", "expired certificate"],
+    "tickets": ["password reset", "laptop will not boot", "printer offline", "VPN disconnects",
+                "email sync failing", "software install request", "slow network", "account locked"],
+}
+
+# rows per writerows() call
+WRITE_BATCH = 10000
+
+
+def _weighted(rng, weights):
+    # sample from a {value: weight} table; the cumulative weights are built once per table
+    values, cumulative = weights
+    return rng.choices(values, cum_weights=cumulative)[0]
+
+
+def _table(weights):
+    return list(weights), list(itertools.accumulate(weights.values()))
+
+
+def zipf_weights(count, skew=1.1):
+    """Weights for `count` names where the k-th gets 1/k**skew, so a few get most of the work."""
+    return {k: 1 / k ** skew for k in range(1, count + 1)}
+
+
+def _timestamp(rng, start, span_seconds):
+    # uniform over the range, but three quarters of them during the working hours of the
+    # drawn day; those hours are cut to the range so nothing lands before start or after end
+    end = start + timedelta(seconds=span_seconds)
+    moment = start + timedelta(seconds=rng.randrange(span_seconds))
+    if rng.random() < 0.75:
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        low = max(start, day + timedelta(hours=8))
+        high = min(end, day + timedelta(hours=18))
+        if low < high:
+            moment = low + timedelta(seconds=rng.randrange(max(1, int((high - low).total_seconds()))))
+    return moment
+
+
+def _status(rng, moment, end, recent, old):
+    return _weighted(rng, recent if (end - moment).days < STILL_OPEN_DAYS else old)
+
+
+def incident_rows(count, start, end, reporters=50, seed=42, first_id=1000):
+    """
+    Yield cyber_incidents rows: (incident_id, timestamp, severity, category, status, description, reported_by).
+    """
+    rng = random.Random(seed)
+    span = max(1, int((end - start).total_seconds()))
+    categories = _table(INCIDENT_CATEGORIES)
+    severities = _table(INCIDENT_SEVERITIES)
+    recent, old = _table(INCIDENT_STATUSES_RECENT), _table(INCIDENT_STATUSES_OLD)
+    reporter_table = _table(zipf_weights(reporters))
+
+    for i in range(count):
+        moment = _timestamp(rng, start, span)
+        category = _weighted(rng, categories)
+        yield (
+            first_id + i,
+            moment.strftime("%Y-%m-%d %H:%M:%S"),
+            _weighted(rng, severities),
+            category,
+            _status(rng, moment, end, recent, old),
+            f"{rng.choice(DESCRIPTION_WORDS[category]).capitalize()} on host-{rng.randrange(2000):04d}",
+            f"analyst_{_weighted(rng, reporter_table)}",
+        )
+
+
+def ticket_rows(count, start, end, assignees=40, seed=43, first_id=2000):
+    """
+    Yield it_tickets rows: (ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours).
+
+    About 5% of open tickets are unassigned; resolution time is only set on resolved tickets.
+    """
+    rng = random.Random(seed)
+    span = max(1, int((end - start).total_seconds()))
+    priorities = _table(TICKET_PRIORITIES)
+    recent, old = _table(TICKET_STATUSES_RECENT), _table(TICKET_STATUSES_OLD)
+    assignee_table = _table(zipf_weights(assignees))
+
+    for i in range(count):
+        moment = _timestamp(rng, start, span)
+        priority = _weighted(rng, priorities)
+        status = _status(rng, moment, end, recent, old)
+        assigned = None if status != "Resolved" and rng.random() < 0.05 else \
+            f"IT_Support_{_weighted(rng, assignee_table)}"
+        hours = round(rng.lognormvariate(0, 0.6) * RESOLUTION_HOURS[priority]) if status == "Resolved" else None
+        yield (
+            first_id + i,
+            priority,
+            rng.choice(DESCRIPTION_WORDS["tickets"]).capitalize(),
+            status,
+            assigned,
+            moment.strftime("%Y-%m-%d %H:%M:%S"),
+            hours,
+        )
+
+
+def dataset_rows(count, start, end, uploaders=20, seed=44, first_id=1):
+    """
+    Yield datasets_metadata rows: (dataset_id, name, rows, columns, uploaded_by, upload_date).
+
+    Row counts are log-normal, so most datasets are small and a few are huge.
+    """
+    rng = random.Random(seed)
+    span = max(1, int((end - start).total_seconds()))
+    uploader_table = _table(zipf_weights(uploaders))
+
+    for i in range(count):
+        yield (
+            first_id + i,
+            f"{rng.choice(DATASET_NAMES)}_{first_id + i}",
+            max(10, int(rng.lognormvariate(9, 1.8))),
+            rng.randint(3, 60),
+            f"data_user_{_weighted(rng, uploader_table)}",
+            (start + timedelta(seconds=rng.randrange(span))).strftime("%Y-%m-%d"),
+        )
+
+
+# table -> (CSV header, row generator)
+GENERATORS = {
+    "cyber_incidents": (["incident_id", "timestamp", "severity", "category", "status", "description",
+                         "reported_by"], incident_rows),
+    "it_tickets": (["ticket_id", "priority", "description", "status", "assigned_to", "created_at",
+                    "resolution_time_hours"], ticket_rows),
+    "datasets_metadata": (["dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date"],
+                          dataset_rows),
+}
+
+
+def seed_table(conn, table, count, start=None, end=None, seed=42, batch_size=WRITE_BATCH * 5, **options):
+    """
+    Insert `count` generated rows straight into a table, committing every batch_size rows.
+
+    Used by the benchmarks to fill throwaway databases. Extra keyword arguments go
+    to the row generator (e.g. assignees=40).
+
+    Returns:
+        int: Number of rows inserted
+    """
+    end = end or datetime.now().replace(microsecond=0)
+    start = start or end - timedelta(days=730)
+    header, generator = GENERATORS[table]
+    sql = f'INSERT INTO "{table}" ({", ".join(header)}) VALUES ({", ".join("?" for _ in header)})'
+    rows = generator(count, start, end, seed=seed, **options)
+    inserted = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany(sql, batch)
+        conn.commit()
+        inserted += len(batch)
+    return inserted
+
+
+def write_csv(path, header, rows):
+    """
+    Stream rows into a CSV file WRITE_BATCH rows at a time, returns the number written.
+
+    The file is written next to its final name and renamed at the end, so a
+    half written file never replaces a good one.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    written = 0
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        while True:
+            batch = list(itertools.islice(rows, WRITE_BATCH))
+            if not batch:
+                break
+            writer.writerows(batch)
+            written += len(batch)
+    os.replace(tmp_path, path)
+    return written
+
+
+def generate_csvs(out_dir=None, incidents=10000, tickets=10000, datasets=500, start=None, end=None,
+                  assignees=40, reporters=50, uploaders=20, seed=42):
+    """
+    Write cyber_incidents.csv, it_tickets.csv and datasets_metadata.csv into out_dir.
+
+    The files have the names `python main.py csv` expects, so a folder of them
+    can be loaded with --data-dir.
+
+    Args:
+        out_dir: Folder for the CSVs (default DATA/generated)
+        incidents, tickets, datasets: Rows per file (0 skips the file)
+        start, end: datetime range of the timestamps (default: the last two years)
+        assignees, reporters, uploaders: Number of distinct staff names per table
+        seed: Random seed, the same arguments always give the same files
+
+    Returns:
+        dict: {file name: rows written}
+    """
+    out_dir = Path(out_dir or GENERATED_DIR)
+    end = end or datetime.now().replace(microsecond=0)
+    start = start or end - timedelta(days=730)
+    if start >= end:
+        raise ValueError("start must be before end")
+
+    counts = {"cyber_incidents": incidents, "it_tickets": tickets, "datasets_metadata": datasets}
+    options = {
+        "cyber_incidents": {"reporters": reporters, "seed": seed},
+        "it_tickets": {"assignees": assignees, "seed": seed + 1},
+        "datasets_metadata": {"uploaders": uploaders, "seed": seed + 2},
+    }
+    files = {table: name for name, table in CSV_MAPPINGS.items()}
+
+    written = {}
+    for table, count in counts.items():
+        if count <= 0:
+            continue
+        header, generator = GENERATORS[table]
+        written[files[table]] = write_csv(out_dir / files[table], header,
+                                          generator(count, start, end, **options[table]))
+    return written
@@ -1,151 +1,232 @@
-import sqlite3
-import pandas as pd
-import bcrypt
-from pathlib import Path
-from app.data.db import connect_database
+from app.data.bulk import bulk_delete, bulk_insert, bulk_update
+from app.data.cache import cached_query, invalidates
+from app.data.db import fts_query, get_connection
+from app.data.pagination import check_sort_column, keyset_page
+from app.data.rows import ColumnarResult, TicketRow
 
 
+@invalidates("it_tickets")
 def insert_into_tickets(ticket_id,priority,description,status,assigned_to,created_at,resolution_time_hours):
     # function to insert into tickets
-    conn = connect_database()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    INSERT INTO it_tickets
-    (ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours)
-    VALUES(?, ?, ?, ?, ?, ?, ?)
-    """,(ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours)
-    )
-
-    conn.commit()
-    cursor.close()
-
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO it_tickets
+        (ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours)
+        VALUES(?, ?, ?, ?, ?, ?, ?)
+        """,(ticket_id, priority, description, status, assigned_to, created_at, resolution_time_hours)
+        )
+        cursor.close()
+
+@invalidates("it_tickets")
 def delete_tickets(ticket_id):
     # function to delte tickets by ticket id
-    conn = connect_database()
-    cursor = conn.cursor()
-
-    cursor.execute("""
-    DELETE FROM it_tickets WHERE ticket_id = ?
-    """,(ticket_id,)
-    )
-
-    conn.commit()
-    cursor.close()
-    row_count = cursor.rowcount
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        DELETE FROM it_tickets WHERE ticket_id = ?
+        """,(ticket_id,)
+        )
+        row_count = cursor.rowcount
+        cursor.close()
 
     return row_count
 
 def get_all_tickets():
-    """Get all tickets"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM it_tickets ORDER BY created_at DESC")
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get all tickets, as row tuples"""
+    return list(get_all_tickets_columnar())
 
+@cached_query("it_tickets")
 def get_ticket_by_id(ticket_id):
     """Get specific ticket by ID"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
-    result = cursor.fetchone()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
+        result = TicketRow.from_row(cursor.fetchone())
+        cursor.close()
     return result
 
 def get_tickets_by_status(status):
-    """Get all tickets with specific status"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM it_tickets WHERE status = ?", (status,))
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get all tickets with specific status, as row tuples"""
+    return list(get_tickets_by_status_columnar(status))
 
 def get_tickets_by_assignee(assigned_to):
-    """Get all tickets assigned to specific staff"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM it_tickets WHERE assigned_to = ?", (assigned_to,))
-    results = cursor.fetchall()
-    cursor.close()
-    return results
+    """Get all tickets assigned to specific staff, as row tuples"""
+    return list(get_tickets_by_assignee_columnar(assigned_to))
 
+@invalidates("it_tickets")
 def update_ticket_status(ticket_id, status):
     """Update ticket status"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE it_tickets SET status = ? WHERE ticket_id = ?", (status, ticket_id))
-    conn.commit()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE it_tickets SET status = ? WHERE ticket_id = ?", (status, ticket_id))
+        cursor.close()
 
+@invalidates("it_tickets")
 def assign_ticket(ticket_id, assigned_to):
     """Assign ticket to staff member"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE it_tickets SET assigned_to = ? WHERE ticket_id = ?", (assigned_to, ticket_id))
-    conn.commit()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE it_tickets SET assigned_to = ? WHERE ticket_id = ?", (assigned_to, ticket_id))
+        cursor.close()
 
 # Analysis functions to find bottlenecks:
+@cached_query("it_tickets")
 def get_slowest_status():
     """Find which status has the most tickets stuck"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT status, COUNT(*) as ticket_count 
-        FROM it_tickets 
-        WHERE status != 'Resolved' 
-        GROUP BY status 
-        ORDER BY ticket_count DESC
-    """)
-    results = cursor.fetchall()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT status, COUNT(*) as ticket_count
+            FROM it_tickets
+            WHERE status != 'Resolved'
+            GROUP BY status
+            ORDER BY ticket_count DESC
+        """)
+        results = cursor.fetchall()
+        cursor.close()
     return results
 
+@cached_query("it_tickets")
 def get_slowest_staff():
     """Find which staff has the most unresolved tickets"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT assigned_to, COUNT(*) as ticket_count 
-        FROM it_tickets 
-        WHERE status != 'Resolved' AND assigned_to IS NOT NULL
-        GROUP BY assigned_to 
-        ORDER BY ticket_count DESC
-    """)
-    results = cursor.fetchall()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT assigned_to, COUNT(*) as ticket_count
+            FROM it_tickets
+            WHERE status != 'Resolved' AND assigned_to IS NOT NULL
+            GROUP BY assigned_to
+            ORDER BY ticket_count DESC
+        """)
+        results = cursor.fetchall()
+        cursor.close()
     return results
 
+@cached_query("it_tickets")
 def get_avg_resolution_time():
     """Get average resolution time by priority"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT priority, AVG(resolution_time_hours) as avg_hours 
-        FROM it_tickets 
-        WHERE resolution_time_hours IS NOT NULL
-        GROUP BY priority 
-        ORDER BY avg_hours DESC
-    """)
-    results = cursor.fetchall()
-    cursor.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT priority, AVG(resolution_time_hours) as avg_hours
+            FROM it_tickets
+            WHERE resolution_time_hours IS NOT NULL
+            GROUP BY priority
+            ORDER BY avg_hours DESC
+        """)
+        results = cursor.fetchall()
+        cursor.close()
     return results
 
 def get_oldest_pending_tickets(limit=10):
-    """Get oldest unresolved tickets"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT * FROM it_tickets 
-        WHERE status != 'Resolved' 
-        ORDER BY created_at ASC 
+    """Get oldest unresolved tickets, as row tuples"""
+    return list(get_oldest_pending_tickets_columnar(limit))
+
+def search_tickets_ranked(search_term, limit=50):
+    """Full-text search over ticket descriptions, best matches first (ticket columns + snippet, rank), as row tuples"""
+    return list(search_tickets_ranked_columnar(search_term, limit))
+
+
+# columns the ticket pages can be sorted by
+TICKET_SORT_COLUMNS = ["created_at", "ticket_id", "priority", "status", "assigned_to"]
+
+
+@cached_query("it_tickets")
+def get_tickets_page(last_key=None, page_size=50, sort_column="created_at", descending=True):
+    """Get one page of tickets with keyset pagination, returns (ColumnarResult, next cursor or None)"""
+    check_sort_column(sort_column, TICKET_SORT_COLUMNS)
+    with get_connection() as conn:
+        columns, rows, next_key = keyset_page(
+            conn, "it_tickets", "ticket_id", sort_column, last_key, page_size, descending
+        )
+    return ColumnarResult.from_rows(columns, rows), next_key
+
+
+# The list queries. Each result is kept column by column (see rows.py), which builds
+# DataFrames without row tuples; the row list functions above wrap these
+def _select_columnar(sql, params=()):
+    with get_connection() as conn:
+        return ColumnarResult.from_cursor(conn.execute(sql, params))
+
+
+@cached_query("it_tickets")
+def get_all_tickets_columnar():
+    """Get all tickets as a ColumnarResult"""
+    return _select_columnar("SELECT * FROM it_tickets ORDER BY created_at DESC")
+
+
+@cached_query("it_tickets")
+def get_tickets_by_status_columnar(status):
+    """Get all tickets with specific status as a ColumnarResult"""
+    return _select_columnar("SELECT * FROM it_tickets WHERE status = ?", (status,))
+
+
+@cached_query("it_tickets")
+def get_tickets_by_assignee_columnar(assigned_to):
+    """Get all tickets assigned to specific staff as a ColumnarResult"""
+    return _select_columnar("SELECT * FROM it_tickets WHERE assigned_to = ?", (assigned_to,))
+
+
+@cached_query("it_tickets")
+def get_oldest_pending_tickets_columnar(limit=10):
+    """Get oldest unresolved tickets as a ColumnarResult"""
+    return _select_columnar("""
+        SELECT * FROM it_tickets
+        WHERE status != 'Resolved'
+        ORDER BY created_at ASC
         LIMIT ?
     """, (limit,))
-    results = cursor.fetchall()
-    cursor.close()
-    return results
 
 
+@cached_query("it_tickets")
+def search_tickets_ranked_columnar(search_term, limit=50):
+    """Full-text search like search_tickets_ranked, as a ColumnarResult"""
+    match = fts_query(search_term)
+    if not match:
+        # no terms: an empty result with the right columns
+        return _select_columnar("SELECT *, '' AS snippet, 0.0 AS rank FROM it_tickets LIMIT 0")
+    return _select_columnar("""
+        SELECT
+            t.*,
+            snippet(it_tickets_fts, 0, '**', '**', '...', 12) AS snippet,
+            bm25(it_tickets_fts) AS rank
+        FROM it_tickets_fts
+        JOIN it_tickets t ON t.ticket_id = it_tickets_fts.rowid
+        WHERE it_tickets_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """, (match, limit))
+
+
+# Batch writes: one transaction and one executemany per call, rows that can't be
+# applied are reported back as (ticket_id, reason) instead of failing the batch
+TICKET_COLUMNS = list(TicketRow._fields)
+
+
+@invalidates("it_tickets")
+def insert_tickets(rows, columns=None):
+    """Insert many tickets, rows are tuples in columns (default TICKET_COLUMNS) order. Returns inserted and conflicts."""
+    with get_connection() as conn:
+        return bulk_insert(conn, "it_tickets", "ticket_id", columns or TICKET_COLUMNS, rows)
+
+
+@invalidates("it_tickets")
+def update_tickets_status(ticket_ids, status):
+    """Set the status of many tickets. Returns updated and conflicts (ids not found)."""
+    with get_connection() as conn:
+        return bulk_update(conn, "it_tickets", "ticket_id", {"status": status}, ticket_ids)
+
+
+@invalidates("it_tickets")
+def assign_tickets(ticket_ids, assigned_to):
+    """Reassign many tickets to one staff member. Returns updated and conflicts (ids not found)."""
+    with get_connection() as conn:
+        return bulk_update(conn, "it_tickets", "ticket_id", {"assigned_to": assigned_to}, ticket_ids)
+
+
+@invalidates("it_tickets")
+def delete_many_tickets(ticket_ids):
+    """Delete many tickets. Returns deleted and conflicts (ids not found)."""
+    with get_connection() as conn:
+        return bulk_delete(conn, "it_tickets", "ticket_id", ticket_ids)
@@ -1,57 +1,68 @@
-import sqlite3
-import pandas as pd
-import bcrypt
-from pathlib import Path
-from app.data.db import connect_database
+from app.data.cache import invalidate
+from app.data.db import get_connection
 
 # function to get all the usernames from the database
 def get_user_by_username(username):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        f"SELECT * FROM users WHERE username = ?", (username,)
-    )
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM users WHERE username = ?", (username,)
+        )
 
-    user = cursor.fetchone()
-    conn.close()
+        user = cursor.fetchone()
+        cursor.close()
     return user
 
 def insert_user(username, password_hash, role='user'):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            (username, password_hash, role)
+        )
+        cursor.close()
+
+
+def insert_users(conn, users):
+    """
+    Insert many (username, password_hash, role) rows in the caller's transaction.
+
+    Usernames that already exist (or repeat in the batch) are ignored, so the
+    first row of a username wins.
+
+    Returns:
+        int: Number of users actually inserted
+    """
+    # rowcount of executemany sums the rows each insert changed (ignored rows count 0,
+    # the counter triggers aren't included)
+    cursor = conn.executemany(
         "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role)
+        users
     )
-    conn.commit()
-    conn.close()
+    inserted = cursor.rowcount
+    cursor.close()
+    return inserted
 
 
 def get_all_users():
     # fuction to get all users
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users")
-    users = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM users")
+        users = cursor.fetchall()
+        cursor.close()
     return users
 
-    conn.commit()
-    conn.close()
-
 def clear_users_table():
-    conn = connect_database()
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("DELETE FROM users")
-        cursor.execute("DELETE FROM sqlite_sequence WHERE name='users'")  # reset ID counter
-        conn.commit()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM users")
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name='users'")  # reset ID counter
+            cursor.close()
         print("Users table cleared and ID counter reset.")
     except Exception as e:
         print("Error clearing users table:", e)
-    finally:
-        conn.close()
 
 
 def clear_database():
@@ -59,23 +70,21 @@ def clear_database():
     Deletes all data from all main tables in the database
     and resets their auto-increment IDs.
     """
-    conn = connect_database()
-    cursor = conn.cursor()
-
     try:
-        # List all main tables
-        tables = ["users", "cyber_incidents", "it_tickets", "datasets_metadata"]
+        with get_connection() as conn:
+            cursor = conn.cursor()
+
+            # List all main tables
+            tables = ["users", "cyber_incidents", "it_tickets", "datasets_metadata"]
 
-        for table in tables:
-            cursor.execute(f"DELETE FROM {table}")
-            cursor.execute(f"DELETE FROM sqlite_sequence WHERE name='{table}'")  # reset autoincrement
+            for table in tables:
+                cursor.execute(f"DELETE FROM {table}")
+                cursor.execute(f"DELETE FROM sqlite_sequence WHERE name='{table}'")  # reset autoincrement
+            cursor.close()
+        invalidate(*tables)
 
-        conn.commit()
         return True
 
     except Exception as e:
         print("Error clearing database:", e)
         return False
-
-    finally:
-        conn.close()
@@ -0,0 +1,175 @@
+"""
+Password hashing and verification off the Streamlit script thread.
+
+bcrypt is deliberately slow, so hashing inline makes every login block its
+script thread for the full hashing time and a burst of logins queues up on one
+core. Here hashing runs in a small process pool, so logins are checked on all
+cores in parallel.
+
+The bcrypt cost (log2 rounds) comes from the BCRYPT_ROUNDS environment
+variable (clamped to MIN_ROUNDS..MAX_ROUNDS). With BCRYPT_TARGET_MS set instead,
+the cost is calibrated once, before the first hash, to the highest one that
+stays under that many milliseconds on this machine; `python main.py calibrate`
+prints what that would be. When the cost changes, stored hashes are upgraded
+the next time their owner logs in (see verify_and_upgrade).
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def _rounds_from_env():
+    value = os.environ.get("BCRYPT_ROUNDS")
+    if value is None:
+        return DEFAULT_ROUNDS
+    try:
+        rounds = int(value)
+    except ValueError:
+        print(f"XX BCRYPT_ROUNDS={value!r} is not a number, using {DEFAULT_ROUNDS}")
+        return DEFAULT_ROUNDS
+    clamped = min(max(rounds, MIN_ROUNDS), MAX_ROUNDS)
+    if clamped != rounds:
+        print(f"XX BCRYPT_ROUNDS={rounds} is outside {MIN_ROUNDS}..{MAX_ROUNDS}, using {clamped}")
+    return clamped
+
+
+_rounds = _rounds_from_env()
+# calibrate to this many ms per hash before the first hash, unless BCRYPT_ROUNDS is set
+_target_ms = None if "BCRYPT_ROUNDS" in os.environ else os.environ.get("BCRYPT_TARGET_MS")
+_calibrate_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _hash_in_worker(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check_in_worker(password, stored_hash):
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), stored_hash.encode("utf-8"))
+    except ValueError:
+        # not a bcrypt hash at all (e.g. a corrupted line in the users file)
+        return False
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit runs many threads, so don't fork it: forkserver/spawn start clean workers
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _run(func, *args):
+    # fall back to hashing inline if worker processes can't be started here
+    global _pool
+    try:
+        return _get_pool().submit(func, *args).result()
+    except (OSError, RuntimeError) as e:
+        # a broken pool (e.g. a worker was killed) stays broken, so start a new one next time
+        with _pool_lock:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+                _pool = None
+        print(f"XX Password pool unavailable, hashing inline: {e}")
+        return func(*args)
+
+
+def get_rounds():
+    """Return the bcrypt cost new hashes are made with."""
+    global _target_ms
+    if _target_ms is not None:
+        with _calibrate_lock:
+            if _target_ms is not None:
+                try:
+                    calibrate_rounds(float(_target_ms))
+                except ValueError:
+                    print(f"XX BCRYPT_TARGET_MS={_target_ms!r} is not a number, using cost {_rounds}")
+                _target_ms = None
+    return _rounds
+
+
+def set_rounds(rounds):
+    """Change the bcrypt cost for new hashes; older hashes are upgraded on login."""
+    global _rounds, _target_ms
+    if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+        raise ValueError(f"bcrypt rounds must be between {MIN_ROUNDS} and {MAX_ROUNDS}")
+    _rounds = rounds
+    # an explicit cost replaces a pending calibration
+    _target_ms = None
+
+
+def hash_rounds(stored_hash):
+    """Return the cost a stored hash was made with ($2b$12$... -> 12), or None if it isn't bcrypt."""
+    parts = stored_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def hash_password(password, rounds=None):
+    """Hash a password with the configured cost, in the worker pool."""
+    return _run(_hash_in_worker, password, rounds or get_rounds())
+
+
+def verify_password(password, stored_hash):
+    """Check a password against a stored bcrypt hash, in the worker pool."""
+    return _run(_check_in_worker, password, stored_hash)
+
+
+def needs_rehash(stored_hash):
+    """True if a stored hash was made with a different cost than the configured one."""
+    return hash_rounds(stored_hash) != get_rounds()
+
+
+def verify_and_upgrade(password, stored_hash):
+    """
+    Verify a password and rehash it if the configured cost has changed.
+
+    The plain password is only available at login, so that is the moment
+    old hashes can be upgraded.
+
+    Returns:
+        tuple: (valid: bool, new_hash: str or None) - store new_hash when it isn't None
+    """
+    if not verify_password(password, stored_hash):
+        return False, None
+    if needs_rehash(stored_hash):
+        return True, hash_password(password)
+    return True, None
+
+
+def calibrate_rounds(target_ms=250, apply=True):
+    """
+    Find the highest bcrypt cost whose hash still takes at most target_ms on this machine.
+
+    Every extra round doubles the time, so only one cost is measured and the
+    others are worked out from it.
+
+    Returns:
+        int: the chosen cost (also applied unless apply=False)
+    """
+    start = time.perf_counter()
+    _hash_in_worker("calibration", MIN_ROUNDS)
+    base_ms = (time.perf_counter() - start) * 1000
+
+    rounds = MIN_ROUNDS
+    while rounds < MAX_ROUNDS and base_ms * 2 ** (rounds + 1 - MIN_ROUNDS) <= target_ms:
+        rounds += 1
+    if apply:
+        set_rounds(rounds)
+    print(f"(-_-) bcrypt cost {rounds}: ~{base_ms * 2 ** (rounds - MIN_ROUNDS):.0f} ms per hash "
+          f"(target {target_ms} ms)")
+    return rounds
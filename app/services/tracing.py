@@ -0,0 +1,190 @@
+"""
+Latency tracing for the Streamlit pages.
+
+Every script run of a page is one trace, made of named spans:
+
+    start_trace("Cyber Incidents")
+    with span("query_incidents", "db"):
+        result = query_incidents(...)
+    with span("charts", "chart"):
+        st.bar_chart(...)
+    end_trace()
+
+The last MAX_TRACES finished traces are kept in memory (a ring buffer shared by
+all sessions), and page_stats() / span_stats() turn them into p50/p95 latencies
+for the admin page. Spans outside a trace are not recorded, so data functions
+can be wrapped without caring which page calls them.
+
+A trace belongs to the thread running the script. Pages only call end_trace()
+at the bottom: a run that ends early (st.stop, st.switch_page, st.rerun or an
+error) never gets there, and start_trace() is where those are closed, so no
+page has to remember to. Each start_trace() records every trace whose thread
+has finished (Streamlit runs every rerun on a new thread) or that is still
+open on its own thread as incomplete, ending where its last span ended.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# finished traces kept for the statistics
+MAX_TRACES = 500
+
+# span kinds used by the pages
+SPAN_KINDS = ("db", "dataframe", "chart", "ai", "sleep", "other")
+
+_lock = threading.Lock()
+_traces = deque(maxlen=MAX_TRACES)
+_local = threading.local()
+# traces not ended yet: thread ident -> (thread, trace)
+_open = {}
+
+
+def _finish(trace, complete):
+    # an incomplete trace ends where its last span ended
+    end = time.perf_counter() if complete else trace.pop("last_end")
+    trace.pop("last_end", None)
+    trace["total_ms"] = (end - trace.pop("start")) * 1000
+    trace["complete"] = complete
+    with _lock:
+        _traces.append(trace)
+
+
+def _close_ended_runs(current=None):
+    # traces of runs that stopped before end_trace(): their thread is gone, or it is
+    # the current thread starting a new run
+    with _lock:
+        ended = [ident for ident, (thread, trace) in _open.items()
+                 if ident == current or not thread.is_alive()]
+        traces = [_open.pop(ident)[1] for ident in ended]
+    for trace in traces:
+        _finish(trace, complete=False)
+
+
+def start_trace(page):
+    """Start the trace of one script run of a page, closing runs that ended early."""
+    thread = threading.current_thread()
+    _close_ended_runs(current=thread.ident)
+    now = time.perf_counter()
+    _local.trace = {
+        "page": page,
+        "started_at": time.time(),
+        "start": now,
+        "last_end": now,
+        "spans": [],  # (name, kind, duration in ms)
+    }
+    with _lock:
+        _open[thread.ident] = (thread, _local.trace)
+
+
+def end_trace():
+    """Finish the current trace and add it to the ring buffer."""
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        _local.trace = None
+        with _lock:
+            _open.pop(threading.get_ident(), None)
+        _finish(trace, complete=True)
+
+
+@contextmanager
+def span(name, kind="other"):
+    """Time a block as a span of the current trace (nothing is recorded without one)."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        trace["spans"].append((name, kind, (end - start) * 1000))
+        trace["last_end"] = end
+
+
+def traced(kind="other", name=None):
+    """Decorator that records every call of a function as a span."""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def sleep(seconds, name="sleep"):
+    """time.sleep() recorded as a span, so deliberate pauses show up in the traces."""
+    with span(name, "sleep"):
+        time.sleep(seconds)
+
+
+def recent_traces(limit=None):
+    """Return the finished traces, newest first."""
+    _close_ended_runs()
+    with _lock:
+        traces = list(_traces)
+    traces.reverse()
+    return traces[:limit] if limit else traces
+
+
+def clear_traces():
+    with _lock:
+        _traces.clear()
+
+
+def _percentile(values, percent):
+    # nearest-rank percentile of a sorted list
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def _summary(durations):
+    durations = sorted(durations)
+    return {
+        "count": len(durations),
+        "p50_ms": round(_percentile(durations, 50), 1),
+        "p95_ms": round(_percentile(durations, 95), 1),
+        "max_ms": round(durations[-1], 1),
+    }
+
+
+def page_stats():
+    """
+    Latency of whole script runs per page.
+
+    Returns:
+        list: One dict per page with page, count, p50_ms, p95_ms, max_ms, incomplete
+    """
+    durations = {}
+    incomplete = {}
+    for trace in recent_traces():
+        durations.setdefault(trace["page"], []).append(trace["total_ms"])
+        incomplete[trace["page"]] = incomplete.get(trace["page"], 0) + (not trace["complete"])
+    return [
+        {"page": page, **_summary(values), "incomplete": incomplete[page]}
+        for page, values in sorted(durations.items())
+    ]
+
+
+def span_stats():
+    """
+    Latency of every span per page, slowest p95 first.
+
+    Returns:
+        list: One dict per (page, span) with page, span, kind, count, p50_ms, p95_ms, max_ms
+    """
+    durations = {}
+    for trace in recent_traces():
+        for name, kind, duration in trace["spans"]:
+            durations.setdefault((trace["page"], name, kind), []).append(duration)
+    stats = [
+        {"page": page, "span": name, "kind": kind, **_summary(values)}
+        for (page, name, kind), values in durations.items()
+    ]
+    stats.sort(key=lambda row: row["p95_ms"], reverse=True)
+    return stats
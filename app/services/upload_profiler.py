@@ -0,0 +1,223 @@
+"""
+One-pass, chunked profile of an uploaded CSV for the Home page.
+
+The file is read CHUNK_ROWS rows at a time and every chunk is folded into
+running statistics, so memory depends on the chunk size and not the file size:
+
+    numeric columns      count, missing, min, max, mean and a histogram
+    other columns        count, missing and value counts (top values)
+
+Histograms come from a fixed-size reservoir sample of each numeric column,
+binned between the exact min and max and scaled up to the full count.
+
+Large files can be capped (max_rows) and/or sampled (a fraction of rows,
+picked at random with a fixed seed so the same file gives the same profile).
+The page renders from the returned profile instead of the raw DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+# bump when the profile layout changes, cached profiles of older versions are then ignored
+PROFILE_VERSION = 1
+
+# rows parsed per chunk
+CHUNK_ROWS = 50000
+
+# rows kept for the preview table
+PREVIEW_ROWS = 1000
+
+# values kept per numeric column for the histogram
+RESERVOIR_SIZE = 10000
+HISTOGRAM_BINS = 20
+
+# distinct values counted exactly per column; values first seen after that go to "other"
+MAX_DISTINCT = 10000
+TOP_VALUES = 30
+
+
+class _NumericStats:
+    def __init__(self, rng):
+        self.rng = rng
+        self.count = 0
+        self.missing = 0
+        self.non_numeric = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.seen = 0  # values offered to the reservoir so far
+        self.reservoir = np.empty(RESERVOIR_SIZE, dtype="float64")
+
+    def add(self, series):
+        values = pd.to_numeric(series, errors="coerce")
+        # cells that were there but weren't numbers (a numeric column with stray text)
+        self.non_numeric += int((values.isna() & series.notna()).sum())
+        self.missing += int(series.isna().sum())
+        values = values.dropna().to_numpy(dtype="float64")
+        if not len(values):
+            return
+
+        self.count += len(values)
+        self.total += float(values.sum())
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self._sample(values)
+
+    def _sample(self, values):
+        # reservoir sampling (algorithm R), vectorised per chunk
+        free = max(0, min(RESERVOIR_SIZE - self.seen, len(values)))
+        if free:
+            self.reservoir[self.seen:self.seen + free] = values[:free]
+        rest = values[free:]
+        if len(rest):
+            positions = np.arange(self.seen + free, self.seen + len(values)) + 1
+            slots = (self.rng.random(len(rest)) * positions).astype("int64")
+            keep = slots < RESERVOIR_SIZE
+            self.reservoir[slots[keep]] = rest[keep]
+        self.seen += len(values)
+
+    def result(self):
+        sample = self.reservoir[:min(self.seen, RESERVOIR_SIZE)]
+        histogram = None
+        if len(sample):
+            counts, edges = np.histogram(sample, bins=HISTOGRAM_BINS, range=(self.min, self.max))
+            # scale the sample's counts up to every value in the column
+            scale = self.count / len(sample)
+            # indexed by the lower edge of each bin, a numeric index keeps the bars in order
+            histogram = pd.Series(np.round(counts * scale).astype("int64"),
+                                  index=pd.Index(edges[:-1], name="bin start"), name="rows")
+        return {
+            "kind": "numeric",
+            "count": self.count,
+            "missing": self.missing,
+            "non_numeric": self.non_numeric,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "histogram": histogram,
+        }
+
+
+class _CategoricalStats:
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.counts = {}
+        self.other = 0
+
+    def add(self, series):
+        self.missing += int(series.isna().sum())
+        chunk_counts = series.dropna().astype(str).value_counts()
+        self.count += int(chunk_counts.sum())
+        for value, n in chunk_counts.items():
+            if value in self.counts:
+                self.counts[value] += int(n)
+            elif len(self.counts) < MAX_DISTINCT:
+                self.counts[value] = int(n)
+            else:
+                self.other += int(n)
+
+    def result(self):
+        top = pd.Series(self.counts, dtype="int64").sort_values(ascending=False)
+        return {
+            "kind": "categorical",
+            "count": self.count,
+            "missing": self.missing,
+            "distinct": len(self.counts),
+            "distinct_capped": self.other > 0,
+            "other": self.other + int(top.iloc[TOP_VALUES:].sum()),
+            "top": top.iloc[:TOP_VALUES],
+        }
+
+
+def profile_csv(source, max_rows=None, sample=None, chunk_rows=CHUNK_ROWS, seed=0, encoding="utf-8"):
+    """
+    Profile a CSV file in one pass.
+
+    Args:
+        source: Path or file object (e.g. a Streamlit UploadedFile)
+        max_rows: Stop after reading this many rows (None = whole file)
+        sample: Fraction of the rows to profile, e.g. 0.1 (None = every row)
+        chunk_rows: Rows parsed at a time
+        seed: Seed for the row sample and the histogram reservoirs
+
+    Returns:
+        dict: rows_read, rows_profiled, truncated, sampled, columns (in file order),
+              stats ({column: numeric or categorical stats}) and preview (DataFrame)
+    """
+    rng = np.random.default_rng(seed)
+    stats = {}
+    columns = []
+    preview = None
+    rows_read = 0
+    rows_profiled = 0
+    truncated = False
+
+    reader = pd.read_csv(source, encoding=encoding, chunksize=chunk_rows)
+    for chunk in reader:
+        if max_rows is not None and rows_read + len(chunk) > max_rows:
+            chunk = chunk.iloc[:max_rows - rows_read]
+            truncated = True
+        rows_read += len(chunk)
+
+        if preview is None:
+            preview = chunk.head(PREVIEW_ROWS)
+            columns = list(chunk.columns)
+            # the first chunk decides which columns are numeric
+            for column in columns:
+                dtype = chunk[column].dtype
+                numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+                stats[column] = _NumericStats(rng) if numeric else _CategoricalStats()
+
+        if sample is not None and sample < 1:
+            chunk = chunk[rng.random(len(chunk)) < sample]
+        rows_profiled += len(chunk)
+        for column in columns:
+            if column in chunk:
+                stats[column].add(chunk[column])
+
+        if truncated:
+            break
+    if hasattr(reader, "close"):
+        reader.close()
+
+    return {
+        "rows_read": rows_read,
+        "rows_profiled": rows_profiled,
+        "truncated": truncated,
+        "sampled": sample is not None and sample < 1,
+        "columns": columns,
+        "stats": {column: stat.result() for column, stat in stats.items()},
+        "preview": preview if preview is not None else pd.DataFrame(),
+    }
+
+
+def numeric_columns(profile):
+    return [column for column in profile["columns"] if profile["stats"][column]["kind"] == "numeric"]
+
+
+def categorical_columns(profile):
+    return [column for column in profile["columns"] if profile["stats"][column]["kind"] == "categorical"]
+
+
+def summary_table(profile):
+    """One row per column with the scalar statistics, for st.dataframe."""
+    rows = []
+    for column in profile["columns"]:
+        stat = profile["stats"][column]
+        rows.append({
+            "column": column,
+            "type": stat["kind"],
+            "count": stat["count"],
+            "missing": stat["missing"],
+            "distinct": stat.get("distinct"),
+            "min": stat.get("min"),
+            "max": stat.get("max"),
+            "mean": stat.get("mean"),
+        })
+    return pd.DataFrame(rows)
+
+
+def chart_data(stat):
+    """Series for st.bar_chart: top value counts, or the histogram of a numeric column."""
+    return stat["top"] if stat["kind"] == "categorical" else stat["histogram"]
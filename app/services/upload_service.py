@@ -1,21 +1,195 @@
+"""
+Uploaded files, stored by content.
 
-from app.services.user_service import connect_database
+Each upload is written once to uploaded_files/<aa>/<sha256>.csv, where <aa> is
+the first two characters of the hash, and gets a row in the uploads table for
+the user who uploaded it. Uploading the same bytes again under any name reuses
+the stored file.
 
+Profiles (app/services/upload_profiler.py) are cached next to the files in
+uploaded_files/profiles/, one JSON file per file and profile options, so a file
+that was profiled before opens without being parsed again. JSON and not pickle:
+loading a pickle runs code, and that folder sits beside user supplied files.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
 
-def clear_uploads_table():
+import pandas as pd
+
+from app.data.db import get_connection
+from app.services.upload_profiler import PROFILE_VERSION, profile_csv
+
+# uploaded_files/ sits at the project root, two levels above app/services/
+UPLOAD_DIR = Path(__file__).resolve().parents[2] / "uploaded_files"
+PROFILE_DIR = UPLOAD_DIR / "profiles"
+
+# bytes read at a time while hashing and copying an upload
+COPY_BLOCK = 1024 * 1024
+
+
+def upload_path(content_hash, upload_dir=None):
+    """Where the file with this sha256 is stored."""
+    return Path(upload_dir or UPLOAD_DIR) / content_hash[:2] / f"{content_hash}.csv"
+
+
+def _write_atomic(path, write):
+    # write next to the final name and rename, so a half written file is never picked up
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            result = write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return result
+
+
+def store_upload(username, filename, fileobj, upload_dir=None):
     """
-    Clears all records from the uploads table.
+    Store an uploaded file under its sha256 and record it for the user.
+
+    The file is hashed while it is copied, in COPY_BLOCK pieces. If the same
+    content is already stored the copy is dropped, and if the user uploaded it
+    before only the name and time of their upload row are updated.
+
+    Args:
+        username: Who uploaded it
+        filename: Original file name, shown in the upload list
+        fileobj: Binary file object, e.g. a Streamlit UploadedFile
+
+    Returns:
+        tuple: (content_hash, file_path)
     """
+    upload_dir = Path(upload_dir or UPLOAD_DIR)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    fileobj.seek(0)
+
+    def copy(f):
+        digest = hashlib.sha256()
+        for block in iter(lambda: fileobj.read(COPY_BLOCK), b""):
+            digest.update(block)
+            f.write(block)
+        return digest.hexdigest()
+
+    # the final name isn't known until the whole file is hashed
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, suffix=".tmp")
     try:
-        conn = connect_database()
+        with os.fdopen(fd, "wb") as f:
+            content_hash = copy(f)
+        path = upload_path(content_hash, upload_dir)
+        if path.exists():
+            os.unlink(tmp_path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    fileobj.seek(0)
+
+    with get_connection() as conn:
+        conn.execute(
+            """INSERT INTO uploads (username, filename, file_path, content_hash) VALUES (?, ?, ?, ?)
+               ON CONFLICT (username, content_hash)
+               DO UPDATE SET filename = excluded.filename, uploaded_at = CURRENT_TIMESTAMP""",
+            (username, filename, str(path), content_hash)
+        )
+    return content_hash, path
+
+
+def get_user_uploads(username, limit=50):
+    """Stored uploads of a user, newest first, as (filename, content_hash, uploaded_at) rows."""
+    with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute(
+            """SELECT filename, content_hash, uploaded_at FROM uploads
+               WHERE username = ? AND content_hash IS NOT NULL
+               ORDER BY uploaded_at DESC, id DESC LIMIT ?""",
+            (username, limit)
+        )
+        results = cursor.fetchall()
+        cursor.close()
+    return results
+
 
-        # Delete all rows
-        cursor.execute("DELETE FROM uploads")
+def profile_path(content_hash, max_rows=None, sample=None, profile_dir=None):
+    """Cache file of the profile for a stored file and a set of profile options."""
+    options = f"{max_rows or 'all'}_{sample or 1:g}"
+    return Path(profile_dir or PROFILE_DIR) / f"{content_hash}_{options}_v{PROFILE_VERSION}.json"
 
-        # Commit changes
-        conn.commit()
-        conn.close()
+
+def _series_to_json(series):
+    if series is None:
+        return None
+    return {"name": series.name, "index_name": series.index.name,
+            "index": series.index.tolist(), "values": series.tolist()}
+
+
+def _series_from_json(data):
+    if data is None:
+        return None
+    return pd.Series(data["values"], index=pd.Index(data["index"], name=data["index_name"]),
+                     name=data["name"], dtype="int64")
+
+
+def profile_to_json(profile):
+    """A profile as plain JSON types: Series become index/values lists, the preview a split dict."""
+    stats = {}
+    for column, stat in profile["stats"].items():
+        stat = dict(stat)
+        for name in ("histogram", "top"):
+            if name in stat:
+                stat[name] = _series_to_json(stat[name])
+        stats[column] = stat
+    preview = profile["preview"].to_dict(orient="split", index=False)
+    return {**profile, "stats": stats, "preview": preview}
+
+
+def profile_from_json(data):
+    """Inverse of profile_to_json."""
+    for stat in data["stats"].values():
+        for name in ("histogram", "top"):
+            if name in stat:
+                stat[name] = _series_from_json(stat[name])
+    data["preview"] = pd.DataFrame(data["preview"]["data"], columns=data["preview"]["columns"])
+    return data
+
+
+def get_upload_profile(content_hash, max_rows=None, sample=None, upload_dir=None, profile_dir=None):
+    """
+    Profile of a stored upload, from the on-disk cache when it was profiled before.
+
+    Returns:
+        tuple: (profile dict, True if it came from the cache)
+    """
+    path = profile_path(content_hash, max_rows, sample, profile_dir)
+    if path.exists():
+        try:
+            with open(path, encoding="utf-8") as f:
+                return profile_from_json(json.load(f)), True
+        except Exception as e:
+            # a damaged cache file is just profiled again
+            print(f"XX Could not read cached profile {path.name}: {e}")
+
+    profile = profile_csv(upload_path(content_hash, upload_dir), max_rows=max_rows, sample=sample)
+    _write_atomic(path, lambda f: f.write(json.dumps(profile_to_json(profile)).encode("utf-8")))
+    return profile, False
+
+
+def clear_uploads_table():
+    """
+    Clears all records from the uploads table.
+    """
+    try:
+        with get_connection() as conn:
+            # Delete all rows, committed when the block exits
+            conn.execute("DELETE FROM uploads")
 
         print("Uploads table cleared successfully.")
         return True
@@ -1,9 +1,10 @@
+import hashlib
 import os
 
-import bcrypt
 from pathlib import Path
-from app.data.db import connect_database
-from app.data.users import get_user_by_username, insert_user
+from app.data.db import connect_database, get_connection
+from app.services.password_service import hash_password, verify_and_upgrade
+from app.data.users import get_user_by_username, insert_user, insert_users
 from app.data.schema import create_users_table, create_all_tables
 from app.data.csv_loaders import load_all_csv_data
 
@@ -21,11 +22,8 @@ def register_user(username, password, role='user'):
     Returns:
         tuple: (success: bool, message: str)
     """
-    # Hashing password
-    password_hash = bcrypt.hashpw(
-        password.encode('utf-8'),
-        bcrypt.gensalt()
-    ).decode('utf-8')
+    # Hashing password (in the password worker pool)
+    password_hash = hash_password(password)
 
     # Insert into database
     try:
@@ -50,43 +48,62 @@ def login_user(username, password):
     if not user:
         return False, "User not found."
 
-    # Verify password
+    # Verify password, and upgrade the stored hash if the bcrypt cost has changed since
     stored_hash = user[2]  # password_hash column
-    if bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8')):
-        return True, f"Login successful! Welcome {username}."
-    return False, "Incorrect password."
+    valid, new_hash = verify_and_upgrade(password, stored_hash)
+    if not valid:
+        return False, "Incorrect password."
+    if new_hash:
+        _update_password_hash(username, new_hash)
+    return True, f"Login successful! Welcome {username}."
+
+
+def _update_password_hash(username, password_hash):
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ?",
+            (password_hash, username)
+        )
 
 # DB_PATH = Path(r"C:\Users\senda\Desktop\CW2_M01045908_CST1510\DATA") / "intelligence_platform.db"
 # filepath= Path(r"C:\Users\senda\Desktop\CW2_M01045908_CST1510\DATA") / "users.txt"
 # filepath='DATA/users.txt'
-import os
-from pathlib import Path
-from app.data.db import connect_database
-from app.data.users import insert_user  # Use your insert_user function
 
-def migrate_users_from_file(filepath="DATA/user_info.txt"):
+def migrate_users_from_file(filepath="DATA/user_info.txt", force=False):
     """
-    Migrate users from a text file into the database using insert_user function.
+    Migrate users from a text file into the database in one transaction.
+
+    The file's SHA-256 is stored after each migration (file_imports table), so
+    calling this again with an unchanged file does nothing. Usernames already
+    in the database are left alone.
 
     Args:
-        filepath (str): Path to the users.txt file
+        filepath (str): Path to the users file ("username,password_hash,role" lines)
+        force (bool): Migrate even if the file hasn't changed
 
     Returns:
-        int: Number of users migrated
+        tuple: (inserted: int, skipped: int) - skipped counts existing, repeated and invalid lines
     """
     filepath = Path(filepath)
-    print("Checking file:", filepath)
-    print("Exists:", os.path.exists(filepath))
-
     if not filepath.exists():
         print(f"File not found: {filepath}")
-        return 0
-
-    migrated_count = 0
-    print(f"Reading users from: {filepath}")
-
-    with open(filepath, "r") as f:
-        for line in f:
+        return 0, 0
+
+    content = filepath.read_bytes()
+    content_hash = hashlib.sha256(content).hexdigest()
+    source = str(filepath.resolve())
+
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT content_hash FROM file_imports WHERE source = ?", (source,)
+        ).fetchone()
+        if row and row[0] == content_hash and not force:
+            print(f"Users file unchanged since the last migration: {filepath}")
+            return 0, 0
+
+        users = []
+        invalid = 0
+        for line in content.decode("utf-8").splitlines():
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
@@ -94,22 +111,25 @@ def migrate_users_from_file(filepath="DATA/user_info.txt"):
             parts = line.split(",")
             if len(parts) < 2:
                 print(f"Invalid line (skipped): {line}")
+                invalid += 1
                 continue
 
-            username = parts[0].strip()
-            password_hash = parts[1].strip()
             role = parts[2].strip() if len(parts) > 2 else "user"
+            users.append((parts[0].strip(), parts[1].strip(), role))
+
+        inserted = insert_users(conn, users)
+        conn.execute(
+            """INSERT INTO file_imports (source, content_hash, rows, imported_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+               ON CONFLICT(source) DO UPDATE SET
+                   content_hash = excluded.content_hash, rows = excluded.rows,
+                   imported_at = excluded.imported_at""",
+            (source, content_hash, len(users))
+        )
 
-            # Use insert_user function
-            success = insert_user(username, password_hash, role)
-            if success:
-                migrated_count += 1
-                print(f"Migrated user: {username}")
-            else:
-                print(f"Skipped (already exists): {username}")
-
-    print(f"Migration complete! {migrated_count} users migrated.")
-    return migrated_count
+    skipped = len(users) - inserted + invalid
+    print(f"Migration complete! {inserted} users migrated, {skipped} skipped.")
+    return inserted, skipped
 
 def change_user_password(username, old_password, new_password):
     """
@@ -129,25 +149,13 @@ def change_user_password(username, old_password, new_password):
         return False, "Current password is incorrect."
 
     # Hash new password
-    new_password_hash = bcrypt.hashpw(
-        new_password.encode('utf-8'),
-        bcrypt.gensalt()
-    ).decode('utf-8')
+    new_password_hash = hash_password(new_password)
 
     # Update password in database
-    conn = connect_database()
-    cursor = conn.cursor()
-
     try:
-        cursor.execute(
-            "UPDATE users SET password_hash = ? WHERE username = ?",
-            (new_password_hash, username)
-        )
-        conn.commit()
-        conn.close()
+        _update_password_hash(username, new_password_hash)
         return True, "Password changed successfully."
     except Exception as e:
-        conn.close()
         return False, f"Password change failed: {str(e)}"
 
 
@@ -227,12 +235,9 @@ def create_default_admin():
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
-
     # Check if any users exist
-    cursor.execute("SELECT COUNT(*) FROM users")
-    user_count = cursor.fetchone()[0]
+    with get_connection() as conn:
+        user_count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
 
     if user_count == 0:
         # Create default admin user
@@ -241,10 +246,8 @@ def create_default_admin():
             password="Admin123!",
             role="admin"
         )
-        conn.close()
         return success, f"Default admin created. {message}"
 
-    conn.close()
     return True, "Users already exist in database."
 
 
@@ -257,12 +260,11 @@ def setup_authentication_system():
     """
     try:
         # Ensure users table exists
-        conn = connect_database()
-        create_users_table(conn)
-        conn.close()
+        with get_connection() as conn:
+            create_users_table(conn)
 
         # Migrate existing users
-        migrated_count = migrate_users_from_file()
+        migrated_count, skipped_count = migrate_users_from_file()
 
         # Create default admin if no users
         if migrated_count == 0:
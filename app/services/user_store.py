@@ -0,0 +1,132 @@
+"""
+In-memory index of the users file (DATA/user_info.txt) for auth.py.
+
+The file has one "username,password_hash,role" line per user. It is read once
+into a dict keyed by username and read again only when its modification time
+or size changes (e.g. another process registered someone), so user_exists()
+and login lookups are dict lookups instead of a scan of the file.
+
+As before, the first line of a username is the one that counts. Writes go
+through the store: registering appends one line and indexes it under the same
+lock, and hash upgrades rewrite the file through a temp file and os.replace.
+"""
+import os
+import threading
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class UserStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._users = {}  # username -> (password_hash, role), None for a malformed line
+        self._signature = None
+        self.reloads = 0
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _refresh(self):
+        # call with the lock held
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return
+        users = {}
+        if signature is not None:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue  # blank lines aren't users
+                    parts = line.split(',')
+                    if parts[0] in users:
+                        continue  # only the first line of a username counts
+                    users[parts[0]] = (parts[1], parts[2]) if len(parts) >= 3 else None
+        self._users = users
+        self._signature = signature
+        self.reloads += 1
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._users)
+
+    def exists(self, username):
+        with self._lock:
+            self._refresh()
+            return username in self._users
+
+    def get(self, username):
+        """
+        Look a user up.
+
+        Returns:
+            tuple: (password_hash, role), or None if the user is unknown
+
+        Raises:
+            ValueError: if the user's line in the file is malformed
+        """
+        with self._lock:
+            self._refresh()
+            if username not in self._users:
+                return None
+            entry = self._users[username]
+        if entry is None:
+            raise ValueError(f"malformed line for user {username!r} in {self.path}")
+        return entry
+
+    def add(self, username, password_hash, role):
+        """Append a user to the file and the index, returns False if the username is taken."""
+        with self._lock:
+            self._refresh()
+            if username in self._users:
+                return False
+            # one write of the whole line, flushed before it is indexed
+            with open(self.path, 'a') as f:
+                f.write(f"{username},{password_hash},{role}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._users[username] = (password_hash, role)
+            self._signature = self._stat_signature()
+            return True
+
+    def replace_hash(self, username, new_hash):
+        """Swap the password hash on the user's (first) line, returns False if the user is unknown."""
+        with self._lock:
+            self._refresh()
+            entry = self._users.get(username)
+            if entry is None:
+                return False
+
+            # rewriting into a temp file and swapping it in, so the file is never half written
+            tmp_path = self.path + '.tmp'
+            replaced = False
+            with open(self.path, 'r') as f, open(tmp_path, 'w') as out:
+                for line in f:
+                    parts = line.strip().split(',')
+                    if not replaced and parts[0] == username and len(parts) > 1:
+                        parts[1] = new_hash
+                        line = ','.join(parts) + '\n'
+                        replaced = True
+                    out.write(line)
+            os.replace(tmp_path, self.path)
+
+            self._users[username] = (new_hash, entry[1])
+            self._signature = self._stat_signature()
+            return replaced
+
+
+def get_user_store(path):
+    """Return the shared store for a users file, one per path."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = UserStore(path)
+        return store
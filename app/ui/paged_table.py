@@ -0,0 +1,70 @@
+"""
+Paged table for Streamlit pages.
+
+Only the visible page is fetched. The cursors of the pages already visited are
+kept in st.session_state so "Previous" doesn't need OFFSET either.
+"""
+import pandas as pd
+import streamlit as st
+
+
+def paged_table(key, fetch_page, sort_options, labels=None, page_sizes=(25, 50, 100, 200),
+                filters=None):
+    """
+    Show one page of a table with sort and Previous/Next controls.
+
+    Args:
+        key: Unique name for this table, used for the widget and session state keys
+        fetch_page: function(last_key, page_size, sort_column, descending) -> (rows, next_key)
+                    where rows is a DataFrame or a ColumnarResult
+        sort_options: Columns the user can sort by, the first one is the default
+        labels: Optional {column name: label} for the table header
+        page_sizes: Choices for rows per page
+        filters: Anything hashable describing the current filters, changing it goes back to page 1
+
+    Returns:
+        DataFrame: The page that was shown
+    """
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_column = st.selectbox("Sort by", sort_options, key=f"{key}_sort")
+    with col2:
+        descending = st.checkbox("Descending", value=True, key=f"{key}_desc")
+    with col3:
+        page_size = st.selectbox("Rows per page", page_sizes, index=1 if len(page_sizes) > 1 else 0,
+                                 key=f"{key}_size")
+
+    # cursors[i] is the cursor that loads page i, page 0 starts with None
+    state_key = f"{key}_paging"
+    settings = (sort_column, descending, page_size, filters)
+    state = st.session_state.get(state_key)
+    if state is None or state["settings"] != settings:
+        state = {"settings": settings, "cursors": [None], "page": 0}
+        st.session_state[state_key] = state
+
+    rows, next_key = fetch_page(state["cursors"][state["page"]], page_size, sort_column, descending)
+    if isinstance(rows, pd.DataFrame):
+        df = rows.rename(columns=labels) if labels else rows
+    else:
+        df = rows.to_dataframe(labels)
+
+    if df.empty:
+        st.info("No rows to show")
+    else:
+        st.dataframe(df)
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("Previous", key=f"{key}_prev", disabled=state["page"] == 0):
+            state["page"] -= 1
+            st.rerun()
+    with page_col:
+        st.caption(f"Page {state['page'] + 1}")
+    with next_col:
+        if st.button("Next", key=f"{key}_next", disabled=next_key is None):
+            # keep the cursor so the page can be reached again with Previous/Next
+            del state["cursors"][state["page"] + 1:]
+            state["cursors"].append(next_key)
+            state["page"] += 1
+            st.rerun()
+    return df
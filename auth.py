@@ -1,34 +1,17 @@
-import bcrypt
 import os
 import re
 import streamlit as st
+from app.services import password_service
+from app.services.user_store import get_user_store
 
 
 def hashpassword(plain_text_password):
-    # encoding password to bytes
-    password_bytes = plain_text_password.encode('utf-8')
-
-    #generating a salt to be added to hashed password to make password stronger
-    salt = bcrypt.gensalt()
-
-    #hashing the password in bytes and later will need to be converted to string
-    hashed_password_bytes = bcrypt.hashpw(password_bytes, salt)
-
-    #hashed passoword being  converted to string
-    hashed_password_string = hashed_password_bytes.decode('utf-8')
-
-    return hashed_password_string
+    # bcrypt runs in the password worker pool, with the configured cost and a new salt
+    return password_service.hash_password(plain_text_password)
 
 def verify_password(hashed_password_string, plain_text_password):
-    #converting the plain text password to bytes for comparison
-    password_bytes = plain_text_password.encode('utf-8')
-
-
-    #converting the hashed password to bytes for comparison
-    hashed_bytes = hashed_password_string.encode('utf-8')
-
-    # this function extracts the salt from the hash and compares it
-    is_valid = bcrypt.checkpw(password_bytes, hashed_bytes)
+    # the salt is read from the stored hash; checked in the password worker pool
+    is_valid = password_service.verify_password(plain_text_password, hashed_password_string)
 
     print(is_valid)
     return is_valid
@@ -39,18 +22,9 @@ USER_DATA_FILE = 'DATA/user_info.txt'
 
 def user_exists(username):
     # """Check if a username already exists in the user data file"""
-    # handling the case were the file doesnt exist
+    # the file is indexed by username in memory and only read again when it changes
     try:
-        if not os.path.isfile(USER_DATA_FILE):
-            return False
-
-        with open(USER_DATA_FILE, 'r') as f:
-            for line in f:
-                # this will remove any white space and split by commas in the username
-                stored_username = line.strip().split(',')[0]
-                if stored_username == username:
-                    return True
-        return False
+        return get_user_store(USER_DATA_FILE).exists(username)
 
     # incase there is an error it will print the following plus the error message stored in error
     except Exception as error:
@@ -70,11 +44,13 @@ def register_user(username, password, role):
     hashed_password = hashpassword(password)
 
     try :
-        # appending the username, hashed password and role to the file
-        with open(USER_DATA_FILE, 'a') as f:
-            f.write(f"{username},{hashed_password},{role}\n")
-            print(f"User {username} registered successfully with role: {role}")
-            return True
+        # appending the username, hashed password and role to the file (and the index)
+        # the store checks again under its lock, in case someone took the name meanwhile
+        if not get_user_store(USER_DATA_FILE).add(username, hashed_password, role):
+            print(f"User {username} already exists")
+            return False
+        print(f"User {username} registered successfully with role: {role}")
+        return True
 
     except Exception as error:
         # incase there is an error it will print the following plus the error message stored in error
@@ -83,37 +59,37 @@ def register_user(username, password, role):
 
 
 def login_user(username, password):
-    # checking if the registered users by checking if the file is empty
-    if os.path.getsize(USER_DATA_FILE) == 0:
-        print("no users registered yet")
-        return False
-
     try:
-        with open(USER_DATA_FILE, 'r') as f:
-            for line in f:
-                stored_username = line.strip().split(',')[0]
-                stored_hash = line.strip().split(',')[1]
-                role = line.strip().split(',')[2]
-
-                # check username
-                if stored_username == username:
-                    # check password
-                    if verify_password(stored_hash, password):
-                        print(f"successfully logged in: {stored_username}")
-
-                        # If the user is admin it will return admin flag
-                        if role == "admin":
-                            return "admin"
-
-                        return True
-                    else:
-                        print(f"invalid password login failed with: {stored_username}")
-                        return False
-
-
-        # If we get here, we've checked all users and didn't find the username
-        print("username not found")
-        return False
+        store = get_user_store(USER_DATA_FILE)
+
+        # checking if the registered users by checking if the file is empty
+        if len(store) == 0:
+            print("no users registered yet")
+            return False
+
+        user = store.get(username)
+        if user is None:
+            print("username not found")
+            return False
+        stored_hash, role = user
+
+        # check password
+        valid, new_hash = password_service.verify_and_upgrade(password, stored_hash)
+        if not valid:
+            print(f"invalid password login failed with: {username}")
+            return False
+
+        print(f"successfully logged in: {username}")
+
+        # the bcrypt cost changed since this hash was made, store the upgraded one
+        if new_hash:
+            replace_password_hash(username, new_hash)
+
+        # If the user is admin it will return admin flag
+        if role == "admin":
+            return "admin"
+
+        return True
 
     except Exception as error:
         print(f"Failed to login user: {error}")
@@ -121,6 +97,14 @@ def login_user(username, password):
 
 
 
+def replace_password_hash(username, new_hash):
+    # only the first line of a username counts at login, so only that one is changed
+    try:
+        get_user_store(USER_DATA_FILE).replace_hash(username, new_hash)
+    except Exception as error:
+        print(f"Failed to upgrade password hash for {username}: {error}")
+
+
 def validate_username(username):
     # """
     # Validating username format using regex.
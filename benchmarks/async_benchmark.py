@@ -0,0 +1,78 @@
+"""
+Sequential vs concurrent latency of the ticket bottleneck queries.
+
+Seeds a throwaway database with synthetic tickets (app/data/synthetic.py), then
+times the three queries of the AI analysis bottleneck view (get_slowest_status,
+get_slowest_staff, get_avg_resolution_time) one after another and through
+async_db.gather_sync.
+The query cache is bypassed so every run really hits SQLite.
+
+The gain depends on the number of cores: the queries only overlap while SQLite
+runs without the GIL, so on a single core expect little or no improvement.
+
+Usage (from the project root):
+    python -m benchmarks.async_benchmark
+    python -m benchmarks.async_benchmark --rows 500000 --runs 10 --output async.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.data import synthetic, tickets  # noqa: E402
+from app.data.async_db import gather_sync  # noqa: E402
+from app.data.db import get_connection, init_database  # noqa: E402
+
+# the cached functions keep the original as .uncached
+QUERIES = [tickets.get_slowest_status.uncached, tickets.get_slowest_staff.uncached,
+           tickets.get_avg_resolution_time.uncached]
+
+
+def timed(func, runs):
+    func()  # warm up connections and the page cache
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": statistics.median(times)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs gathered bottleneck queries")
+    parser.add_argument("--rows", type=int, default=200_000, help="tickets to generate")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per variant")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        init_database(Path(tmp) / "async_benchmark.db")
+        print(f"Seeding {args.rows:,} tickets...")
+        with get_connection() as conn:
+            synthetic.seed_table(conn, "it_tickets", args.rows)
+
+        results = {
+            "sequential": timed(lambda: [query() for query in QUERIES], args.runs),
+            "gather_sync": timed(lambda: gather_sync(*QUERIES), args.runs),
+        }
+
+    results["speedup"] = results["sequential"]["median"] / results["gather_sync"]["median"]
+    results["cpus"] = os.cpu_count()
+    print(f"{'variant':<14}{'best s':>10}{'median s':>10}")
+    for name in ("sequential", "gather_sync"):
+        print(f"{name:<14}{results[name]['best']:>10.3f}{results[name]['median']:>10.3f}")
+    print(f"speedup {results['speedup']:.2f}x on {results['cpus']} CPU(s)")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Read functions of incidents.py, tickets.py and datasets.py at growing table sizes.
+
+For every size the three domain tables are seeded with that many rows each
+from the synthetic data generators (app/data/synthetic.py), through the normal
+schema so indexes, counters, the rollup and the full-text tables are all
+maintained. Then every public read function is timed with the query cache
+bypassed. Results are saved as JSON and can be diffed against an earlier run
+to spot regressions:
+
+    python -m benchmarks.data_access_benchmark --sizes 10k,100k --output baseline.json
+    ... change something ...
+    python -m benchmarks.data_access_benchmark --sizes 10k,100k --baseline baseline.json
+
+With --baseline the exit code is 1 if any function got slower than --threshold.
+
+Seeding 1M rows per table takes minutes and 10M takes a long time and several
+GB of disk, so seeded databases can be kept with --db-dir and are reused by
+later runs. Functions that load a whole table into memory (get_all_*, the
+unfiltered LIKE search) are skipped above --max-full-rows.
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.data import datasets, incidents, synthetic, tickets  # noqa: E402
+from app.data.cache import clear_cache  # noqa: E402
+from app.data.db import get_connection, init_database  # noqa: E402
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    return int(text.replace("_", ""))
+
+
+def seed_database(rows, seed=42):
+    """Fill cyber_incidents, it_tickets and datasets_metadata with `rows` synthetic rows each."""
+    with get_connection() as conn:
+        # only for seeding: a crash just means seeding again
+        conn.execute("PRAGMA synchronous = OFF")
+        for table in synthetic.GENERATORS:
+            synthetic.seed_table(conn, table, rows, seed=seed)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("ANALYZE")
+
+
+def seeded_rows():
+    with get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+
+
+# (name, function, args, loads the whole table)
+def benchmark_cases(rows):
+    middle = rows // 2
+    return [
+        ("incidents.get_all_incidents", incidents.get_all_incidents, (), True),
+        ("incidents.get_incident_by_id", incidents.get_incident_by_id, (str(1000 + middle),), False),
+        ("incidents.get_incident_by_type", incidents.get_incident_by_type, ("Phishing",), True),
+        ("incidents.get_incident_by_severity", incidents.get_incident_by_severity, ("Critical",), True),
+        ("incidents.get_incidents_by_status", incidents.get_incidents_by_status, ("Open",), True),
+        ("incidents.get_incident_stats", incidents.get_incident_stats, (), False),
+        ("incidents.search_incidents", incidents.search_incidents, ("suspicious email",), True),
+        ("incidents.search_incidents_ranked", incidents.search_incidents_ranked, ("suspicious email",), False),
+        ("incidents.get_incident_filter_options", incidents.get_incident_filter_options, (), False),
+        ("incidents.get_incident_rollup", incidents.get_incident_rollup, (), False),
+        ("incidents.query_incidents", incidents.query_incidents,
+         (None, None, "All", "High", "All", 0), False),
+        ("incidents.get_incidents_page", incidents.get_incidents_page, (None, 50), False),
+
+        ("tickets.get_all_tickets", tickets.get_all_tickets, (), True),
+        ("tickets.get_ticket_by_id", tickets.get_ticket_by_id, (2000 + middle,), False),
+        ("tickets.get_tickets_by_status", tickets.get_tickets_by_status, ("Open",), True),
+        ("tickets.get_tickets_by_assignee", tickets.get_tickets_by_assignee, ("IT_Support_7",), False),
+        ("tickets.get_slowest_status", tickets.get_slowest_status, (), False),
+        ("tickets.get_slowest_staff", tickets.get_slowest_staff, (), False),
+        ("tickets.get_avg_resolution_time", tickets.get_avg_resolution_time, (), False),
+        ("tickets.get_oldest_pending_tickets", tickets.get_oldest_pending_tickets, (), False),
+        ("tickets.search_tickets_ranked", tickets.search_tickets_ranked, ("password reset",), False),
+        ("tickets.get_tickets_page", tickets.get_tickets_page, (None, 50), False),
+        ("tickets.get_all_tickets_columnar", tickets.get_all_tickets_columnar, (), True),
+
+        ("datasets.get_all_datasets", datasets.get_all_datasets, (), True),
+        ("datasets.get_dataset_by_id", datasets.get_dataset_by_id, (str(1 + middle),), False),
+        ("datasets.get_large_datasets", datasets.get_large_datasets, (), True),
+        ("datasets.get_old_datasets", datasets.get_old_datasets, (), True),
+        ("datasets.get_user_datasets", datasets.get_user_datasets, ("data_user_7",), False),
+        ("datasets.get_dataset_stats", datasets.get_dataset_stats, (), False),
+        ("datasets.get_recent_uploads", datasets.get_recent_uploads, (), False),
+        ("datasets.get_datasets_page", datasets.get_datasets_page, (None, 50), False),
+        ("datasets.get_all_datasets_columnar", datasets.get_all_datasets_columnar, (), True),
+    ]
+
+
+def time_call(func, args, runs):
+    # the query cache would turn every run after the first into a dict lookup; the row
+    # list functions call a cached columnar query, so the cache is emptied before each run
+    func = getattr(func, "uncached", func)
+    times = []
+    result = None
+    for _ in range(runs):
+        clear_cache()
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    try:
+        returned = len(result)
+    except TypeError:
+        returned = None
+    return {"best": min(times), "median": statistics.median(times), "rows": returned}
+
+
+def run_size(rows, runs, max_full_rows, only=None):
+    results = {}
+    for name, func, args, full_read in benchmark_cases(rows):
+        if only and not any(part in name for part in only):
+            continue
+        if full_read and rows > max_full_rows:
+            results[name] = {"skipped": f"loads the whole table (> {max_full_rows:,} rows)"}
+            continue
+        try:
+            results[name] = time_call(func, args, runs)
+        except Exception as e:
+            # a broken function shouldn't stop the rest of the suite
+            results[name] = {"error": str(e)}
+            print(f"  {name:<42}{'error':>10}  {e}")
+            continue
+        print(f"  {name:<42}{results[name]['best']:>10.4f} s")
+    return results
+
+
+def compare(results, baseline, threshold, min_delta):
+    """
+    Print current vs baseline best times, returns the list of regressions.
+
+    Best-of-runs is compared because it is the least noisy; a function only
+    counts as slower if it lost more than `threshold` and more than `min_delta` seconds.
+    """
+    regressions = []
+    print(f"\n{'size':<6}{'function':<42}{'baseline s':>12}{'now s':>10}{'change':>9}")
+    for size, functions in results["results"].items():
+        for name, current in functions.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before or "best" not in before or "best" not in current:
+                continue
+            change = current["best"] / before["best"] - 1 if before["best"] else 0.0
+            flag = ""
+            if change > threshold and current["best"] - before["best"] > min_delta:
+                flag = "  <-- slower"
+                regressions.append((size, name, change))
+            print(f"{size:<6}{name:<42}{before['best']:>12.4f}{current['best']:>10.4f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data access functions at growing table sizes")
+    parser.add_argument("--sizes", default="10k,100k",
+                        help="comma separated rows per table, e.g. 10k,100k,1m,10m")
+    parser.add_argument("--runs", type=int, default=3, help="runs per function")
+    parser.add_argument("--db-dir", help="keep seeded databases here and reuse them")
+    parser.add_argument("--max-full-rows", type=int, default=1_000_000,
+                        help="skip whole-table reads above this many rows")
+    parser.add_argument("--only", help="comma separated name filters, e.g. tickets.,search")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against an earlier --output file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown that counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.002,
+                        help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "runs": args.runs,
+        },
+        "results": {},
+    }
+    only = [part for part in (args.only or "").split(",") if part]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_dir = Path(args.db_dir or tmp)
+        db_dir.mkdir(parents=True, exist_ok=True)
+        for label in args.sizes.split(","):
+            rows = parse_size(label)
+            label = label.strip().lower()
+            init_database(db_dir / f"data_access_{label}.db")
+            clear_cache()
+            if seeded_rows() != rows:
+                if seeded_rows():
+                    sys.exit(f"{db_dir / f'data_access_{label}.db'} holds a different size, delete it first")
+                print(f"Seeding {rows:,} rows per table...")
+                start = time.perf_counter()
+                seed_database(rows)
+                print(f"  seeded in {time.perf_counter() - start:.1f} s")
+            print(f"{label} ({rows:,} rows per table)")
+            results["results"][label] = run_size(rows, args.runs, args.max_full_rows, only)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Saved to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} functions are more than {args.threshold:.0%} slower than the baseline")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Login throughput: bcrypt inline vs the password worker pool.
+
+Simulates a burst of logins arriving on several Streamlit script threads at
+once and reports logins per second when every thread calls bcrypt.checkpw
+itself, and when they go through password_service.verify_password.
+
+Usage (from the project root):
+    python -m benchmarks.login_benchmark
+    python -m benchmarks.login_benchmark --rounds 12 --logins 64 --threads 16 --output login.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import bcrypt  # noqa: E402
+
+from app.services import password_service  # noqa: E402
+
+PASSWORD = "Benchmark123!"
+
+
+def inline_check(stored_hash):
+    return bcrypt.checkpw(PASSWORD.encode("utf-8"), stored_hash.encode("utf-8"))
+
+
+def pooled_check(stored_hash):
+    return password_service.verify_password(PASSWORD, stored_hash)
+
+
+def burst(check, hashes, threads):
+    """Run one login per hash from `threads` concurrent threads, return logins per second."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(check, hashes))
+    seconds = time.perf_counter() - start
+    assert all(results)
+    return len(hashes) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt login throughput, inline vs process pool")
+    parser.add_argument("--rounds", type=int, default=password_service.MIN_ROUNDS, help="bcrypt cost")
+    parser.add_argument("--logins", type=int, default=32, help="logins in the burst")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent script threads")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    stored = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(args.rounds)).decode("utf-8")
+    hashes = [stored] * args.logins
+
+    # start the worker processes before timing
+    pooled_check(stored)
+
+    results = {
+        "rounds": args.rounds,
+        "cpus": os.cpu_count(),
+        "inline_logins_per_second": burst(inline_check, hashes, args.threads),
+        "pool_logins_per_second": burst(pooled_check, hashes, args.threads),
+    }
+    results["speedup"] = results["pool_logins_per_second"] / results["inline_logins_per_second"]
+
+    print(f"bcrypt cost {args.rounds}, {args.logins} logins on {args.threads} threads, {results['cpus']} CPU(s)")
+    print(f"inline  {results['inline_logins_per_second']:8.1f} logins/s")
+    print(f"pool    {results['pool_logins_per_second']:8.1f} logins/s")
+    print(f"speedup {results['speedup']:.2f}x")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
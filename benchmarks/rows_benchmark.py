@@ -0,0 +1,110 @@
+"""
+Memory and time of the ticket result types at 1M rows.
+
+Compares, on a throwaway database:
+    tuples     cursor.fetchall() then pd.DataFrame(rows, columns=[...])  (what the pages used to do)
+    columnar   ColumnarResult.from_cursor(cursor).to_dataframe()
+and, for single records, a list of plain tuples against a list of TicketRow objects.
+
+Peak memory is measured with tracemalloc, which also sees numpy/pandas allocations.
+
+Usage (from the project root):
+    python -m benchmarks.rows_benchmark
+    python -m benchmarks.rows_benchmark --rows 100000 --output rows.json
+"""
+import argparse
+import gc
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd  # noqa: E402
+
+from app.data import synthetic  # noqa: E402
+from app.data.rows import ColumnarResult, TicketRow  # noqa: E402
+from app.data.schema import create_it_tickets_table  # noqa: E402
+
+
+def seed_tickets(db_path, rows):
+    """Create it_tickets in db_path and fill it with `rows` synthetic tickets."""
+    conn = sqlite3.connect(db_path)
+    create_it_tickets_table(conn)
+    synthetic.seed_table(conn, "it_tickets", rows)
+    conn.close()
+
+
+def measure(func):
+    """Run func once, return (result, seconds, peak MB)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def run_benchmark(db_path):
+    conn = sqlite3.connect(db_path)
+    columns = list(TicketRow._fields)
+    sql = "SELECT * FROM it_tickets"
+
+    def tuples_to_dataframe():
+        rows = conn.execute(sql).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def columnar_to_dataframe():
+        return ColumnarResult.from_cursor(conn.execute(sql)).to_dataframe()
+
+    def tuple_rows():
+        return conn.execute(sql).fetchall()
+
+    def slot_rows():
+        return [TicketRow(*row) for row in conn.execute(sql)]
+
+    results = {}
+    for name, func in [("dataframe_from_tuples", tuples_to_dataframe),
+                       ("dataframe_from_columnar", columnar_to_dataframe),
+                       ("rows_as_tuples", tuple_rows),
+                       ("rows_as_TicketRow", slot_rows)]:
+        result, seconds, peak = measure(func)
+        results[name] = {"seconds": seconds, "peak_mb": peak, "rows": len(result)}
+        del result
+    conn.close()
+    return results
+
+
+def print_results(results):
+    print(f"{'variant':<26}{'rows':>10}{'seconds':>10}{'peak MB':>10}")
+    for name, r in results.items():
+        print(f"{name:<26}{r['rows']:>10}{r['seconds']:>10.2f}{r['peak_mb']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tuples vs slotted rows vs columnar results")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="tickets to generate")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "rows_benchmark.db")
+        print(f"Seeding {args.rows:,} tickets...")
+        seed_tickets(db_path, args.rows)
+        results = run_benchmark(db_path)
+
+    print_results(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Arrow snapshot reads against pd.read_sql_query for the incidents table.
+
+Seeds a throwaway database with synthetic incidents (app/data/synthetic.py), then times:
+    read_sql_query      pd.read_sql_query("SELECT * FROM cyber_incidents")  (the current path)
+    export              writing the Arrow snapshot (paid once per change)
+    mmap_arrow          load_snapshot(), the memory-mapped pyarrow.Table
+    mmap_to_pandas      load_snapshot().to_pandas()
+    mmap_two_columns    load_snapshot(columns=[severity, status]).to_pandas()
+
+Needs pyarrow. Usage (from the project root):
+    python -m benchmarks.snapshot_benchmark
+    python -m benchmarks.snapshot_benchmark --rows 1000000 --runs 3 --output snapshots.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd  # noqa: E402
+
+from app.data import snapshots, synthetic  # noqa: E402
+from app.data.db import get_connection, init_database  # noqa: E402
+
+def best_of(func, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": statistics.median(times)}
+
+
+def run_benchmark(snapshot_dir, runs):
+    def read_sql():
+        with get_connection() as conn:
+            return pd.read_sql_query("SELECT * FROM cyber_incidents", conn)
+
+    def export():
+        return snapshots.export_snapshot("cyber_incidents", snapshot_dir)
+
+    def mmap_arrow():
+        return snapshots.load_snapshot("cyber_incidents", snapshot_dir=snapshot_dir)
+
+    def mmap_to_pandas():
+        return mmap_arrow().to_pandas()
+
+    def mmap_two_columns():
+        return snapshots.load_snapshot("cyber_incidents", ["severity", "status"], snapshot_dir).to_pandas()
+
+    results = {"export": best_of(export, 1)}
+    for name, func in [("read_sql_query", read_sql), ("mmap_arrow", mmap_arrow),
+                       ("mmap_to_pandas", mmap_to_pandas), ("mmap_two_columns", mmap_two_columns)]:
+        results[name] = best_of(func, runs)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arrow snapshot vs read_sql_query")
+    parser.add_argument("--rows", type=int, default=200_000, help="incidents to generate")
+    parser.add_argument("--runs", type=int, default=5, help="runs per variant")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    if not snapshots.arrow_available():
+        sys.exit("pyarrow is not installed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        init_database(Path(tmp) / "snapshot_benchmark.db")
+        print(f"Seeding {args.rows:,} incidents...")
+        with get_connection() as conn:
+            synthetic.seed_table(conn, "cyber_incidents", args.rows)
+        results = run_benchmark(Path(tmp) / "snapshots", args.runs)
+
+    print(f"{'variant':<20}{'best s':>10}{'median s':>10}")
+    for name, r in results.items():
+        print(f"{name:<20}{r['best']:>10.3f}{r['median']:>10.3f}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
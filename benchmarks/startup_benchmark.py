@@ -0,0 +1,150 @@
+"""
+Cold import benchmark for the Streamlit pages.
+
+Every page is a script, so it can't simply be imported without running the UI.
+Instead the top level import statements of each page are pulled out with ast and
+executed in a fresh interpreter, which is exactly the work Streamlit repeats
+before the first widget renders. Modules that aren't installed are skipped and
+listed in the output.
+
+Usage (from the project root):
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --runs 10 --output after.json
+    python -m benchmarks.startup_benchmark --ref HEAD~1        # before vs after in one go
+    python -m benchmarks.startup_benchmark --compare before.json
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# runs inside the child interpreter: time every import statement of one page
+CHILD_SCRIPT = r"""
+import json, sys, time
+root, statements = sys.argv[1], json.loads(sys.argv[2])
+sys.path.insert(0, root)
+missing = []
+start = time.perf_counter()
+for statement in statements:
+    try:
+        exec(statement, {})
+    except ModuleNotFoundError as e:
+        missing.append(e.name)
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "missing": sorted(set(missing))}))
+"""
+
+
+def page_files(root):
+    """Return login.py plus every page script under pages/."""
+    root = Path(root)
+    files = [root / "login.py"] + sorted((root / "pages").glob("*.py"))
+    return [f for f in files if f.exists()]
+
+
+def import_statements(path):
+    """Return the source of the top level import statements of a script."""
+    source = Path(path).read_text(encoding="utf-8")
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        # newer syntax than this interpreter understands - fall back to
+        # single line imports that start at column 0
+        return [line.rstrip() for line in source.splitlines()
+                if line.startswith(("import ", "from ")) and not line.rstrip().endswith("(")]
+    return [ast.get_source_segment(source, node)
+            for node in tree.body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def time_page(root, path, runs):
+    """Run the page imports `runs` times, each in a new interpreter."""
+    statements = json.dumps(import_statements(path))
+    timings = []
+    missing = []
+    for _ in range(runs):
+        # run from a scratch directory so old trees with relative paths don't litter the repo
+        with tempfile.TemporaryDirectory() as scratch:
+            result = subprocess.run(
+                [sys.executable, "-c", CHILD_SCRIPT, str(root), statements],
+                capture_output=True, text=True, cwd=scratch,
+            )
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "failed"}
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(data["seconds"])
+        missing = data["missing"]
+
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+        "runs": runs,
+        "missing_modules": missing,
+    }
+
+
+def run_benchmark(root, runs):
+    """Benchmark every page of the tree at root."""
+    return {path.name: time_page(root, path, runs) for path in page_files(root)}
+
+
+def run_for_ref(ref, runs):
+    """Check out a git ref into a temporary worktree and benchmark it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = Path(tmp) / "tree"
+        subprocess.run(["git", "worktree", "add", "--detach", str(worktree), ref],
+                       cwd=PROJECT_ROOT, check=True, capture_output=True)
+        try:
+            return run_benchmark(worktree, runs)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", str(worktree)],
+                           cwd=PROJECT_ROOT, capture_output=True)
+
+
+def print_results(results, baseline=None):
+    print(f"{'page':<32}{'median ms':>12}{'before ms':>12}{'change':>10}")
+    for page, data in results.items():
+        if "error" in data:
+            print(f"{page:<32}  error: {data['error']}")
+            continue
+        line = f"{page:<32}{data['median_ms']:>12.2f}"
+        before = (baseline or {}).get(page, {})
+        if "median_ms" in before:
+            change = (data["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+            line += f"{before['median_ms']:>12.2f}{change:>9.1f}%"
+        print(line)
+        if data["missing_modules"]:
+            print(f"{'':<4}skipped (not installed): {', '.join(data['missing_modules'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time of each Streamlit page")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per page")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--ref", help="git ref to benchmark as the 'before' tree")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+    elif args.ref:
+        print(f"Benchmarking {args.ref}...")
+        baseline = run_for_ref(args.ref, args.runs)
+
+    results = run_benchmark(PROJECT_ROOT, args.runs)
+    print_results(results, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
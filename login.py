@@ -1,7 +1,7 @@
 import streamlit as st
 from app.services.user_service import *
 import auth
-import time
+from app.services import tracing
 
 
 # CLASS DEFINITIONS
@@ -188,7 +188,6 @@ class AuthenticationUI:
             session_manager: Instance of SessionStateManager for managing user session
         """
         self.session = session_manager  # Store session manager instance
-        self.conn = connect_database()  # Establish database connection
 
     def setup_page(self):
         """Setup page configuration and initial styling"""
@@ -228,17 +227,18 @@ class AuthenticationUI:
     def handle_login(self, username, password):
         """Process login attempt and handle the response"""
         # Call external auth module to verify credentials
-        login_result = auth.login_user(username, password)
+        with tracing.span("auth.login_user", "other"):
+            login_result = auth.login_user(username, password)
 
         if login_result:  # If login is successful
             with st.spinner('Logging in...'):  # Show loading spinner
-                time.sleep(2)  # Simulate processing delay
+                tracing.sleep(2, "login spinner")  # Simulate processing delay
                 # Update session state
                 self.session.logged_in = True
                 self.session.username = username
                 self.session.is_admin = login_result == "admin"  # Determine if user is admin
             st.success('Logged in successfully!')
-            time.sleep(1)  # Brief pause to show success message
+            tracing.sleep(1, "login success message")  # Brief pause to show success message
             st.switch_page("pages/1_Home.py")  # Redirect to home page
         else:
             st.error("Invalid username or password")  # Show error for failed login
@@ -251,10 +251,11 @@ class AuthenticationUI:
                 agree):
 
             # Register the user in the system
-            auth.register_user(username, password, role)
+            with tracing.span("auth.register_user", "other"):
+                auth.register_user(username, password, role)
 
             with st.spinner('Loading data...'):  # Show loading spinner
-                time.sleep(2)  # Simulate processing delay
+                tracing.sleep(2, "registration spinner")  # Simulate processing delay
 
             st.success('Registration successful!')
             st.balloons()  # Celebration animation
@@ -264,7 +265,8 @@ class AuthenticationUI:
             self.session.username = username
 
             # Migrate users from file (if applicable)
-            migrate_users_from_file()
+            with tracing.span("migrate_users_from_file", "db"):
+                migrate_users_from_file()
 
             # Redirect to home page
             st.switch_page("pages/1_Home.py")
@@ -282,13 +284,14 @@ class AuthenticationUI:
         # Logout button
         if st.button("Log out"):
             with st.spinner('Logging out...'):
-                time.sleep(1)  # Simulate logout delay
+                tracing.sleep(1, "logout spinner")  # Simulate logout delay
             self.session.logout()  # Clear session state
             st.rerun()  # Refresh the page to show login form
 
     def run(self):
         """Main method that orchestrates the entire authentication flow"""
         self.setup_page()  # Setup initial page configuration
+        tracing.start_trace("Login")
 
         # Check if user is already logged in
         if not self.session.logged_in:
@@ -326,7 +329,7 @@ class AuthenticationUI:
             # User is already logged in, show appropriate view
             self.render_logged_in_view()
 
-        self.conn.close()  # Close database connection
+        tracing.end_trace()
 
 
 # MAIN EXECUTION
@@ -1,23 +1,72 @@
+import argparse
 import pathlib
+import time
+from datetime import datetime
 
-from app.data.db import connect_database
-from app.data.schema import create_all_tables, conn
+from app.data.db import connect_database, init_database
+from app.data.migrations import vacuum_database
+from app.data.schema import create_all_tables
 from app.services.user_service import*
+from app.services import password_service
 from app.data.incidents import insert_incident, get_all_incidents
-from app.data.csv_loaders import load_all_csv_data
+from app.data.csv_loaders import load_all_csv_data, load_all_csv_data_parallel
+from app.data.snapshots import arrow_available, export_all_snapshots
+from app.data.synthetic import GENERATED_DIR, generate_csvs
 from app.data.tickets import*
 from app.data.datasets import *
 from pathlib import Path
 from app.data.users import*
 
-def csv():
+def csv(workers=1, data_dir=None):
 
     # Loading  CSV data
     print("Loading CSV data...")
+    init_database()
+    if workers > 1:
+        # parse the files in parallel processes, one thread writes to the database
+        result = load_all_csv_data_parallel(workers=workers, data_dir=data_dir)
+        total_rows = sum(result["rows"].values()) if not result["errors"] else 0
+    else:
+        conn = connect_database()
+        total_rows = load_all_csv_data(conn, data_dir=data_dir)
+        conn.close()
+    print(f"       Loaded {total_rows} total rows from CSV files")
+
+    # refresh the Arrow snapshots the dashboards read (skipped without pyarrow)
+    if arrow_available():
+        for table, rows in export_all_snapshots().items():
+            print(f"       Snapshot {table}: {rows} rows")
+
+
+def generate(args):
+
+    # writing synthetic CSVs for load testing, streamed so memory use doesn't grow with the row counts
+    start = datetime.strptime(args.start, "%Y-%m-%d") if args.start else None
+    end = datetime.strptime(args.end, "%Y-%m-%d") if args.end else None
+    print(f"Generating CSV data in {args.out_dir}...")
+    began = time.perf_counter()
+    written = generate_csvs(args.out_dir, args.incidents, args.tickets, args.datasets, start, end,
+                            args.assignees, args.reporters, args.uploaders, args.seed)
+    for name, rows in written.items():
+        print(f"       {name}: {rows:,} rows")
+    print(f"       Done in {time.perf_counter() - began:.1f}s, load with: python main.py csv --data-dir {args.out_dir}")
+
+def maintain():
+
+    # compacting the database; the full-text indexes are rebuilt right after the VACUUM
+    print("Compacting the database...")
+    init_database()
     conn = connect_database()
-    total_rows = load_all_csv_data(conn)
+    vacuum_database(conn)
     conn.close()
-    print(f"       Loaded {total_rows} total rows from CSV files")
+    print("       Done, full-text indexes rebuilt")
+
+
+def calibrate(target_ms):
+
+    # measuring the bcrypt cost this machine can afford, nothing is changed
+    rounds = password_service.calibrate_rounds(target_ms, apply=False)
+    print(f"       Set BCRYPT_ROUNDS={rounds} to use it, or BCRYPT_TARGET_MS={target_ms:g} to calibrate on startup")
 
 # def main():
 #     print("=" * 60)
@@ -191,7 +240,41 @@ if __name__ == "__main__":
     # run()
     # connect_database()
     # main()
-    csv()
+    parser = argparse.ArgumentParser(description="Platform data tools")
+    commands = parser.add_subparsers(dest="command")
+
+    csv_parser = commands.add_parser("csv", help="load the CSV files in DATA/ into the database (default)")
+    csv_parser.add_argument("--workers", type=int, default=1,
+                            help="parser processes; more than 1 loads the files in parallel")
+    csv_parser.add_argument("--data-dir", help="folder with the CSV files (default: DATA/)")
+
+    generate_parser = commands.add_parser("generate", help="write synthetic CSVs for load testing")
+    generate_parser.add_argument("--out-dir", default=str(GENERATED_DIR), help="folder for the CSV files")
+    generate_parser.add_argument("--incidents", type=int, default=10000, help="cyber_incidents rows")
+    generate_parser.add_argument("--tickets", type=int, default=10000, help="it_tickets rows")
+    generate_parser.add_argument("--datasets", type=int, default=500, help="datasets_metadata rows")
+    generate_parser.add_argument("--start", help="first date, YYYY-MM-DD (default: two years ago)")
+    generate_parser.add_argument("--end", help="last date, YYYY-MM-DD (default: today)")
+    generate_parser.add_argument("--assignees", type=int, default=40, help="distinct ticket assignees")
+    generate_parser.add_argument("--reporters", type=int, default=50, help="distinct incident reporters")
+    generate_parser.add_argument("--uploaders", type=int, default=20, help="distinct dataset uploaders")
+    generate_parser.add_argument("--seed", type=int, default=42, help="same seed, same files")
+
+    commands.add_parser("maintain", help="VACUUM the database and rebuild the full-text indexes")
+
+    calibrate_parser = commands.add_parser("calibrate", help="print the bcrypt cost that fits a time per hash")
+    calibrate_parser.add_argument("--target-ms", type=float, default=250, help="time per password hash")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args)
+    elif args.command == "maintain":
+        maintain()
+    elif args.command == "calibrate":
+        calibrate(args.target_ms)
+    else:
+        # no command keeps the old behaviour of `python main.py`
+        csv(workers=getattr(args, "workers", 1), data_dir=getattr(args, "data_dir", None))
     #  mainn()
 
 
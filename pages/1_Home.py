@@ -1,7 +1,8 @@
 import pandas as pd
 import streamlit as st
-import time
 from app.services.upload_service import *
+from app.services.upload_profiler import summary_table, numeric_columns, categorical_columns, chart_data
+from app.services import tracing
 
 
 # Set page config first
@@ -15,12 +16,14 @@ if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.warning("You must log in to access this page.")
     st.stop()
 
+tracing.start_trace("Home")
+
 # Welcome message with better styling
 placeholder = st.empty()
 with placeholder.container():
     st.success(f"Welcome back, {st.session_state['username']}!")
 
-time.sleep(2)
+tracing.sleep(2, "welcome message")
 placeholder.empty()
 
 # Main content
@@ -83,79 +86,140 @@ if upload_on:
         help="Upload a CSV file for analysis"
     )
 
+    username = st.session_state["username"]
+    content_hash = None
+
     if uploaded_file is not None:
         try:
-            # Read CSV safely
-            df = pd.read_csv(uploaded_file, encoding='utf-8')
+            # stored under its sha256 once per uploaded file, not on every rerun
+            upload_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, "file_id", None))
+            if st.session_state.get("upload_key") != upload_key:
+                with tracing.span("store_upload", "db"):
+                    st.session_state["upload_hash"], _ = store_upload(username, uploaded_file.name, uploaded_file)
+                st.session_state["upload_key"] = upload_key
+            content_hash = st.session_state["upload_hash"]
+        except Exception as e:
+            st.sidebar.error(f"Error saving file: {e}")
+
+    # earlier uploads open from the stored copy and its cached profile
+    with tracing.span("get_user_uploads", "db"):
+        previous_uploads = get_user_uploads(username)
+    if content_hash is None and previous_uploads:
+        labels = {f"{filename} ({uploaded_at})": file_hash for filename, file_hash, uploaded_at in previous_uploads}
+        choice = st.sidebar.selectbox("Or open a previous upload", ["-"] + list(labels))
+        content_hash = labels.get(choice)
+
+    # big files: profile only the first N rows and/or a random share of them
+    max_rows = st.sidebar.number_input("Max rows to profile (0 = all)", min_value=0, value=0, step=100000)
+    sample_percent = st.sidebar.slider("Sample % of rows", 1, 100, 100)
+
+    if content_hash is not None:
+        try:
+            # one chunked pass over the file the first time, then the profile comes from
+            # the disk cache; kept for reruns until the file or the options change
+            profile_key = (content_hash, max_rows, sample_percent)
+            if st.session_state.get("upload_profile_key") != profile_key:
+                with tracing.span("get_upload_profile", "dataframe"):
+                    st.session_state["upload_profile"], st.session_state["upload_profile_cached"] = \
+                        get_upload_profile(
+                            content_hash,
+                            max_rows=max_rows or None,
+                            sample=sample_percent / 100 if sample_percent < 100 else None,
+                        )
+                st.session_state["upload_profile_key"] = profile_key
+            profile = st.session_state["upload_profile"]
+            stats = profile["stats"]
 
             # File info in sidebar
-            st.sidebar.success("File uploaded successfully!")
-            st.sidebar.metric("Rows", len(df))
-            st.sidebar.metric("Columns", len(df.columns))
+            if uploaded_file is not None:
+                st.sidebar.success("File uploaded successfully!")
+            if st.session_state["upload_profile_cached"]:
+                st.sidebar.caption("Profile loaded from the cache.")
+            st.sidebar.metric("Rows", profile["rows_read"])
+            st.sidebar.metric("Columns", len(profile["columns"]))
+            if profile["truncated"]:
+                st.sidebar.caption(f"Stopped after the first {profile['rows_read']:,} rows.")
+            if profile["sampled"]:
+                st.sidebar.caption(f"Statistics from a {sample_percent}% sample ({profile['rows_profiled']:,} rows).")
 
             # Display file contents in main area
             st.subheader("Uploaded File Preview")
-            st.dataframe(df, use_container_width=True)
+            with tracing.span("preview table", "dataframe"):
+                st.caption(f"First {len(profile['preview']):,} rows")
+                st.dataframe(profile["preview"], use_container_width=True)
+                st.dataframe(summary_table(profile), use_container_width=True)
 
             #
             #  CATEGORY + STATUS BAR CHARTS SIDE BY SIDE
             #
-            st.subheader("Category & Status Charts")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                if "category" in df.columns:
-                    st.markdown("### Category")
-                    st.bar_chart(df["category"].value_counts())
+            with tracing.span("charts", "chart"):
+                st.subheader("Category & Status Charts")
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    if "category" in stats:
+                        st.markdown("### Category")
+                        st.bar_chart(chart_data(stats["category"]))
+                    else:
+                        st.info("No 'category' column found.")
+
+                with col2:
+                    if "status" in stats:
+                        st.markdown("### Status")
+                        st.bar_chart(chart_data(stats["status"]))
+                    else:
+                        st.info("No 'status' column found.")
+
+                st.markdown("---")
+
+                #
+                #  AUTO-GENERATED BAR CHARTS FOR ALL OTHER COLUMNS
+                #
+                st.subheader("Other Columns")
+
+                # Column types were detected while profiling
+                categorical_cols = categorical_columns(profile)
+                numeric_cols = numeric_columns(profile)
+
+                # ---- CATEGORICAL COLUMNS ----
+                if len(categorical_cols) > 0:
+                    st.markdown("Categorical Columns")
+
+                    for col in categorical_cols:
+                        col_stats = stats[col]
+                        st.markdown(f"**{col}**")
+                        st.bar_chart(col_stats["top"])
+                        if col_stats["other"]:
+                            st.caption(f"{col_stats['distinct']:,}{'+' if col_stats['distinct_capped'] else ''} "
+                                       f"distinct values, {col_stats['other']:,} rows outside the top "
+                                       f"{len(col_stats['top'])} not shown")
+                        st.markdown("---")
                 else:
-                    st.info("No 'category' column found.")
-
-            with col2:
-                if "status" in df.columns:
-                    st.markdown("### Status")
-                    st.bar_chart(df["status"].value_counts())
+                    st.info("No categorical columns available for bar charts.")
+
+                # NUMERIC COLUMNS
+                if len(numeric_cols) > 0:
+                    st.markdown("Numerical Columns")
+
+                    for col in numeric_cols:
+                        col_stats = stats[col]
+                        st.markdown(f"**{col}**")
+                        if col_stats["histogram"] is None:
+                            st.info("No numeric values in this column.")
+                        else:
+                            st.caption(f"min {col_stats['min']:,.4g} · mean {col_stats['mean']:,.4g} · "
+                                       f"max {col_stats['max']:,.4g}")
+                            st.bar_chart(col_stats["histogram"])
+                        st.markdown("---")
                 else:
-                    st.info("No 'status' column found.")
-
-            st.markdown("---")
-
-            #
-            #  AUTO-GENERATED BAR CHARTS FOR ALL OTHER COLUMNS
-            #
-            st.subheader("Other Columns")
-
-            # Detect column types
-            categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
-            numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
-
-            # ---- CATEGORICAL COLUMNS ----
-            if len(categorical_cols) > 0:
-                st.markdown("Categorical Columns")
-
-                for col in categorical_cols:
-                    st.markdown(f"**{col}**")
-                    counts = df[col].value_counts()
-                    st.bar_chart(counts)
-                    st.markdown("---")
-            else:
-                st.info("No categorical columns available for bar charts.")
-
-            # NUMERIC COLUMNS
-            if len(numeric_cols) > 0:
-                st.markdown("Numerical Columns")
-
-                for col in numeric_cols:
-                    st.markdown(f"**{col}**")
-                    st.bar_chart(df[col])
-                    st.markdown("---")
-            else:
-                st.info("No numeric columns available for bar charts.")
+                    st.info("No numeric columns available for bar charts.")
 
             #
 
         except Exception as e:
             st.sidebar.error(f"Error reading file: {e}")
 else:
-    clear_uploads_table()
     st.sidebar.info("Toggle on to upload and preview files.")
+
+tracing.end_trace()
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 from app.data.incidents import *
+from app.ui.paged_table import paged_table
+from app.services import tracing
 
 # Login check
 if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
@@ -8,93 +10,78 @@ if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.stop()
 
 st.set_page_config(page_title="Cyber Incidents", layout="wide")
+tracing.start_trace("Cyber Incidents")
 st.title("Cyber Incidents Dashboard")
 
-# Get data using crud functions from data.py
-data = get_all_incidents()
+# Filter options come straight from the database (DISTINCT / MIN / MAX on indexed columns)
+with tracing.span("get_incident_filter_options", "db"):
+    options = get_incident_filter_options()
 
 # SIDEBAR FILTERS
 st.sidebar.header("Filters")
 
 # Date filter
-if 'timestamp' in data.columns:
-    data['timestamp'] = pd.to_datetime(data['timestamp'])
-    min_date = data['timestamp'].min().date()
-    max_date = data['timestamp'].max().date()
-
-    date_range = st.sidebar.date_input("Date Range", (min_date, max_date))
+start_date = end_date = None
+if options['min_date'] and options['max_date']:
+    date_range = st.sidebar.date_input("Date Range", (options['min_date'], options['max_date']))
     if len(date_range) == 2:
         start_date, end_date = date_range
-        data = data[(data['timestamp'].dt.date >= start_date) & (data['timestamp'].dt.date <= end_date)]
 
 # Category filter
-if 'category' in data.columns:
-    category = st.sidebar.selectbox("Threat Category", ['All'] + list(data['category'].unique()))
-    if category != 'All':
-        data = data[data['category'] == category]
+category = st.sidebar.selectbox("Threat Category", ['All'] + options['category'])
 
 # Severity filter
-if 'severity' in data.columns:
-    severity = st.sidebar.selectbox("Severity", ['All'] + list(data['severity'].unique()))
-    if severity != 'All':
-        data = data[data['severity'] == severity]
+severity = st.sidebar.selectbox("Severity", ['All'] + options['severity'])
 
 # Status filter
-if 'status' in data.columns:
-    status = st.sidebar.selectbox("Status", ['All'] + list(data['status'].unique()))
-    if status != 'All':
-        data = data[data['status'] == status]
+status = st.sidebar.selectbox("Status", ['All'] + options['status'])
+
+# filtering and the chart counts are all done in SQLite, only aggregates come back;
+# the table below fetches its own rows one page at a time
+with tracing.span("query_incidents", "db"):
+    result = query_incidents(start_date, end_date, category, severity, status, limit=0)
 
 # QUICK STATS (using your database column names)
 st.subheader("Quick Stats")
-if not data.empty:
+if result['total']:
     col1, col2 = st.columns(2)
 
     with col1:
-        st.metric("Total Incidents", len(data))
+        st.metric("Total Incidents", result['total'])
     with col2:
-        # Use your actual category column name
-        if 'category' in data.columns:
-            phishing_count = len(data[data['category'].str.contains('phishing', case=False, na=False)])
-            st.metric("Phishing Incidents", phishing_count)
-        else:
-            st.metric("Phishing Incidents", 0)
+        st.metric("Phishing Incidents", result['phishing'])
 
 # SIMPLE CHARTS
 st.subheader("Charts")
-if not data.empty:
-    col1, col2 = st.columns(2)
+with tracing.span("charts", "chart"):
+    if result['total']:
+        col1, col2 = st.columns(2)
 
-    with col1:
-        if 'category' in data.columns:
+        with col1:
             st.write("By Category")
-            category_counts = data['category'].value_counts()
-            st.bar_chart(category_counts)
+            st.bar_chart(result['by_category'].set_index('category')['count'])
 
-    with col2:
-        if 'status' in data.columns:
+        with col2:
             st.write("By Status")
-            status_counts = data['status'].value_counts()
-            st.bar_chart(status_counts)
+            st.bar_chart(result['by_status'].set_index('status')['count'])
 
-    col3, col4 = st.columns(2)
+        col3, col4 = st.columns(2)
 
-    with col3:
-        if 'severity' in data.columns:
+        with col3:
             st.write("By Severity")
-            severity_counts = data['severity'].value_counts()
-            st.bar_chart(severity_counts)
+            st.bar_chart(result['by_severity'].set_index('severity')['count'])
 
-    with col4:
-        if 'timestamp' in data.columns:
+        with col4:
             st.write("Over Time")
-            daily_counts = data.groupby(data['timestamp'].dt.date).size()
+            daily_counts = result['by_day'].set_index('day')['count']
+            daily_counts.index = pd.to_datetime(daily_counts.index)
             st.line_chart(daily_counts)
 
 # USE YOUR STATS FUNCTION
 st.subheader("Database Statistics")
 try:
-    stats_data = get_incident_stats()
+    with tracing.span("get_incident_stats", "db"):
+        stats_data = get_incident_stats()
     if not stats_data.empty:
         st.dataframe(stats_data)
 
@@ -107,15 +94,30 @@ except:
 
 # DATA TABLE
 st.subheader("Incident Data")
-st.dataframe(data)
+st.caption(f"{result['total']} matching incidents")
+with tracing.span("incident table", "db"):
+    paged_table(
+        "incidents",
+        lambda last_key, page_size, sort_column, descending: get_incidents_page(
+            last_key, page_size, sort_column, descending, start_date, end_date, category, severity, status
+        ),
+        INCIDENT_SORT_COLUMNS,
+        filters=(str(start_date), str(end_date), category, severity, status),
+    )
 
 # SEARCH FUNCTIONALITY USING YOUR FUNCTION
 st.sidebar.header("Search")
 search_term = st.sidebar.text_input("Search in descriptions")
+search_limit = st.sidebar.slider("Max results", 10, 200, 50, step=10)
 if search_term:
-    search_results = search_incidents(search_term)
+    # full-text index search, best matches first
+    with tracing.span("search_incidents_ranked", "db"):
+        search_results = search_incidents_ranked(search_term, limit=search_limit)
     st.subheader(f"Search Results for '{search_term}'")
-    st.dataframe(search_results)
+    if search_results.empty:
+        st.info("No incidents match that search.")
+    else:
+        st.dataframe(search_results.drop(columns=["rank"]))
 
 # RECOMMENDATIONS
 st.info("""
@@ -134,4 +136,6 @@ st.info("""
 6. **Response Time Metrics**: Consider adding average resolution time metrics to track incident response efficiency.
 
 7. **Pattern Detection**: Use the search functionality to identify recurring patterns or similar incidents that might indicate a coordinated attack.
-""")
\ No newline at end of file
+""")
+
+tracing.end_trace()
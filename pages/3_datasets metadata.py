@@ -1,32 +1,39 @@
 import streamlit as st
 import pandas as pd
 from app.data.datasets import *
+from app.data.snapshots import get_table_dataframe
+from app.ui.paged_table import paged_table
+from app.services import tracing
 
 if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.warning("You must log in to access this page.")
     st.stop()
 
 st.set_page_config(page_title="Datasets Metadata", layout="wide")
+tracing.start_trace("Datasets Metadata")
 st.title("WELCOME! TO THE DATASETS METADATA PAGE")
 
-# Get all datasets
-datasets = get_all_datasets()
+# Get all datasets as a DataFrame (memory-mapped Arrow snapshot when pyarrow is installed)
+with tracing.span("datasets_metadata snapshot", "dataframe"):
+    df = get_table_dataframe("datasets_metadata")
 
-# Convert to DataFrame for easier manipulation
-if datasets:
-    df = pd.DataFrame(datasets, columns=['dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'])
-    df['upload_date'] = pd.to_datetime(df['upload_date'])
-else:
-    df = pd.DataFrame()
+with tracing.span("prepare dataframe", "dataframe"):
+    if not df.empty:
+        df['upload_date'] = pd.to_datetime(df['upload_date'])
+        df = df.sort_values('upload_date', ascending=False)
 
 # SIDEBAR FILTERS
 st.sidebar.header("Filters")
 
+# the same filters are passed to the paged table below
+min_rows = max_rows = None
+selected_user = 'All'
+
 # Size filter
 if not df.empty:
-    min_rows, max_rows = df['rows'].min(), df['rows'].max()
-    row_range = st.sidebar.slider("Number of Rows", min_rows, max_rows, (min_rows, max_rows))
-    df = df[(df['rows'] >= row_range[0]) & (df['rows'] <= row_range[1])]
+    lowest, highest = int(df['rows'].min()), int(df['rows'].max())
+    min_rows, max_rows = st.sidebar.slider("Number of Rows", lowest, highest, (lowest, highest))
+    df = df[(df['rows'] >= min_rows) & (df['rows'] <= max_rows)]
 
 # User filter
 if not df.empty and 'uploaded_by' in df.columns:
@@ -57,58 +64,60 @@ if not df.empty:
 
 # SIMPLE CHARTS
 st.subheader("Charts")
-if not df.empty:
-    col1, col2 = st.columns(2)
+with tracing.span("charts", "chart"):
+    if not df.empty:
+        col1, col2 = st.columns(2)
 
-    with col1:
-        st.write("Dataset Size Distribution")
-        st.bar_chart(df.set_index('name')['rows'])
+        with col1:
+            st.write("Dataset Size Distribution")
+            st.bar_chart(df.set_index('name')['rows'])
 
-    with col2:
-        st.write("Datasets by User")
-        user_counts = df['uploaded_by'].value_counts()
-        st.bar_chart(user_counts)
+        with col2:
+            st.write("Datasets by User")
+            user_counts = df['uploaded_by'].value_counts()
+            st.bar_chart(user_counts)
 
 # DATASET RESOURCE ANALYSIS
 st.subheader("Resource Consumption Analysis")
 
-if not df.empty:
-    col1, col2 = st.columns(2)
+with tracing.span("resource charts", "chart"):
+    if not df.empty:
+        col1, col2 = st.columns(2)
 
-    with col1:
-        st.write("**Size Categories**")
-        # Categorize by size
-        small = len(df[df['rows'] <= 1000])
-        medium = len(df[df['rows'].between(1001, 10000)])
-        large = len(df[df['rows'] > 10000])
-
-        size_data = pd.DataFrame({
-            'Category': ['Small (≤1k)', 'Medium (1k-10k)', 'Large (>10k)'],
-            'Count': [small, medium, large]
-        })
-        st.bar_chart(size_data.set_index('Category'))
+        with col1:
+            st.write("**Size Categories**")
+            # Categorize by size
+            small = len(df[df['rows'] <= 1000])
+            medium = len(df[df['rows'].between(1001, 10000)])
+            large = len(df[df['rows'] > 10000])
+
+            size_data = pd.DataFrame({
+                'Category': ['Small (≤1k)', 'Medium (1k-10k)', 'Large (>10k)'],
+                'Count': [small, medium, large]
+            })
+            st.bar_chart(size_data.set_index('Category'))
 
-    with col2:
-        st.write("**Storage Recommendations**")
-        # Calculate estimated storage (assuming ~1KB per row)
-        df['estimated_size_mb'] = (df['rows'] * 1024) / (1024 * 1024)
-        total_storage = df['estimated_size_mb'].sum()
-        st.metric("Total Estimated Storage", f"{total_storage:.1f} MB")
+        with col2:
+            st.write("**Storage Recommendations**")
+            # Calculate estimated storage (assuming ~1KB per row)
+            df['estimated_size_mb'] = (df['rows'] * 1024) / (1024 * 1024)
+            total_storage = df['estimated_size_mb'].sum()
+            st.metric("Total Estimated Storage", f"{total_storage:.1f} MB")
 
-        if total_storage > 1000:  # More than 1GB
-            st.warning("Consider archiving older datasets to free up storage")
+            if total_storage > 1000:  # More than 1GB
+                st.warning("Consider archiving older datasets to free up storage")
 
 # DATA GOVERNANCE RECOMMENDATIONS
 st.subheader("Data Governance & Archiving Recommendations")
 
 if not df.empty:
     # Get old datasets for archiving recommendations
-    old_datasets = get_old_datasets()
+    with tracing.span("get_old_datasets_columnar", "db"):
+        old_datasets = get_old_datasets_columnar()
 
     if old_datasets:
         st.warning("**Archiving Recommendations**")
-        old_df = pd.DataFrame(old_datasets,
-                              columns=['dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'])
+        old_df = old_datasets.to_dataframe()
         st.write(f"Found {len(old_df)} datasets older than 6 months:")
         st.dataframe(old_df[['name', 'upload_date', 'rows']])
 
@@ -116,11 +125,11 @@ if not df.empty:
             "Recommendation: Consider archiving these older datasets to improve performance and reduce storage costs")
 
     # Large datasets analysis
-    large_datasets = get_large_datasets()
+    with tracing.span("get_large_datasets_columnar", "db"):
+        large_datasets = get_large_datasets_columnar()
     if large_datasets:
         st.warning("**Large Dataset Management**")
-        large_df = pd.DataFrame(large_datasets,
-                                columns=['dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'])
+        large_df = large_datasets.to_dataframe()
         st.write(f"Found {len(large_df)} datasets with >10,000 rows:")
         st.dataframe(large_df[['name', 'rows', 'upload_date']])
 
@@ -129,7 +138,8 @@ if not df.empty:
 # DATASET STATISTICS
 st.subheader("Database Statistics")
 try:
-    stats = get_dataset_stats()
+    with tracing.span("get_dataset_stats", "db"):
+        stats = get_dataset_stats()
     if stats:
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -143,27 +153,30 @@ except:
 
 # MAIN DATA TABLE
 st.subheader("All Datasets")
-if not df.empty:
-    st.dataframe(df)
-else:
-    st.info("No datasets found")
+with tracing.span("dataset table", "db"):
+    paged_table(
+        "datasets",
+        lambda last_key, page_size, sort_column, descending: get_datasets_page(
+            last_key, page_size, sort_column, descending, min_rows, max_rows, selected_user
+        ),
+        DATASET_SORT_COLUMNS,
+        filters=(min_rows, max_rows, selected_user),
+    )
 
 # SEARCH AND SPECIAL QUERIES
 st.sidebar.header("Special Queries")
 
 if st.sidebar.button("Show Large Datasets (>10k rows)"):
-    large_datasets = get_large_datasets()
+    large_datasets = get_large_datasets_columnar()
     if large_datasets:
-        large_df = pd.DataFrame(large_datasets,
-                                columns=['dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'])
+        large_df = large_datasets.to_dataframe()
         st.subheader("Large Datasets (>10,000 rows)")
         st.dataframe(large_df)
 
 if st.sidebar.button("Show Recent Uploads"):
-    recent_datasets = get_recent_uploads(5)
+    recent_datasets = get_recent_uploads_columnar(5)
     if recent_datasets:
-        recent_df = pd.DataFrame(recent_datasets,
-                                 columns=['dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'])
+        recent_df = recent_datasets.to_dataframe()
         st.subheader("Recent Dataset Uploads")
         st.dataframe(recent_df)
 
@@ -171,12 +184,12 @@ if st.sidebar.button("Show Recent Uploads"):
 st.sidebar.header("User Datasets")
 username = st.sidebar.text_input("Enter username to view their datasets (uploaded by)")
 if username:
-    user_datasets = get_user_datasets(username)
+    user_datasets = get_user_datasets_columnar(username)
     if user_datasets:
-        user_df = pd.DataFrame(user_datasets,
-                               columns=['dataset_id', 'name', 'rows', 'columns', 'uploaded_by', 'upload_date'])
+        user_df = user_datasets.to_dataframe()
         st.subheader(f"Datasets uploaded by {username}")
         st.dataframe(user_df)
     elif username:
         st.info(f"No datasets found for user: {username}")
 
+tracing.end_trace()
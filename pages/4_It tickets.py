@@ -1,23 +1,22 @@
 import streamlit as st
 import pandas as pd
 from app.data.tickets import *
+from app.data.snapshots import get_table_dataframe
+from app.ui.paged_table import paged_table
+from app.services import tracing
 
 if "logged_in" not in st.session_state or not st.session_state["logged_in"]:
     st.warning("You must log in to access this page.")
     st.stop()
 
 st.set_page_config(page_title="IT Tickets", layout="wide")
+tracing.start_trace("IT Tickets")
 st.title("IT Tickets Dashboard")
 
-# Get all tickets from my crud function in tickets.py
-tickets = get_all_tickets()
-
-# Convert to DataFrame
-if tickets:
-    df = pd.DataFrame(tickets, columns=['ticket_id', 'priority', 'description', 'status', 'assigned_to', 'created_at',
-                                        'resolution_time_hours'])
-else:
-    df = pd.DataFrame()
+# Only the columns the stats and charts need, from the memory-mapped Arrow snapshot
+# when pyarrow is installed
+with tracing.span("it_tickets snapshot", "dataframe"):
+    df = get_table_dataframe("it_tickets", ["ticket_id", "priority", "status", "assigned_to"])
 
 # QUICK STATS
 st.subheader("Quick Stats")
@@ -39,14 +38,16 @@ if not df.empty:
 st.subheader("Bottlenecks")
 
 # Show slowest status
-slow_status = get_slowest_status()
+with tracing.span("get_slowest_status", "db"):
+    slow_status = get_slowest_status()
 if slow_status:
     status_df = pd.DataFrame(slow_status, columns=['Status', 'Count'])
     st.write("**Tickets stuck by status:**")
     st.dataframe(status_df)
 
 # Show slowest staff
-slow_staff = get_slowest_staff()
+with tracing.span("get_slowest_staff", "db"):
+    slow_staff = get_slowest_staff()
 if slow_staff:
     staff_df = pd.DataFrame(slow_staff, columns=['Staff', 'Count'])
     st.write("**Staff workload:**")
@@ -54,25 +55,24 @@ if slow_staff:
 
 # SIMPLE CHARTS
 st.subheader("Charts")
-if not df.empty:
-    col1, col2 = st.columns(2)
+with tracing.span("charts", "chart"):
+    if not df.empty:
+        col1, col2 = st.columns(2)
 
-    with col1:
-        st.write("By Status")
-        status_counts = df['status'].value_counts()
-        st.bar_chart(status_counts)
+        with col1:
+            st.write("By Status")
+            status_counts = df['status'].value_counts()
+            st.bar_chart(status_counts)
 
-    with col2:
-        st.write("By Priority")
-        priority_counts = df['priority'].value_counts()
-        st.bar_chart(priority_counts)
+        with col2:
+            st.write("By Priority")
+            priority_counts = df['priority'].value_counts()
+            st.bar_chart(priority_counts)
 
 # TICKET TABLE
 st.subheader("All Tickets")
-if not df.empty:
-    st.dataframe(df)
-else:
-    st.info("No tickets found")
+with tracing.span("ticket table", "db"):
+    paged_table("tickets", get_tickets_page, TICKET_SORT_COLUMNS)
 
 # RECOMMENDATIONS
 st.info("""
@@ -87,4 +87,6 @@ st.info("""
 4. **Workload Balancing**: Redistribute tickets among staff members to balance workload and improve resolution times.
 
 5. **Regular Review**: Schedule weekly reviews of open tickets to identify aging issues that need escalation.
-""")
\ No newline at end of file
+""")
+
+tracing.end_trace()
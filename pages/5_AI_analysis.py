@@ -4,6 +4,9 @@ from google.genai import types
 from app.data.incidents import *
 from app.data.tickets import *
 from app.data.datasets import *
+from app.data.metrics import get_total
+from app.data.async_db import gather_sync
+from app.services import tracing
 import time
 
 # Login check
@@ -147,14 +150,16 @@ def get_incidents_analysis():
 
     # Option 1: Get all security incidents
     if option == "All incidents":
-        df_incidents = get_all_incidents()
+        # the newest 10 go to the model, the total comes from the row counters
+        df_incidents = get_latest_incidents(10)
+        total_incidents = get_total("cyber_incidents")
         if not df_incidents.empty:
             data_context = "All security incidents in the system"
-            raw_data = f"Found {len(df_incidents)} incidents:\n"
-            for idx, row in df_incidents.head(10).iterrows():
+            raw_data = f"Found {total_incidents} incidents:\n"
+            for idx, row in df_incidents.iterrows():
                 raw_data += f"- Incident ID: {row.get('incident_id', 'N/A')}, Category: {row.get('category', 'N/A')}, Severity: {row.get('severity', 'N/A')}, Status: {row.get('status', 'N/A')}, Description: {row.get('description', 'No description')[:100]}\n"
-            if len(df_incidents) > 10:
-                raw_data += f"... and {len(df_incidents) - 10} more incidents"
+            if total_incidents > len(df_incidents):
+                raw_data += f"... and {total_incidents - len(df_incidents)} more incidents"
         else:
             raw_data = "No incidents found in the database."
 
@@ -250,10 +255,11 @@ def get_tickets_analysis():
 
     # Option 2: Analyze bottlenecks in ticket processing
     elif option == "Bottleneck analysis":
-        # Get three types of bottleneck data
-        slow_status = get_slowest_status()  # Tickets stuck by status
-        slow_staff = get_slowest_staff()  # Staff with most unresolved tickets
-        avg_time = get_avg_resolution_time()  # Average resolution time by priority
+        # Get three types of bottleneck data, the queries are independent so they run at the same time:
+        # tickets stuck by status, staff with most unresolved tickets, average resolution time by priority
+        slow_status, slow_staff, avg_time = gather_sync(
+            get_slowest_status, get_slowest_staff, get_avg_resolution_time
+        )
 
         data_context = "IT ticket bottlenecks and performance issues"
         raw_data = "Bottleneck Analysis:\n\n"
@@ -365,18 +371,19 @@ def analyze_with_ai_simple(data_type, analysis_type, data_context, raw_data):
     for attempt in range(max_retries):
         try:
             # Send request to Gemini AI
-            response = client.models.generate_content(
-                model="gemini-2.0-flash",  # Use faster model (less likely to be overloaded)
-                config=types.GenerateContentConfig(
-                    system_instruction=f"You are {system_role}. Provide practical, actionable insights."),
-                contents=[{"role": "user", "parts": [{"text": prompt}]}],
-            )
+            with tracing.span("analysis generate_content", "ai"):
+                response = client.models.generate_content(
+                    model="gemini-2.0-flash",  # Use faster model (less likely to be overloaded)
+                    config=types.GenerateContentConfig(
+                        system_instruction=f"You are {system_role}. Provide practical, actionable insights."),
+                    contents=[{"role": "user", "parts": [{"text": prompt}]}],
+                )
             return response.text  # Return AI analysis
 
         except Exception as e:
             # If API fails, wait and retry once
             if attempt < max_retries - 1:
-                time.sleep(1)  # Wait 1 second before retry
+                tracing.sleep(1, "ai retry wait")  # Wait 1 second before retry
                 continue
             else:
                 # If all retries fail, provide fallback message
@@ -432,10 +439,11 @@ def simple_chat():
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 try:
-                    response = client.models.generate_content(
-                        model="gemini-2.0-flash",
-                        contents=[{"role": "user", "parts": [{"text": user_input}]}],
-                    )
+                    with tracing.span("chat generate_content", "ai"):
+                        response = client.models.generate_content(
+                            model="gemini-2.0-flash",
+                            contents=[{"role": "user", "parts": [{"text": user_input}]}],
+                        )
                     ai_response = response.text
                     st.markdown(ai_response)
 
@@ -464,6 +472,7 @@ def main():
         page_icon="",
         layout="centered"
     )
+    tracing.start_trace("AI Analysis")
 
     st.title("Data Analysis Assistant")
 
@@ -488,12 +497,13 @@ def main():
         data_context = ""
         raw_data = ""
 
-        if data_type == "Datasets":
-            analysis_type, data_context, raw_data = get_datasets_analysis()
-        elif data_type == "Security Incidents":
-            analysis_type, data_context, raw_data = get_incidents_analysis()
-        else:  # Tickets
-            analysis_type, data_context, raw_data = get_tickets_analysis()
+        with tracing.span(f"{data_type} data", "db"):
+            if data_type == "Datasets":
+                analysis_type, data_context, raw_data = get_datasets_analysis()
+            elif data_type == "Security Incidents":
+                analysis_type, data_context, raw_data = get_incidents_analysis()
+            else:  # Tickets
+                analysis_type, data_context, raw_data = get_tickets_analysis()
 
         # Show preview of data before sending to AI
         if raw_data:
@@ -553,6 +563,8 @@ def main():
     else:  # Chat with AI mode
         simple_chat()
 
+    tracing.end_trace()
+
 
 # Start the application
 if __name__ == "__main__":
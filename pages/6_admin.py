@@ -4,7 +4,16 @@ from app.data.datasets import *
 import streamlit as st
 from app.data.users import *
 from app.data.csv_loaders import *
+from app.data.metrics import get_dashboard_metrics, get_group_counts
+from app.data.async_db import gather_sync
+from app.data.cache import cache_stats, clear_cache
+from app.data import profiler
+from app.data.rows import DATASET_LABELS, TICKET_LABELS
+from app.data.bulk import parse_keys, rows_from_csv_text
 from app.services.user_service import *
+from app.services import password_service
+from app.services import tracing
+from app.ui.paged_table import paged_table
 from pathlib import Path
 import pandas as pd
 
@@ -14,6 +23,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+tracing.start_trace("Admin")
 
 
 #  AUTHENTICATION CHECK
@@ -34,6 +44,26 @@ def check_admin_access():
     return False
 
 
+def show_bulk_result(result, action):
+    """Show the outcome of a bulk action and the rows that were skipped"""
+    st.success(f"{result[action]} rows {action}")
+    if result["conflicts"]:
+        st.warning(f"{len(result['conflicts'])} rows were skipped")
+        st.dataframe(pd.DataFrame(result["conflicts"], columns=["ID", "Reason"]))
+
+
+def paste_rows(label, columns, key_column):
+    """Text area for pasting CSV rows, returns (columns, rows) or (None, None)"""
+    text = st.text_area(label, help="First line is the header, using any of: " + ", ".join(columns), height=200)
+    if not text.strip():
+        return None, None
+    try:
+        return rows_from_csv_text(text, columns, required=[key_column])
+    except ValueError as e:
+        st.error(str(e))
+        return None, None
+
+
 # MAIN CONTENT
 if not check_admin_access():
     st.title("Access Denied")
@@ -72,14 +102,95 @@ else:
         st.write("You can also view statistics about your platform.")
         st.write("Choose action from the sidebar to get started!")
 
-        # Quick stats or overview can go here
-        col1, col2, col3 = st.columns(3)
+        # Quick stats come from the trigger maintained counters, no table is read
+        with tracing.span("dashboard counters", "db"):
+            metrics, severity_counts, status_counts = gather_sync(
+                get_dashboard_metrics,
+                (get_group_counts, "cyber_incidents", "severity"),
+                (get_group_counts, "it_tickets", "status"),
+            )
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Users", len(get_all_users()))
+            st.metric("Total Users", metrics["users"])
         with col2:
-            st.metric("Total Incidents", len(get_all_incidents()))
+            st.metric("Total Incidents", metrics["incidents"])
         with col3:
-            st.metric("Total Tickets", len(get_all_tickets()))
+            st.metric("Total Tickets", metrics["tickets"])
+        with col4:
+            st.metric("Total Datasets", metrics["datasets"])
+
+        with tracing.span("dashboard charts", "chart"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write("Incidents by Severity")
+                st.bar_chart(pd.Series(severity_counts, dtype="int64"))
+            with col2:
+                st.write("Tickets by Status")
+                st.bar_chart(pd.Series(status_counts, dtype="int64"))
+
+        with st.expander("Performance"):
+            # p50/p95 of recent page runs and of the spans inside them (see app/services/tracing.py)
+            page_rows = tracing.page_stats()
+            if not page_rows:
+                st.info("No page runs traced yet, open a few pages first.")
+            else:
+                st.write(f"**Page runs** (last {tracing.MAX_TRACES} traced runs)")
+                st.dataframe(pd.DataFrame(page_rows), hide_index=True)
+
+                span_rows = tracing.span_stats()
+                kinds = st.multiselect("Span kinds", tracing.SPAN_KINDS, default=list(tracing.SPAN_KINDS))
+                span_rows = [row for row in span_rows if row["kind"] in kinds]
+                st.write("**Spans** (slowest p95 first)")
+                st.dataframe(pd.DataFrame(span_rows), hide_index=True)
+
+            if st.button("Clear Traces"):
+                tracing.clear_traces()
+                st.success("Traces cleared")
+
+        with st.expander("Query cache"):
+            stats = cache_stats()
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+            col2.metric("Hits / Misses", f"{stats['hits']} / {stats['misses']}")
+            col3.metric("Entries", f"{stats['size']} / {stats['max_size']}")
+            col4.metric("Evictions", stats["evictions"])
+            if st.button("Clear Cache"):
+                clear_cache()
+                st.success("Query cache cleared")
+
+        with st.expander("SQL profiler"):
+            # per-statement timings and the slow-query log (see app/data/profiler.py)
+            enabled = st.toggle("Profile SQL statements", value=profiler.profiling_enabled())
+            slow_ms = st.number_input("Slow query threshold (ms)", min_value=1.0,
+                                      value=float(profiler.SLOW_QUERY_MS), step=10.0)
+            if enabled:
+                profiler.enable_profiling(slow_ms)
+            else:
+                profiler.disable_profiling()
+
+            statement_rows = profiler.statement_stats()
+            if not statement_rows:
+                st.info("No statements profiled yet, turn profiling on and use the pages.")
+            else:
+                st.write("**Statements** (most total time first)")
+                st.dataframe(pd.DataFrame(statement_rows), hide_index=True)
+
+                slow_rows = profiler.slow_queries()
+                st.write(f"**Slow queries** ({len(slow_rows)} over the threshold)")
+                if slow_rows:
+                    slow_df = pd.DataFrame(slow_rows)
+                    slow_df["plan"] = slow_df["plan"].map(lambda plan: " | ".join(plan or []))
+                    slow_df["full_scans"] = slow_df["full_scans"].map(", ".join)
+                    st.dataframe(slow_df, hide_index=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("Export as JSON", profiler.export_profile(),
+                                   file_name="sql_profile.json", mime="application/json")
+            with col2:
+                if st.button("Reset Profile"):
+                    profiler.reset_profile()
+                    st.success("SQL profile cleared")
 
     # --- INCIDENTS MANAGEMENT ---
     if menu == "incidents":
@@ -88,14 +199,14 @@ else:
         st.sidebar.subheader("Incident Actions")
         incident_action = st.sidebar.radio(
             "Choose Action",
-            ["View All", "Add Incident", "Update Status", "Delete Incident", "Filter by Status", "Search", "Statistics"]
+            ["View All", "Add Incident", "Update Status", "Delete Incident", "Filter by Status", "Search", "Statistics",
+             "Bulk Actions"]
         )
 
         #  VIEW ALL INCIDENTS
         if incident_action == "View All":
             st.subheader("All Incidents")
-            df = get_all_incidents()
-            st.dataframe(df)
+            paged_table("admin_incidents", get_incidents_page, INCIDENT_SORT_COLUMNS)
 
         #  ADD INCIDENT
         elif incident_action == "Add Incident":
@@ -150,8 +261,9 @@ else:
         elif incident_action == "Search":
             st.subheader("Search Incidents by Description")
             term = st.text_input("Search Term")
+            limit = st.number_input("Max results", min_value=1, max_value=500, value=50)
             if st.button("Search"):
-                df = search_incidents(term)
+                df = search_incidents_ranked(term, limit=int(limit))
                 st.dataframe(df)
 
         #  INCIDENT STATISTICS
@@ -164,6 +276,24 @@ else:
             chart_data = df.pivot(index="severity", columns="status", values="count").fillna(0)
             st.bar_chart(chart_data)
 
+        #  BULK ACTIONS
+        elif incident_action == "Bulk Actions":
+            st.subheader("Bulk Incident Actions")
+            bulk_action = st.radio("Action", ["Insert from CSV", "Update Status", "Delete"], horizontal=True)
+
+            if bulk_action == "Insert from CSV":
+                columns, rows = paste_rows("Paste incidents as CSV", INCIDENT_COLUMNS, "incident_id")
+                if rows is not None and st.button(f"Insert {len(rows)} Incidents"):
+                    show_bulk_result(insert_incidents(rows, columns), "inserted")
+            else:
+                ids = parse_keys(st.text_area("Incident IDs (comma or one per line)"))
+                if bulk_action == "Update Status":
+                    new_status = st.selectbox("New Status", ["Open", "In Progress", "Resolved", "Closed"])
+                    if ids and st.button(f"Update {len(ids)} Incidents"):
+                        show_bulk_result(update_incidents_status(ids, new_status), "updated")
+                elif ids and st.button(f"Delete {len(ids)} Incidents"):
+                    show_bulk_result(delete_incidents(ids), "deleted")
+
     # --- TICKETS MANAGEMENT ---
     elif menu == "tickets":
         st.title("Tickets Management")
@@ -172,17 +302,13 @@ else:
         ticket_action = st.sidebar.radio(
             "Choose Action",
             ["View All", "Add Ticket", "Update Status", "Assign Ticket", "Delete Ticket", "Filter by Status",
-             "Filter by Assignee", "Analysis"]
+             "Filter by Assignee", "Search", "Analysis", "Bulk Actions"]
         )
 
         #  VIEW ALL TICKETS
         if ticket_action == "View All":
             st.subheader("All Tickets")
-            tickets = get_all_tickets()
-            df = pd.DataFrame(tickets,
-                              columns=["Ticket ID", "Priority", "Description", "Status", "Assigned To", "Created At",
-                                       "Resolution Time (hrs)"])
-            st.dataframe(df)
+            paged_table("admin_tickets", get_tickets_page, TICKET_SORT_COLUMNS, labels=TICKET_LABELS)
 
         #  ADD TICKET
         elif ticket_action == "Add Ticket":
@@ -235,22 +361,25 @@ else:
         elif ticket_action == "Filter by Status":
             st.subheader("Filter Tickets by Status")
             status = st.selectbox("Status", ["Open", "In Progress", "Resolved"])
-            tickets = get_tickets_by_status(status)
-            df = pd.DataFrame(tickets,
-                              columns=["Ticket ID", "Priority", "Description", "Status", "Assigned To", "Created At",
-                                       "Resolution Time (hrs)"])
+            df = get_tickets_by_status_columnar(status).to_dataframe(TICKET_LABELS)
             st.dataframe(df)
 
         #  FILTER BY ASSIGNEE
         elif ticket_action == "Filter by Assignee":
             st.subheader("Filter Tickets by Staff")
             staff = st.text_input("Assigned To")
-            tickets = get_tickets_by_assignee(staff)
-            df = pd.DataFrame(tickets,
-                              columns=["Ticket ID", "Priority", "Description", "Status", "Assigned To", "Created At",
-                                       "Resolution Time (hrs)"])
+            df = get_tickets_by_assignee_columnar(staff).to_dataframe(TICKET_LABELS)
             st.dataframe(df)
 
+        #  SEARCH TICKETS
+        elif ticket_action == "Search":
+            st.subheader("Search Tickets by Description")
+            term = st.text_input("Search Term")
+            limit = st.number_input("Max results", min_value=1, max_value=500, value=50)
+            if st.button("Search"):
+                df = search_tickets_ranked_columnar(term, limit=int(limit)).to_dataframe(TICKET_LABELS)
+                st.dataframe(df)
+
         #  ANALYSIS
         elif ticket_action == "Analysis":
             st.subheader("Ticket Analysis / Bottlenecks")
@@ -275,13 +404,32 @@ else:
 
             # Oldest pending tickets
             st.markdown("**Oldest unresolved tickets:**")
-            old_tickets = get_oldest_pending_tickets(limit=10)
-            df_old = pd.DataFrame(old_tickets,
-                                  columns=["Ticket ID", "Priority", "Description", "Status", "Assigned To",
-                                           "Created At",
-                                           "Resolution Time (hrs)"])
+            df_old = get_oldest_pending_tickets_columnar(limit=10).to_dataframe(TICKET_LABELS)
             st.dataframe(df_old)
 
+        #  BULK ACTIONS
+        elif ticket_action == "Bulk Actions":
+            st.subheader("Bulk Ticket Actions")
+            bulk_action = st.radio("Action", ["Insert from CSV", "Update Status", "Reassign", "Delete"],
+                                   horizontal=True)
+
+            if bulk_action == "Insert from CSV":
+                columns, rows = paste_rows("Paste tickets as CSV", TICKET_COLUMNS, "ticket_id")
+                if rows is not None and st.button(f"Insert {len(rows)} Tickets"):
+                    show_bulk_result(insert_tickets(rows, columns), "inserted")
+            else:
+                ids = parse_keys(st.text_area("Ticket IDs (comma or one per line)"))
+                if bulk_action == "Update Status":
+                    new_status = st.selectbox("New Status", ["Open", "In Progress", "Resolved", "Waiting for User"])
+                    if ids and st.button(f"Update {len(ids)} Tickets"):
+                        show_bulk_result(update_tickets_status(ids, new_status), "updated")
+                elif bulk_action == "Reassign":
+                    staff = st.text_input("Assign To")
+                    if ids and staff and st.button(f"Reassign {len(ids)} Tickets"):
+                        show_bulk_result(assign_tickets(ids, staff), "updated")
+                elif ids and st.button(f"Delete {len(ids)} Tickets"):
+                    show_bulk_result(delete_many_tickets(ids), "deleted")
+
     # --- DATASETS MANAGEMENT ---
     elif menu == "datasets":
         st.title("Datasets Management")
@@ -291,15 +439,13 @@ else:
             "Choose Action",
             ["View All", "Add Dataset", "Delete Dataset", "Filter by User", "Large Datasets", "Old Datasets",
              "Statistics",
-             "Recent Uploads"]
+             "Recent Uploads", "Bulk Actions"]
         )
 
         #  VIEW ALL DATASETS
         if dataset_action == "View All":
             st.subheader("All Datasets")
-            datasets = get_all_datasets()
-            df = pd.DataFrame(datasets, columns=["Dataset ID", "Name", "Rows", "Columns", "Uploaded By", "Upload Date"])
-            st.dataframe(df)
+            paged_table("admin_datasets", get_datasets_page, DATASET_SORT_COLUMNS, labels=DATASET_LABELS)
 
         #  ADD DATASET
         elif dataset_action == "Add Dataset":
@@ -329,22 +475,19 @@ else:
         elif dataset_action == "Filter by User":
             st.subheader("Datasets Uploaded by User")
             user = st.text_input("Username")
-            datasets = get_user_datasets(user)
-            df = pd.DataFrame(datasets, columns=["Dataset ID", "Name", "Rows", "Columns", "Uploaded By", "Upload Date"])
+            df = get_user_datasets_columnar(user).to_dataframe(DATASET_LABELS)
             st.dataframe(df)
 
         #  LARGE DATASETS
         elif dataset_action == "Large Datasets":
             st.subheader("Datasets with More Than 10,000 Rows")
-            datasets = get_large_datasets()
-            df = pd.DataFrame(datasets, columns=["Dataset ID", "Name", "Rows", "Columns", "Uploaded By", "Upload Date"])
+            df = get_large_datasets_columnar().to_dataframe(DATASET_LABELS)
             st.dataframe(df)
 
         #  OLD DATASETS
         elif dataset_action == "Old Datasets":
             st.subheader("Datasets Older than 6 Months")
-            datasets = get_old_datasets()
-            df = pd.DataFrame(datasets, columns=["Dataset ID", "Name", "Rows", "Columns", "Uploaded By", "Upload Date"])
+            df = get_old_datasets_columnar().to_dataframe(DATASET_LABELS)
             st.dataframe(df)
 
         #  DATASET STATISTICS
@@ -358,10 +501,24 @@ else:
         #  RECENT UPLOADS
         elif dataset_action == "Recent Uploads":
             st.subheader("Most Recent Dataset Uploads")
-            datasets = get_recent_uploads(limit=10)
-            df = pd.DataFrame(datasets, columns=["Dataset ID", "Name", "Rows", "Columns", "Uploaded By", "Upload Date"])
+            df = get_recent_uploads_columnar(limit=10).to_dataframe(DATASET_LABELS)
             st.dataframe(df)
 
+        #  BULK ACTIONS
+        elif dataset_action == "Bulk Actions":
+            st.subheader("Bulk Dataset Actions")
+            bulk_action = st.radio("Action", ["Insert from CSV", "Delete"], horizontal=True)
+
+            if bulk_action == "Insert from CSV":
+                columns, rows = paste_rows("Paste datasets as CSV", DATASET_COLUMNS, "dataset_id")
+                if rows is not None and st.button(f"Insert {len(rows)} Datasets"):
+                    show_bulk_result(insert_datasets(rows, columns), "inserted")
+            else:
+                # pick from the existing datasets, the table is small
+                dataset_ids = st.multiselect("Datasets to delete", get_all_datasets_columnar()["dataset_id"])
+                if dataset_ids and st.button(f"Delete {len(dataset_ids)} Datasets"):
+                    show_bulk_result(delete_datasets(dataset_ids), "deleted")
+
     # --- USERS MANAGEMENT ---
     elif menu == "users":
         st.title("Users Management")
@@ -387,8 +544,8 @@ else:
             st.subheader("migrate users from file")
 
             if st.button("migrate all users to database"):
-                migrate_users_from_file()
-                st.success("users migrated successfully")
+                inserted, skipped = migrate_users_from_file()
+                st.success(f"users migrated successfully: {inserted} added, {skipped} skipped")
 
             if st.button("add user manually"):
                 with st.form("add_user_form"):
@@ -398,8 +555,8 @@ else:
                     submitted = st.form_submit_button("Add User")
 
                     if submitted:
-                        # Hash the password
-                        password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
+                        # Hash the password (worker pool, configured cost, stored as str)
+                        password_hash = password_service.hash_password(password)
                         # Store user with hash
                         insert_user(username, password_hash, role)
                         st.success(f"User {username} added successfully")
@@ -431,37 +588,39 @@ else:
 
         st.subheader("retrive info")
 
+        # only new or changed rows are written, so the tables are never empty while this runs
+        delete_missing = st.checkbox("Also delete rows that are no longer in the CSV files")
+
         if st.button("Retrieve Info"):
 
             conn = connect_database()
 
-            st.info("Loading data from CSV files into database...")
+            st.info("Syncing data from CSV files into database...")
 
             # Capture details per table
             data_dir = Path("DATA")
-            csv_mappings = {
-                'cyber_incidents.csv': 'cyber_incidents',
-                'datasets_metadata.csv': 'datasets_metadata',
-                'it_tickets.csv': 'it_tickets'
-            }
 
             total_rows = 0
             table_details = []
 
-            for csv_file, table_name in csv_mappings.items():
+            for csv_file, table_name in CSV_MAPPINGS.items():
                 csv_path = data_dir / csv_file
                 if csv_path.exists():
-                    rows_loaded = load_csv_to_table(conn, csv_path, table_name)
-                    total_rows += rows_loaded
-                    table_details.append((table_name, rows_loaded))
+                    counts = sync_csv_file(conn, csv_path, table_name, delete_missing)
+                    total_rows += counts.get("inserted", 0) + counts.get("updated", 0)
+                    table_details.append((table_name, counts.get("inserted", 0), counts.get("updated", 0),
+                                          counts.get("unchanged", 0), counts.get("deleted", 0)))
                 else:
-                    table_details.append((table_name, "CSV not found"))
+                    table_details.append((table_name, "CSV not found", "", "", ""))
 
             conn.close()
 
             # Display details in a table
-            st.subheader("CSV Load Details")
-            df_details = pd.DataFrame(table_details, columns=["Table Name", "Rows Loaded"])
+            st.subheader("CSV Sync Details")
+            df_details = pd.DataFrame(table_details,
+                                      columns=["Table Name", "Inserted", "Updated", "Unchanged", "Deleted"])
             st.dataframe(df_details)
 
-            st.success(f"All CSV files processed. Total rows loaded across all tables: {total_rows}")
\ No newline at end of file
+            st.success(f"All CSV files processed. Total rows written across all tables: {total_rows}")
+
+tracing.end_trace()
@@ -0,0 +1,23 @@
+"""Shared fixtures: every test gets its own database file in a temporary folder."""
+import pytest
+
+from app.data import db
+from app.data.cache import clear_cache
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A fresh database with every table and migration, used by the pooled connections."""
+    path = tmp_path / "test.db"
+    db.init_database(path)
+    clear_cache()
+    yield path
+    clear_cache()
+
+
+@pytest.fixture
+def conn(db_path):
+    """A plain connection to the test database, for the functions that take one."""
+    connection = db.connect_database(db_path)
+    yield connection
+    connection.close()
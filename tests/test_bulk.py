@@ -0,0 +1,78 @@
+import pytest
+
+from app.data import db
+from app.data.bulk import parse_keys, rows_from_csv_text
+from app.data.datasets import DATASET_COLUMNS
+from app.data.incidents import delete_incidents, insert_incidents, update_incidents_status
+from app.data.tickets import assign_tickets, insert_tickets
+
+TICKET = ["ticket_id", "priority", "description", "status"]
+
+
+def incident(incident_id, status="Open"):
+    return (incident_id, "2024-01-01 09:00:00", "Low", "Phishing", status, "Suspicious email", "alice")
+
+
+def count(table):
+    with db.get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_insert_reports_existing_and_repeated_keys(db_path):
+    insert_incidents([incident("1")])
+
+    result = insert_incidents([incident("1"), incident("2"), incident("2"), incident("3")])
+
+    assert result == {"inserted": 2, "conflicts": [("1", "already exists"), ("2", "duplicate in batch")]}
+    assert count("cyber_incidents") == 3
+
+
+def test_rows_breaking_a_constraint_are_skipped_one_by_one(db_path):
+    result = insert_tickets([(1, "Low", "Printer", "Open"), (2, "Low", None, "Open"), (3, "High", "VPN", "Open")],
+                            TICKET)
+
+    assert result["inserted"] == 2
+    assert [(key, "NOT NULL" in reason) for key, reason in result["conflicts"]] == [(2, True)]
+    assert count("it_tickets") == 2
+
+
+def test_update_and_delete_report_missing_keys(db_path):
+    insert_incidents([incident("1"), incident("2")])
+
+    assert update_incidents_status(["1", "9", "1"], "Closed") == {"updated": 1, "conflicts": [("9", "not found")]}
+    assert assign_tickets([5], "bob") == {"updated": 0, "conflicts": [(5, "not found")]}
+    assert delete_incidents(["2", "8"]) == {"deleted": 1, "conflicts": [("8", "not found")]}
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT incident_id, status FROM cyber_incidents").fetchall() == [("1", "Closed")]
+
+
+def test_each_bulk_call_is_one_pool_commit(db_path):
+    before = db.pool_stats()["commits"]
+
+    insert_tickets([(1, "Low", "Printer", "Open"), (2, "Low", None, "Open")], TICKET)
+    assign_tickets([1], "bob")
+
+    assert db.pool_stats()["commits"] - before == 2
+
+
+def test_bulk_writes_join_the_callers_transaction(db_path):
+    # a failure later in the same get_connection() block rolls the bulk write back too
+    with pytest.raises(RuntimeError):
+        with db.get_connection():
+            insert_tickets([(1, "Low", "Printer", "Open")], TICKET)
+            raise RuntimeError("later step failed")
+    assert count("it_tickets") == 0
+
+
+def test_rows_from_csv_text_keeps_known_columns():
+    names, rows = rows_from_csv_text("dataset_id, name ,extra\nD1, Sales ,x\nD2,,y\n", DATASET_COLUMNS,
+                                     required=["dataset_id"])
+    assert names == ["dataset_id", "name"]
+    assert rows == [("D1", "Sales"), ("D2", None)]
+
+    with pytest.raises(ValueError):
+        rows_from_csv_text("name\nSales\n", DATASET_COLUMNS, required=["dataset_id"])
+
+
+def test_parse_keys_splits_on_commas_and_whitespace():
+    assert parse_keys(" 1, 2\n3\t4,,5 ") == ["1", "2", "3", "4", "5"]
@@ -0,0 +1,121 @@
+import pandas as pd
+import pytest
+
+from app.data import cache
+from app.data.cache import cached_query, clear_cache, invalidate, invalidates, on_invalidate
+from app.data.rows import ColumnarResult, TicketRow
+from app.data.tickets import get_all_tickets, get_tickets_page, insert_tickets
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def counting(result, *tables):
+    # a cached function that counts how often it really runs
+    calls = []
+
+    @cached_query(*tables)
+    def read(*args):
+        calls.append(args)
+        return result() if callable(result) else result
+    return read, calls
+
+
+def test_result_is_reused_until_its_table_is_written():
+    read, calls = counting(1, "it_tickets")
+
+    read(), read()
+    invalidate("cyber_incidents")
+    read()
+    assert len(calls) == 1
+
+    invalidate("it_tickets")
+    read()
+    assert len(calls) == 2
+
+
+def test_arguments_are_part_of_the_key_and_unhashable_ones_skip_the_cache():
+    read, calls = counting(1, "it_tickets")
+
+    read(1), read(1), read(2)
+    assert calls == [(1,), (2,)]
+    read([1]), read([1])
+    assert len(calls) == 4
+
+
+def test_invalidates_runs_even_when_the_write_fails():
+    read, calls = counting(1, "it_tickets")
+
+    @invalidates("it_tickets")
+    def failing_write():
+        raise RuntimeError("write failed")
+
+    read()
+    with pytest.raises(RuntimeError):
+        failing_write()
+    read()
+    assert len(calls) == 2
+
+
+def test_listeners_hear_about_every_write():
+    heard = []
+    listener = on_invalidate(lambda tables: heard.append(tables))
+    try:
+        invalidate("it_tickets", "cyber_incidents")
+    finally:
+        cache._listeners.remove(listener)
+    assert heard == [("it_tickets", "cyber_incidents")]
+
+
+def test_least_recently_used_entries_are_evicted(monkeypatch):
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 2)
+    read, calls = counting(1, "it_tickets")
+
+    read(1), read(2), read(1), read(3)  # 2 is the least recently used when 3 comes in
+    read(1), read(2)
+    assert calls == [(1,), (2,), (3,), (2,)]
+
+
+@pytest.mark.parametrize("make, change, check", [
+    (lambda: [1, 2], lambda value: value.append(3), lambda value: value == [1, 2]),
+    (lambda: {"a": [1]}, lambda value: value["a"].append(2), lambda value: value == {"a": [1]}),
+    (lambda: pd.DataFrame({"a": [1, 2]}), lambda value: value.update(pd.DataFrame({"a": [0, 0]})),
+     lambda value: value["a"].tolist() == [1, 2]),
+    (lambda: ColumnarResult(["a"], [[1, 2]]), lambda value: value["a"].append(3),
+     lambda value: value["a"] == [1, 2]),
+    (lambda: (ColumnarResult(["a"], [[1]]), None), lambda value: value[0]["a"].append(2),
+     lambda value: value[0]["a"] == [1]),
+])
+def test_callers_get_copies(make, change, check):
+    read, calls = counting(make(), "it_tickets")
+
+    change(read())
+
+    assert check(read())
+    assert len(calls) == 1
+
+
+def test_row_objects_are_copied():
+    # like get_ticket_by_id, which returns one TicketRow
+    read, calls = counting(TicketRow(1, "Low", "Printer", "Open", None, None, None), "it_tickets")
+
+    read().status = "Closed"
+
+    assert read().status == "Open"
+
+
+def test_data_layer_reads_follow_writes(db_path):
+    columns = ["ticket_id", "priority", "description", "status"]
+    insert_tickets([(1, "Low", "Printer offline", "Open")], columns)
+    assert len(get_all_tickets()) == 1
+    page, _ = get_tickets_page()
+    assert page["ticket_id"] == [1]
+
+    insert_tickets([(2, "High", "VPN down", "Open")], columns)
+
+    assert len(get_all_tickets()) == 2
+    assert sorted(get_tickets_page()[0]["ticket_id"]) == [1, 2]
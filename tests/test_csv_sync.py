@@ -0,0 +1,59 @@
+from app.data.csv_loaders import coerce_value, row_hash, sync_csv_to_table
+
+HEADER = "dataset_id,name,rows,columns,uploaded_by,upload_date\n"
+
+
+def write_csv(tmp_path, lines):
+    path = tmp_path / "datasets_metadata.csv"
+    path.write_text(HEADER + "".join(line + "\n" for line in lines), encoding="utf-8")
+    return path
+
+
+def test_coerce_value_follows_integer_affinity():
+    assert coerce_value("24", "INTEGER") == 24
+    assert coerce_value("24.0", "INTEGER") == 24
+    assert coerce_value("1e3", "INTEGER") == 1000
+    assert coerce_value("24.5", "INTEGER") == 24.5
+    assert coerce_value("n/a", "INTEGER") == "n/a"
+    assert coerce_value("2", "REAL") == 2.0
+    assert coerce_value(None, "INTEGER") is None
+
+
+def test_row_hash_matches_stored_and_coerced_values():
+    assert row_hash(("D1", 24, None)) == row_hash(("D1", coerce_value("24.0", "INTEGER"), None))
+    assert row_hash(("D1", 24.0)) == row_hash(("D1", 24))
+    assert row_hash(("D1", None)) != row_hash(("D1", ""))
+
+
+def test_unchanged_file_syncs_without_changes(tmp_path, conn):
+    csv_path = write_csv(tmp_path, ["D1,Sales,24.0,3,alice,2024-01-01", "D2,Logs,1e3,4,bob,2024-01-02"])
+
+    first = sync_csv_to_table(conn, csv_path, "datasets_metadata")
+    second = sync_csv_to_table(conn, csv_path, "datasets_metadata")
+
+    assert (first["inserted"], first["updated"], first["unchanged"]) == (2, 0, 0)
+    assert (second["inserted"], second["updated"], second["unchanged"]) == (0, 0, 2)
+    assert conn.execute("SELECT rows FROM datasets_metadata ORDER BY dataset_id").fetchall() == [(24,), (1000,)]
+
+
+def test_changed_and_missing_rows(tmp_path, conn):
+    sync_csv_to_table(conn, write_csv(tmp_path, ["D1,Sales,24,3,alice,2024-01-01",
+                                                 "D2,Logs,10,4,bob,2024-01-02"]), "datasets_metadata")
+
+    counts = sync_csv_to_table(conn, write_csv(tmp_path, ["D1,Sales,25,3,alice,2024-01-01",
+                                                          "D3,New,5,1,carol,2024-01-03"]),
+                               "datasets_metadata", delete_missing=True)
+
+    assert (counts["inserted"], counts["updated"], counts["unchanged"], counts["deleted"]) == (1, 1, 0, 1)
+    assert conn.execute("SELECT dataset_id, rows FROM datasets_metadata ORDER BY dataset_id").fetchall() == \
+        [("D1", 25), ("D3", 5)]
+
+
+def test_repeated_key_in_a_chunk_is_counted_once(tmp_path, conn):
+    csv_path = write_csv(tmp_path, ["D1,Sales,24,3,alice,2024-01-01", "D1,Sales,30,3,alice,2024-01-01"])
+
+    counts = sync_csv_to_table(conn, csv_path, "datasets_metadata")
+
+    assert (counts["inserted"], counts["updated"]) == (1, 0)
+    # the last copy wins, like the upserts would leave it
+    assert conn.execute("SELECT rows FROM datasets_metadata").fetchall() == [(30,)]
@@ -0,0 +1,83 @@
+import pytest
+
+from app.data.datasets import get_datasets_page, insert_datasets
+from app.data.db import get_connection
+from app.data.incidents import get_latest_incidents, insert_incidents
+from app.data.pagination import check_sort_column, keyset_page
+
+
+@pytest.fixture
+def scores(conn):
+    # a nullable, repeating sort column: the cases keyset pagination tends to get wrong
+    conn.execute("CREATE TABLE scores (id INTEGER PRIMARY KEY, score INTEGER)")
+    values = [None, 3, 1, None, 3, 2, None, 1, 3, 2, None]
+    conn.executemany("INSERT INTO scores (id, score) VALUES (?, ?)", enumerate(values, start=1))
+    conn.commit()
+    return conn
+
+
+def walk(conn, page_size, descending):
+    # every page from the first to the last, following the cursors
+    seen, last_key = [], None
+    while True:
+        columns, rows, last_key = keyset_page(conn, "scores", "id", "score", last_key, page_size, descending)
+        assert len(rows) <= page_size
+        seen.extend(rows)
+        if last_key is None:
+            return seen
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("page_size", [1, 2, 3, 4, 20])
+def test_pages_cover_every_row_once_with_nulls(scores, page_size, descending):
+    direction = "DESC" if descending else "ASC"
+    expected = scores.execute(f"SELECT * FROM scores ORDER BY score {direction}, id {direction}").fetchall()
+
+    assert walk(scores, page_size, descending) == expected
+
+
+def test_where_clause_applies_to_every_page(scores):
+    seen, last_key = [], None
+    while True:
+        columns, rows, last_key = keyset_page(scores, "scores", "id", "score", last_key, 2,
+                                              where="score IS NULL OR score > ?", params=(1,))
+        seen.extend(rows)
+        if last_key is None:
+            break
+    assert sorted(row[0] for row in seen) == [1, 2, 4, 5, 6, 7, 9, 10, 11]
+
+
+def test_sort_column_must_be_whitelisted():
+    assert check_sort_column("rows", ["rows"]) == "rows"
+    with pytest.raises(ValueError):
+        check_sort_column("rows; DROP TABLE users", ["rows"])
+
+
+def test_datasets_page_filters(db_path):
+    insert_datasets([
+        ("D1", "Sales", 10, 3, "alice", "2024-01-01"),
+        ("D2", "Logs", 500, 4, "bob", "2024-01-02"),
+        ("D3", "Chats", 900, 2, "alice", "2024-01-03"),
+        ("D4", "Fraud", 50, 6, "alice", "2024-01-04"),
+    ])
+
+    page, next_key = get_datasets_page(page_size=10, min_rows=20, max_rows=900, uploaded_by="alice")
+    assert page["dataset_id"] == ["D4", "D3"] and next_key is None
+
+    first, next_key = get_datasets_page(page_size=2, sort_column="rows", descending=False)
+    second, last_key = get_datasets_page(next_key, page_size=2, sort_column="rows", descending=False)
+    assert first["dataset_id"] + second["dataset_id"] == ["D1", "D4", "D2", "D3"] and last_key is None
+
+
+def test_latest_incidents_are_newest_by_timestamp(db_path):
+    # text ids: '999' sorts above '1000', the timestamp decides what is newest
+    insert_incidents([
+        ("999", "2024-01-01 09:00:00", "Low", "Phishing", "Open", "a", "x"),
+        ("1000", "2024-03-01 09:00:00", "Low", "Phishing", "Open", "b", "x"),
+        ("1001", "2024-02-01 09:00:00", "Low", "Phishing", "Open", "c", "x"),
+    ])
+
+    assert get_latest_incidents(2)["incident_id"].tolist() == ["1000", "1001"]
+    with get_connection() as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM cyber_incidents ORDER BY timestamp DESC LIMIT 2").fetchall()
+    assert "idx_incidents_timestamp" in str(plan)
@@ -0,0 +1,79 @@
+from datetime import datetime
+from itertools import combinations
+
+import pytest
+
+from app.data import db
+from app.data.incidents import (ROLLUP_DIMENSIONS, delete_incidents, get_incident_rollup, insert_incidents,
+                                query_incidents, update_incidents_status)
+from app.data.synthetic import incident_rows
+
+START, END = datetime(2024, 1, 1), datetime(2024, 3, 1)
+
+# the same groups straight from cyber_incidents; the rollup stores NULL as '' and gives it back as NULL
+DIRECT = {
+    "day": "substr(timestamp, 1, 10)",
+    "severity": "severity",
+    "category": "category",
+    "status": "status",
+}
+
+
+@pytest.fixture
+def incidents(db_path):
+    rows = [[str(incident_id), *rest] for incident_id, *rest in incident_rows(400, START, END, seed=7)]
+    for row in rows[::37]:
+        row[2] = None  # some incidents without a severity
+    for row in rows[::53]:
+        row[1] = None  # and some without a timestamp
+    insert_incidents(rows)
+    # writes after the insert go through the update and delete triggers
+    update_incidents_status([row[0] for row in rows[:150:3]], "Closed")
+    delete_incidents([row[0] for row in rows[::11]])
+    return rows
+
+
+def direct_counts(group_by, where="", params=()):
+    select = ", ".join(f"{DIRECT[column]} AS {column}" for column in group_by)
+    with db.get_connection() as conn:
+        rows = conn.execute(f"SELECT {select}, COUNT(*) FROM cyber_incidents {where} "
+                            f"GROUP BY {', '.join(group_by)}", params).fetchall()
+    return {row[:-1]: row[-1] for row in rows}
+
+
+def rollup_counts(group_by, **filters):
+    frame = get_incident_rollup(tuple(group_by), **filters)
+    return {tuple(None if value is None or value != value else value for value in row[:-1]): row[-1]
+            for row in frame.itertuples(index=False)}
+
+
+@pytest.mark.parametrize("group_by", [list(group) for size in (1, 2, 4)
+                                      for group in combinations(ROLLUP_DIMENSIONS, size)])
+def test_rollup_matches_group_by(incidents, group_by):
+    assert rollup_counts(group_by) == direct_counts(group_by)
+
+
+def test_filtered_rollup_matches_group_by(incidents):
+    expected = direct_counts(["category"], "WHERE timestamp >= ? AND timestamp < date(?, '+1 day') AND status = ?",
+                             ("2024-01-15", "2024-02-10", "Closed"))
+    assert rollup_counts(["category"], start_date="2024-01-15", end_date="2024-02-10", status="Closed") == expected
+
+
+def test_query_incidents_totals_match_the_table(incidents):
+    result = query_incidents(category="Phishing", limit=5)
+    with db.get_connection() as conn:
+        total = conn.execute("SELECT COUNT(*) FROM cyber_incidents WHERE category = 'Phishing'").fetchone()[0]
+
+    assert result["total"] == total
+    assert int(result["by_status"]["count"].sum()) == total
+    assert len(result["rows"]) == 5 and set(result["rows"]["category"]) == {"Phishing"}
+    assert query_incidents(limit=0)["rows"].empty
+
+
+def test_emptied_groups_are_removed(db_path):
+    insert_incidents([("1", "2024-01-01 09:00:00", "Low", "Phishing", "Open", "a", "x")])
+    update_incidents_status(["1"], "Closed")
+    delete_incidents(["1"])
+
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM incident_daily_rollup").fetchone()[0] == 0
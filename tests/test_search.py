@@ -0,0 +1,58 @@
+from app.data.db import fts_query, get_connection
+from app.data.incidents import delete_incidents, insert_incidents, search_incidents_ranked
+from app.data.migrations import vacuum_database
+from app.data.tickets import insert_tickets, search_tickets_ranked
+
+
+def test_fts_query_quotes_and_prefixes_every_word():
+    assert fts_query("phish email") == '"phish"* "email"*'
+
+
+def test_fts_query_drops_operators_and_punctuation():
+    assert fts_query('NOT "a" OR b* (c) -d') == '"NOT"* "a"* "OR"* "b"* "c"* "d"*'
+    assert fts_query("  ") == ""
+    assert fts_query(None) == ""
+    assert fts_query('"*()') == ""
+
+
+def add_incidents():
+    insert_incidents([
+        ("999", "2024-01-01 09:00:00", "High", "Phishing", "Open", "Suspicious email with invoice link", "a"),
+        ("1000", "2024-01-02 09:00:00", "Low", "Malware", "Open", "Trojan detected on laptop", "b"),
+        ("1001", "2024-01-03 09:00:00", "Low", "Phishing", "Closed", "Spoofed sender email", "c"),
+    ])
+
+
+def test_incident_search_ranks_matching_rows(db_path):
+    add_incidents()
+
+    found = search_incidents_ranked("email")
+
+    assert sorted(found["incident_id"]) == ["1001", "999"]
+    assert found["snippet"].str.contains(r"\*\*email\*\*", case=False).all()
+    assert search_incidents_ranked("emai")["incident_id"].tolist() != []  # prefix match
+    assert search_incidents_ranked('" OR *').empty
+
+
+def test_search_follows_writes(db_path):
+    add_incidents()
+    insert_tickets([(1, "Low", "Printer offline again", "Open")], ["ticket_id", "priority", "description", "status"])
+
+    assert [row[0] for row in search_tickets_ranked("printer")] == [1]
+    assert search_incidents_ranked("invoice")["incident_id"].tolist() == ["999"]
+    delete_incidents(["999"])
+    assert search_incidents_ranked("invoice").empty
+
+
+def test_vacuum_database_rebuilds_the_indexes(db_path):
+    add_incidents()
+    with get_connection() as conn:
+        # an index out of step with its table, like one left pointing at old rowids
+        conn.execute("INSERT INTO cyber_incidents_fts (cyber_incidents_fts) VALUES ('delete-all')")
+    assert search_incidents_ranked.uncached("trojan").empty
+
+    with get_connection() as conn:
+        vacuum_database(conn)
+
+    assert search_incidents_ranked.uncached("trojan")["incident_id"].tolist() == ["1000"]
+    assert sorted(search_incidents_ranked.uncached("email")["incident_id"]) == ["1001", "999"]
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.data import snapshots
+from app.data.tickets import insert_tickets
+
+TICKET = ["ticket_id", "priority", "description", "status"]
+
+
+def test_every_export_is_a_new_file_and_old_ones_are_removed(db_path, tmp_path):
+    insert_tickets([(1, "Low", "Printer", "Open")], TICKET)
+
+    snapshots.export_snapshot("it_tickets", tmp_path)
+    first = snapshots.snapshot_path("it_tickets", tmp_path)
+    snapshots.export_snapshot("it_tickets", tmp_path)
+    second = snapshots.snapshot_path("it_tickets", tmp_path)
+
+    assert first != second
+    assert [path.name for path in tmp_path.glob("it_tickets.*")] == [second.name]
+
+
+def test_loads_follow_writes_and_mapped_tables_stay_readable(db_path, tmp_path):
+    insert_tickets([(1, "Low", "Printer", "Open")], TICKET)
+    before = snapshots.load_snapshot("it_tickets", snapshot_dir=tmp_path)
+
+    insert_tickets([(2, "High", "VPN", "Open")], TICKET)
+    after = snapshots.load_snapshot("it_tickets", snapshot_dir=tmp_path)
+
+    assert before.column("ticket_id").to_pylist() == [1]
+    assert sorted(after.column("ticket_id").to_pylist()) == [1, 2]
+
+
+def test_unchanged_table_is_not_exported_again(db_path, tmp_path):
+    insert_tickets([(1, "Low", "Printer", "Open")], TICKET)
+    snapshots.load_snapshot("it_tickets", snapshot_dir=tmp_path)
+    path = snapshots.snapshot_path("it_tickets", tmp_path)
+
+    snapshots.load_snapshot("it_tickets", snapshot_dir=tmp_path)
+
+    assert snapshots.snapshot_path("it_tickets", tmp_path) == path
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.data.csv_loaders import sync_csv_to_table
+from app.data.synthetic import (INCIDENT_STATUSES_OLD, STILL_OPEN_DAYS, dataset_rows, generate_csvs,
+                                incident_rows, ticket_rows)
+
+# ends before working hours, so a working-hours time on the last day would be after end
+END = datetime(2026, 10, 18, 6, 0)
+
+
+def parse(value):
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+@pytest.mark.parametrize("days", [1, 3, 400])
+def test_timestamps_stay_inside_the_range(days):
+    start = END - timedelta(days=days)
+    moments = [parse(row[1]) for row in incident_rows(2000, start, END)]
+    moments += [parse(row[5]) for row in ticket_rows(2000, start, END)]
+    days_seen = [datetime.strptime(row[5], "%Y-%m-%d") for row in dataset_rows(500, start, END)]
+
+    assert all(start <= moment <= END for moment in moments)
+    assert all(start.date() <= day.date() <= END.date() for day in days_seen)
+
+
+def test_most_timestamps_are_in_working_hours():
+    moments = [parse(row[1]) for row in incident_rows(5000, END - timedelta(days=365), END)]
+    share = sum(8 <= moment.hour < 18 for moment in moments) / len(moments)
+    assert 0.75 < share < 0.95
+
+
+def test_older_records_get_the_old_status_mix():
+    rows = list(incident_rows(5000, END - timedelta(days=365), END))
+    old = [row[4] for row in rows if (END - parse(row[1])).days >= STILL_OPEN_DAYS]
+    recent = [row[4] for row in rows if (END - parse(row[1])).days < STILL_OPEN_DAYS]
+
+    # the old mix is mostly resolved or closed, the recent one mostly open or in progress
+    assert sum(status in ("Resolved", "Closed") for status in old) / len(old) > 0.8
+    assert sum(status in ("Open", "In Progress") for status in recent) / len(recent) > 0.5
+    assert set(old) <= set(INCIDENT_STATUSES_OLD)
+
+
+def test_same_seed_same_rows():
+    start = END - timedelta(days=30)
+    assert list(ticket_rows(200, start, END, seed=5)) == list(ticket_rows(200, start, END, seed=5))
+    assert list(ticket_rows(200, start, END, seed=5)) != list(ticket_rows(200, start, END, seed=6))
+
+
+def test_generated_csvs_sync_round_trip(tmp_path, conn):
+    generate_csvs(tmp_path, incidents=300, tickets=300, datasets=50, start=END - timedelta(days=90), end=END)
+
+    for name, table in [("cyber_incidents.csv", "cyber_incidents"), ("it_tickets.csv", "it_tickets"),
+                        ("datasets_metadata.csv", "datasets_metadata")]:
+        first = sync_csv_to_table(conn, tmp_path / name, table)
+        second = sync_csv_to_table(conn, tmp_path / name, table)
+        rows = {"cyber_incidents.csv": 300, "it_tickets.csv": 300, "datasets_metadata.csv": 50}[name]
+
+        assert first["inserted"] == rows
+        assert (second["inserted"], second["updated"], second["unchanged"]) == (0, 0, rows)
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from app.services import tracing
+
+
+@pytest.fixture(autouse=True)
+def no_traces():
+    tracing.clear_traces()
+    yield
+    tracing.clear_traces()
+
+
+def run_page(page, end):
+    # one script run on its own thread, like a Streamlit rerun
+    def script():
+        tracing.start_trace(page)
+        with tracing.span("query", "db"):
+            pass
+        # st.switch_page / st.stop end the run before the end_trace() at the bottom
+        if end:
+            tracing.end_trace()
+    thread = threading.Thread(target=script)
+    thread.start()
+    thread.join()
+
+
+def test_runs_that_end_early_are_recorded_as_incomplete():
+    run_page("Login", end=False)
+    run_page("Home", end=True)
+
+    traces = {trace["page"]: trace for trace in tracing.recent_traces()}
+
+    assert traces["Home"]["complete"] and not traces["Login"]["complete"]
+    assert traces["Login"]["spans"][0][:2] == ("query", "db")
+
+
+def test_stats_per_page():
+    for _ in range(3):
+        run_page("Home", end=True)
+    run_page("Home", end=False)
+
+    (stats,) = tracing.page_stats()
+
+    assert stats["page"] == "Home" and stats["count"] == 4 and stats["incomplete"] == 1
+    assert tracing.span_stats()[0]["count"] == 4
+
+
+def test_spans_outside_a_trace_are_not_recorded():
+    with tracing.span("query", "db"):
+        pass
+    assert tracing.recent_traces() == []
@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import upload_profiler
+from app.services.upload_profiler import _NumericStats, profile_csv, summary_table
+
+
+def csv_file(frame):
+    return io.BytesIO(frame.to_csv(index=False).encode("utf-8"))
+
+
+def test_reservoir_is_a_uniform_sample_across_chunks():
+    stats = _NumericStats(np.random.default_rng(0))
+    values = np.arange(100_000, dtype="float64")
+    for chunk in np.array_split(values, 37):
+        stats.add(pd.Series(chunk))
+
+    sample = stats.reservoir
+    assert stats.seen == len(values)
+    assert len(np.unique(sample)) == upload_profiler.RESERVOIR_SIZE
+    assert np.isin(sample, values).all()
+    # uniform over the input: every decile holds about a tenth of the sample
+    deciles = np.histogram(sample, bins=10, range=(0, len(values)))[0]
+    assert (abs(deciles - upload_profiler.RESERVOIR_SIZE / 10) < 250).all()
+
+
+def test_numeric_stats_are_exact_and_the_histogram_is_scaled(monkeypatch):
+    monkeypatch.setattr(upload_profiler, "RESERVOIR_SIZE", 500)
+    values = pd.Series(np.random.default_rng(1).normal(50, 10, 20_000))
+    frame = pd.DataFrame({"value": values})
+    frame.loc[::100, "value"] = np.nan
+
+    stat = profile_csv(csv_file(frame), chunk_rows=3000)["stats"]["value"]
+
+    present = frame["value"].dropna()
+    assert stat["count"] == len(present) and stat["missing"] == 200
+    assert stat["min"] == pytest.approx(present.min()) and stat["max"] == pytest.approx(present.max())
+    assert stat["mean"] == pytest.approx(present.mean())
+    assert abs(stat["histogram"].sum() - len(present)) <= upload_profiler.HISTOGRAM_BINS
+    assert stat["histogram"].index.is_monotonic_increasing
+
+
+def test_categorical_top_values_and_other():
+    frame = pd.DataFrame({"status": ["Open"] * 50 + ["Closed"] * 30 + [f"s{i}" for i in range(40)] + [None] * 5})
+
+    stat = profile_csv(csv_file(frame), chunk_rows=7)["stats"]["status"]
+
+    assert stat["kind"] == "categorical"
+    assert stat["count"] == 120 and stat["missing"] == 5 and stat["distinct"] == 42
+    assert stat["top"].iloc[:2].to_dict() == {"Open": 50, "Closed": 30}
+    assert len(stat["top"]) == upload_profiler.TOP_VALUES
+    assert stat["other"] == 120 - stat["top"].sum()
+
+
+def test_max_rows_and_sample():
+    frame = pd.DataFrame({"n": range(10_000), "category": ["a", "b"] * 5000})
+
+    capped = profile_csv(csv_file(frame), max_rows=2500, chunk_rows=1000)
+    sampled = profile_csv(csv_file(frame), sample=0.1, chunk_rows=1000)
+
+    assert capped["rows_read"] == 2500 and capped["truncated"] and capped["stats"]["n"]["max"] == 2499
+    assert sampled["rows_read"] == 10_000 and sampled["sampled"]
+    assert 800 < sampled["rows_profiled"] < 1200
+    # the same file and seed pick the same rows
+    again = profile_csv(csv_file(frame), sample=0.1, chunk_rows=1000)
+    assert again["rows_profiled"] == sampled["rows_profiled"]
+    assert again["stats"]["n"]["mean"] == sampled["stats"]["n"]["mean"]
+
+
+def test_summary_table_has_a_row_per_column():
+    frame = pd.DataFrame({"n": [1, 2, 3], "category": ["a", "b", "a"]})
+
+    table = summary_table(profile_csv(csv_file(frame)))
+
+    assert table["column"].tolist() == ["n", "category"]
+    assert table["type"].tolist() == ["numeric", "categorical"]
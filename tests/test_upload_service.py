@@ -0,0 +1,51 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.services.upload_service import get_upload_profile, get_user_uploads, profile_path, store_upload
+
+
+def upload(tmp_path, data, username="alice", filename="data.csv"):
+    return store_upload(username, filename, io.BytesIO(data), upload_dir=tmp_path / "uploads")
+
+
+def test_same_content_is_stored_once(db_path, tmp_path):
+    data = b"a,b\n1,x\n2,y\n"
+
+    first_hash, first_path = upload(tmp_path, data, filename="one.csv")
+    second_hash, second_path = upload(tmp_path, data, filename="two.csv")
+
+    assert first_hash == second_hash and first_path == second_path
+    assert first_path.read_bytes() == data
+    assert [row[:2] for row in get_user_uploads("alice")] == [("two.csv", first_hash)]
+
+
+def test_profile_cache_is_json_and_round_trips(db_path, tmp_path):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({"value": rng.normal(size=5000), "category": rng.choice(["a", "b", None], 5000)})
+    content_hash, _ = upload(tmp_path, frame.to_csv(index=False).encode("utf-8"))
+    options = {"upload_dir": tmp_path / "uploads", "profile_dir": tmp_path / "profiles"}
+
+    profiled, cached_first = get_upload_profile(content_hash, **options)
+    loaded, cached_second = get_upload_profile(content_hash, **options)
+
+    assert (cached_first, cached_second) == (False, True)
+    json.loads(profile_path(content_hash, profile_dir=tmp_path / "profiles").read_text(encoding="utf-8"))
+    pd.testing.assert_frame_equal(loaded["preview"], profiled["preview"])
+    pd.testing.assert_series_equal(loaded["stats"]["value"]["histogram"], profiled["stats"]["value"]["histogram"])
+    pd.testing.assert_series_equal(loaded["stats"]["category"]["top"], profiled["stats"]["category"]["top"],
+                                   check_index_type=False)
+    assert loaded["stats"]["value"]["mean"] == profiled["stats"]["value"]["mean"]
+
+
+def test_damaged_cache_file_is_profiled_again(db_path, tmp_path):
+    content_hash, _ = upload(tmp_path, b"n\n1\n2\n3\n")
+    options = {"upload_dir": tmp_path / "uploads", "profile_dir": tmp_path / "profiles"}
+    get_upload_profile(content_hash, **options)
+    profile_path(content_hash, profile_dir=tmp_path / "profiles").write_text("{not json", encoding="utf-8")
+
+    profile, cached = get_upload_profile(content_hash, **options)
+
+    assert not cached and profile["stats"]["n"]["count"] == 3